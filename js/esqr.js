@@ -93,7 +93,17 @@
   }
 
   function loadConfig() {
-    return fetch('data/esqr-config.json', { cache: 'no-store' })
+    // The manifest is revalidated on every load; the hashed bundle it names
+    // is cached as immutable, so repeat visits download nothing new.
+    return fetch('data/bundle-manifest.json')
+      .then(function (res) {
+        if (!res.ok) throw new Error('Unable to load ESQ-R config.');
+        return res.json();
+      })
+      .then(function (manifest) {
+        if (!manifest.esqr) throw new Error('Unable to load ESQ-R config.');
+        return fetch('data/' + manifest.esqr);
+      })
       .then(function (res) {
         if (!res.ok) throw new Error('Unable to load ESQ-R config.');
         return res.json();
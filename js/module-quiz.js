@@ -12,18 +12,29 @@
   var quizData = null;
 
   // Load quiz data
+  // Only this module's bundle is fetched; the manifest maps module IDs to
+  // content-hashed files built by scripts/build_data_bundles.py.
   function loadQuizData() {
-    fetch('/data/module-quizzes.json')
+    var moduleId = getModuleIdFromPage();
+    if (!moduleId) return;
+    fetch('/data/bundle-manifest.json')
       .then(function(response) {
-        if (!response.ok) throw new Error('Failed to load quiz data');
+        if (!response.ok) throw new Error('Failed to load quiz manifest');
         return response.json();
       })
-      .then(function(data) {
-        quizData = data;
-        var moduleId = getModuleIdFromPage();
-        if (moduleId && quizData.quizzes[moduleId]) {
-          initializeQuiz(moduleId);
-        }
+      .then(function(manifest) {
+        var bundle = manifest.quizzes && manifest.quizzes[moduleId];
+        if (!bundle) return null;
+        return fetch('/data/' + bundle).then(function(response) {
+          if (!response.ok) throw new Error('Failed to load quiz data');
+          return response.json();
+        });
+      })
+      .then(function(quiz) {
+        if (!quiz) return;
+        quizData = { quizzes: {} };
+        quizData.quizzes[moduleId] = quiz;
+        initializeQuiz(moduleId);
       })
       .catch(function(error) {
         console.warn('[Module Quiz] Could not load quiz data:', error);
@@ -329,7 +340,7 @@
 
   // Get motivational message based on score
   function getResultsMessage(percentage) {
-    if (percentage === 100) return 'Perfect! You've mastered this module.';
+    if (percentage === 100) return 'Perfect! You\'ve mastered this module.';
     if (percentage >= 80) return 'Great work! You understand the key concepts.';
     if (percentage >= 60) return 'Good effort! Review the explanations above to solidify your understanding.';
     return 'Keep studying! Read through the module again and retake the quiz.';
@@ -0,0 +1,193 @@
+/* ============================================
+   Site Search
+   Queries the prebuilt index from scripts/build_search_index.py:
+   only the manifest and the shards for the typed prefixes are fetched.
+   ============================================ */
+
+(function () {
+  'use strict';
+
+  var input = document.getElementById('site-search-input');
+  var resultsEl = document.getElementById('site-search-results');
+  var statusEl = document.getElementById('site-search-status');
+  if (!input || !resultsEl) return;
+
+  var MAX_RESULTS = 10;
+  var manifest = null;
+  var stopwords = {};
+  var docsPromise = null;
+  var shardCache = {};
+  var lastQuery = '';
+  var timer = null;
+
+  function fetchJson(path) {
+    return fetch('data/' + path).then(function (res) {
+      if (!res.ok) throw new Error('Unable to load search index.');
+      return res.json();
+    });
+  }
+
+  function loadManifest() {
+    if (!manifest) {
+      manifest = fetchJson('search-manifest.json').then(function (m) {
+        m.stopwords.forEach(function (word) { stopwords[word] = true; });
+        return m;
+      });
+    }
+    return manifest;
+  }
+
+  // Same folding and stemming as fold()/stem() in build_search_index.py.
+  function fold(text) {
+    return text.toLowerCase().normalize('NFKD').replace(/[\u0300-\u036f]/g, '');
+  }
+
+  function stem(word, passes) {
+    passes.forEach(function (rules) {
+      for (var i = 0; i < rules.length; i++) {
+        var suffix = rules[i][0];
+        if (word.slice(-suffix.length) === suffix && word.length - suffix.length >= rules[i][2]) {
+          word = word.slice(0, word.length - suffix.length) + rules[i][1];
+          break;
+        }
+      }
+    });
+    return word;
+  }
+
+  function shardFor(prefix, m) {
+    var path = null;
+    m.shards.forEach(function (entry) {
+      if (entry[0] <= prefix) path = entry[1];
+    });
+    if (!path) return Promise.resolve({});
+    if (!shardCache[path]) shardCache[path] = fetchJson(path);
+    return shardCache[path];
+  }
+
+  // Posting lists are flat [docDelta, tf, docDelta, tf, ...] arrays.
+  function decode(postings) {
+    var out = {};
+    var doc = 0;
+    for (var i = 0; i < postings.length; i += 2) {
+      doc += postings[i];
+      out[doc] = postings[i + 1];
+    }
+    return out;
+  }
+
+  // Every query word must match. The last word also matches as a prefix,
+  // so results update while it is still being typed.
+  function search(query, m) {
+    var words = (fold(query).match(/[a-z0-9]+/g) || []).filter(function (word, index, all) {
+      return word.length > 1 && (!stopwords[word] || index === all.length - 1);
+    });
+    if (!words.length) return Promise.resolve([]);
+    if (!docsPromise) docsPromise = fetchJson(m.docs);
+
+    return Promise.all(words.map(function (word, index) {
+      var exact = stem(word, m.stem);
+      var partial = index === words.length - 1 ? word : null;
+      return Promise.all([shardFor(exact.slice(0, 2), m), partial ? shardFor(word.slice(0, 2), m) : {}])
+        .then(function (shards) {
+          var matched = {};
+          if (shards[0][exact]) matched[exact] = shards[0][exact];
+          if (partial) {
+            Object.keys(shards[1]).forEach(function (term) {
+              if (term.indexOf(partial) === 0) matched[term] = shards[1][term];
+            });
+          }
+          return matched;
+        });
+    })).then(function (perWord) {
+      return docsPromise.then(function (docs) {
+        return rank(perWord, docs, m);
+      });
+    });
+  }
+
+  function rank(perWord, docs, m) {
+    var k1 = m.bm25.k1;
+    var b = m.bm25.b;
+    var scores = null;
+    perWord.forEach(function (terms) {
+      var wordScores = {};
+      Object.keys(terms).forEach(function (term) {
+        var postings = decode(terms[term]);
+        var ids = Object.keys(postings);
+        var idf = Math.log(1 + (m.count - ids.length + 0.5) / (ids.length + 0.5));
+        ids.forEach(function (id) {
+          var tf = postings[id];
+          var norm = tf + k1 * (1 - b + b * docs[id][3] / m.avgdl);
+          var score = idf * tf * (k1 + 1) / norm;
+          wordScores[id] = Math.max(wordScores[id] || 0, score);
+        });
+      });
+      if (scores === null) {
+        scores = wordScores;
+        return;
+      }
+      Object.keys(scores).forEach(function (id) {
+        if (id in wordScores) scores[id] += wordScores[id];
+        else delete scores[id];
+      });
+    });
+    return Object.keys(scores || {})
+      .sort(function (a, c) { return scores[c] - scores[a]; })
+      .slice(0, MAX_RESULTS)
+      .map(function (id) { return docs[id]; });
+  }
+
+  function render(query, results) {
+    resultsEl.innerHTML = '';
+    results.forEach(function (doc) {
+      var item = document.createElement('li');
+      var link = document.createElement('a');
+      link.href = doc[0];
+      link.textContent = doc[1];
+      if (/^https?:/.test(doc[0])) {
+        link.target = '_blank';
+        link.rel = 'noopener';
+      }
+      var summary = document.createElement('p');
+      summary.textContent = doc[2];
+      item.appendChild(link);
+      item.appendChild(summary);
+      resultsEl.appendChild(item);
+    });
+    if (statusEl) {
+      statusEl.textContent = query
+        ? results.length + ' result' + (results.length === 1 ? '' : 's') + ' for "' + query + '"'
+        : '';
+    }
+  }
+
+  function run() {
+    var query = input.value.trim();
+    lastQuery = query;
+    if (!query) {
+      render('', []);
+      return;
+    }
+    loadManifest()
+      .then(function (m) { return search(query, m); })
+      .then(function (results) {
+        if (query === lastQuery) render(query, results);
+      })
+      .catch(function (err) {
+        if (statusEl) statusEl.textContent = err.message;
+      });
+  }
+
+  input.addEventListener('focus', loadManifest, { once: true });
+  input.addEventListener('input', function () {
+    clearTimeout(timer);
+    timer = setTimeout(run, 120);
+  });
+  if (input.form) {
+    input.form.addEventListener('submit', function (event) {
+      event.preventDefault();
+      run();
+    });
+  }
+})();
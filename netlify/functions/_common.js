@@ -5,16 +5,20 @@ const ASSET_MAP = {
   'launch-plan': 'docs/assets/90-day-coaching-business-launch-plan.pdf'
 };
 
+function jsonHeaders() {
+  return {
+    'Content-Type': 'application/json; charset=utf-8',
+    'Cache-Control': 'no-store',
+    'Access-Control-Allow-Origin': requiredEnv('EFI_CORS_ORIGIN') || '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-EFI-Admin-Key'
+  };
+}
+
 function json(statusCode, body) {
   return {
     statusCode,
-    headers: {
-      'Content-Type': 'application/json; charset=utf-8',
-      'Cache-Control': 'no-store',
-      'Access-Control-Allow-Origin': requiredEnv('EFI_CORS_ORIGIN') || '*',
-      'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-      'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-EFI-Admin-Key'
-    },
+    headers: jsonHeaders(),
     body: JSON.stringify(body)
   };
 }
@@ -84,6 +88,7 @@ async function fanout(payload) {
 module.exports = {
   ASSET_MAP,
   json,
+  jsonHeaders,
   parseBody,
   baseUrl,
   signPayload,
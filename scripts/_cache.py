@@ -0,0 +1,101 @@
+"""Content-hash result cache for release gate checks."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import sys
+from typing import Iterable
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / ".cache" / "release-gate"
+
+_DIGESTS: dict[Path, tuple[tuple[int, int], str]] = {}
+
+
+def file_digest(path: Path) -> str | None:
+    """sha256 of a file's bytes, or None when it does not exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _DIGESTS.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    _DIGESTS[path] = (stamp, digest)
+    return digest
+
+
+def inputs_digest(paths: Iterable[Path]) -> str:
+    """Combined digest over file names and contents; missing files count too."""
+    h = hashlib.sha256()
+    for path in sorted(set(paths)):
+        rel = path.relative_to(ROOT) if path.is_relative_to(ROOT) else path
+        h.update(f"{rel}\0{file_digest(path) or '-'}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def text_digest(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def checker_version(*module_names: str) -> str:
+    """Version a checker by the source of the modules that implement it."""
+    files = [Path(sys.modules[name].__file__) for name in module_names]
+    return inputs_digest(files)[:16]
+
+
+class ResultCache:
+    """Per-check JSON store of ``item -> (digest, result)``.
+
+    Entries are dropped wholesale when the checker version changes and
+    individually when the item's digest no longer matches.
+    """
+
+    def __init__(self, name: str, version: str, enabled: bool = True, root: Path = CACHE_DIR):
+        self.path = root / f"{name}.json"
+        self.version = version
+        self.enabled = enabled
+        self.entries: dict[str, list] = {}
+        self.touched: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        if enabled and self.path.exists():
+            try:
+                payload = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                payload = {}
+            if payload.get("version") == version:
+                self.entries = payload.get("entries", {})
+
+    def get(self, item: str, digest: str) -> tuple[bool, object]:
+        entry = self.entries.get(item) if self.enabled else None
+        if entry is not None and entry[0] == digest:
+            self.touched.add(item)
+            self.hits += 1
+            return True, entry[1]
+        self.misses += 1
+        return False, None
+
+    def put(self, item: str, digest: str, result) -> None:
+        self.entries[item] = [digest, result]
+        self.touched.add(item)
+
+    def save(self, prune: bool = True) -> None:
+        """Write entries back. With ``prune`` (full runs) entries not touched
+        this run, i.e. for vanished items, are dropped."""
+        if not self.enabled:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": self.version,
+            "entries": {
+                k: v for k, v in sorted(self.entries.items()) if not prune or k in self.touched
+            },
+        }
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -0,0 +1,98 @@
+"""Git-aware change sets for ``--changed-since`` runs of the checkers."""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import subprocess
+from typing import Iterable
+
+ROOT = Path(__file__).resolve().parents[1]
+SITE_MODULE = Path(__file__).resolve().parent / "_site.py"
+
+
+class ChangeSet:
+    """Repository paths (relative, POSIX) added, modified or deleted since a ref.
+
+    Renames count as a deletion of the old path plus an addition of the new one,
+    so pages still linking to the old name get re-checked.
+    """
+
+    def __init__(self, ref: str, added: set[str], modified: set[str], deleted: set[str]):
+        self.ref = ref
+        self.added = added
+        self.modified = modified
+        self.deleted = deleted
+
+    @property
+    def touched(self) -> set[str]:
+        return self.added | self.modified | self.deleted
+
+    @classmethod
+    def from_git(cls, ref: str, root: Path = ROOT) -> "ChangeSet":
+        diff = subprocess.run(
+            ["git", "diff", "--name-status", "-z", "-M", "--no-color", ref, "--"],
+            cwd=root, capture_output=True, check=True,
+        ).stdout.decode("utf-8").split("\0")
+        added: set[str] = set()
+        modified: set[str] = set()
+        deleted: set[str] = set()
+        i = 0
+        while i < len(diff) and diff[i]:
+            status = diff[i]
+            if status[0] in "RC":
+                old, new = diff[i + 1], diff[i + 2]
+                if status[0] == "R":
+                    deleted.add(old)
+                added.add(new)
+                i += 3
+                continue
+            path = diff[i + 1]
+            {"A": added, "D": deleted}.get(status[0], modified).add(path)
+            i += 2
+        untracked = subprocess.run(
+            ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+            cwd=root, capture_output=True, check=True,
+        ).stdout.decode("utf-8").split("\0")
+        added.update(p for p in untracked if p)
+        return cls(ref, added, modified, deleted)
+
+    def touches(self, paths: Iterable[Path]) -> bool:
+        touched = self.touched
+        return any(_rel(path) in touched for path in paths)
+
+    def select_pages(self, pages: list, sources: Iterable[Path] = ()) -> list:
+        """Pages to re-check: all of them when the checker itself changed,
+        otherwise only the changed ones. Checks that depend on other files
+        (links, PDFs) take their affected edges from the link graph instead."""
+        if self.touches([*sources, SITE_MODULE]):
+            return pages
+        return [page for page in pages if page.name in self.touched]
+
+    def describe(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.modified)} modified, "
+            f"{len(self.deleted)} deleted since {self.ref}"
+        )
+
+
+def _rel(path: Path) -> str:
+    path = Path(path).resolve()
+    return path.relative_to(ROOT).as_posix() if path.is_relative_to(ROOT) else path.as_posix()
+
+
+def add_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="Only check files changed since this git ref (plus files that depend on them).",
+    )
+
+
+def from_args(args: argparse.Namespace, parser: argparse.ArgumentParser) -> ChangeSet | None:
+    """The change set ``--changed-since`` asks for; an unknown ref is a usage error."""
+    if not args.changed_since:
+        return None
+    try:
+        return ChangeSet.from_git(args.changed_since)
+    except subprocess.CalledProcessError:
+        parser.error(f"--changed-since: unknown git ref {args.changed_since!r}")
@@ -0,0 +1,108 @@
+"""Keep-alive HTTP connection pool with a per-host concurrency cap."""
+from __future__ import annotations
+
+from collections import defaultdict
+import http.client
+import threading
+from urllib.parse import urlsplit
+
+USER_AGENT = "EFI-LinkCheck/1.0"
+# Bodies larger than this are not drained; the connection is dropped instead.
+MAX_DRAIN_BYTES = 256 * 1024
+
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class Response:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class ConnectionPool:
+    """Reuse ``http.client`` connections per (scheme, host) across threads.
+
+    At most ``per_host`` requests are in flight to one host at a time; idle
+    connections are parked and handed to the next request for that host.
+    """
+
+    def __init__(self, per_host: int = 4, timeout: float = 8.0, user_agent: str = USER_AGENT):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._lock = threading.Lock()
+        self._slots: dict[tuple[str, str], threading.BoundedSemaphore] = {}
+        self._idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = defaultdict(list)
+        self.opened = 0
+
+    def _slot(self, key: tuple[str, str]) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._slots.get(key)
+            if sem is None:
+                sem = self._slots[key] = threading.BoundedSemaphore(self.per_host)
+            return sem
+
+    def _connect(self, key: tuple[str, str]) -> http.client.HTTPConnection:
+        with self._lock:
+            self.opened += 1
+        scheme, netloc = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(netloc, timeout=self.timeout)
+
+    def _checkout(self, key: tuple[str, str]) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle[key]:
+                return self._idle[key].pop(), True
+        return self._connect(key), False
+
+    def _checkin(self, key: tuple[str, str], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle[key].append(conn)
+
+    def request(self, method: str, url: str, headers: dict[str, str] | None = None) -> Response:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        send_headers = {"User-Agent": self.user_agent, "Accept": "*/*"}
+        send_headers.update(headers or {})
+        with self._slot(key):
+            conn, reused = self._checkout(key)
+            try:
+                try:
+                    conn.request(method, path, headers=send_headers)
+                    resp = conn.getresponse()
+                except _STALE_ERRORS:
+                    if not reused:
+                        raise
+                    # The server dropped an idle keep-alive connection; retry once fresh.
+                    conn.close()
+                    conn = self._connect(key)
+                    conn.request(method, path, headers=send_headers)
+                    resp = conn.getresponse()
+                body = resp.read(MAX_DRAIN_BYTES + 1)
+            except Exception:
+                conn.close()
+                raise
+            response = Response(resp.status, {k.lower(): v for k, v in resp.getheaders()}, body[:MAX_DRAIN_BYTES])
+            if len(body) > MAX_DRAIN_BYTES or resp.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            return response
+
+    def close(self) -> None:
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
@@ -0,0 +1,247 @@
+"""Conservative, dependency-free minifiers for the site's CSS, JS and SVG.
+
+Each minifier tokenizes just enough to leave strings, template literals,
+regular expressions and comments-inside-strings untouched, and only removes
+comments and whitespace. JS keeps one newline wherever the source had a line
+break so automatic semicolon insertion behaves the same.
+"""
+from __future__ import annotations
+
+import re
+
+_WORD = re.compile(r"[\w$\\\u0080-￿]")
+
+# --- CSS ---------------------------------------------------------------------
+
+# Whitespace around these is never significant outside strings. ``+``, ``-``
+# and ``:`` are left alone (``calc()`` operands, ``a :hover``).
+_CSS_TIGHT = set("{};,>")
+
+
+def css_tokens(css: str):
+    """``(kind, text)`` pairs: ``string``, ``comment``, ``space`` or ``code``."""
+    i, n = 0, len(css)
+    while i < n:
+        ch = css[i]
+        if ch in "\"'":
+            j = i + 1
+            while j < n and css[j] != ch:
+                j += 2 if css[j] == "\\" else 1
+            yield "string", css[i:j + 1]
+            i = j + 1
+        elif css.startswith("/*", i):
+            j = css.find("*/", i + 2)
+            j = n if j < 0 else j + 2
+            yield "comment", css[i:j]
+            i = j
+        elif ch.isspace():
+            j = i
+            while j < n and css[j].isspace():
+                j += 1
+            yield "space", css[i:j]
+            i = j
+        else:
+            j = i
+            while j < n and css[j] not in "\"'" and not css[j].isspace() and not css.startswith("/*", j):
+                j += 1
+            yield "code", css[i:j]
+            i = j
+
+
+def minify_css(css: str) -> str:
+    out: list[str] = []
+    last = ""  # last emitted character
+    pending_space = False
+    for kind, text in css_tokens(css):
+        if kind == "space" or (kind == "comment" and not text.startswith("/*!")):
+            pending_space = True
+            continue
+        if pending_space and last and last not in _CSS_TIGHT and last != ":" and text[0] not in _CSS_TIGHT:
+            out.append(" ")
+        pending_space = False
+        if kind == "code":
+            text = text.replace(";}", "}")
+            if text[0] == "}" and last == ";":
+                out[-1] = out[-1][:-1]
+        out.append(text)
+        last = text[-1]
+    return "".join(out).strip() + "\n"
+
+
+# --- JS ----------------------------------------------------------------------
+
+# After these tokens a '/' starts a regular expression rather than a division.
+_REGEX_AFTER_WORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw",
+    "case", "do", "else", "yield", "await",
+}
+
+
+def _skip_string(src: str, i: int) -> int:
+    quote, n = src[i], len(src)
+    i += 1
+    while i < n and src[i] != quote:
+        if src[i] == "\\":
+            i += 1
+        elif src[i] == "\n":
+            break
+        i += 1
+    return i + 1
+
+
+def _skip_regex(src: str, i: int) -> int:
+    n = len(src)
+    i += 1
+    in_class = False
+    while i < n:
+        ch = src[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            break
+        elif ch == "\n":
+            return i
+        i += 1
+    i += 1
+    while i < n and _WORD.match(src[i]):
+        i += 1
+    return i
+
+
+def _skip_template(src: str, i: int) -> int:
+    """End of the template literal starting at ``src[i] == '`'``, including
+    nested strings, templates and braces inside ``${...}`` substitutions."""
+    n = len(src)
+    i += 1
+    while i < n:
+        ch = src[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "`":
+            return i + 1
+        if src.startswith("${", i):
+            i += 2
+            depth = 1
+            while i < n and depth:
+                ch = src[i]
+                if ch in "\"'":
+                    i = _skip_string(src, i)
+                    continue
+                if ch == "`":
+                    i = _skip_template(src, i)
+                    continue
+                if src.startswith("//", i):
+                    j = src.find("\n", i)
+                    i = n if j < 0 else j
+                    continue
+                if src.startswith("/*", i):
+                    j = src.find("*/", i + 2)
+                    i = n if j < 0 else j + 2
+                    continue
+                depth += ch == "{"
+                depth -= ch == "}"
+                i += 1
+            continue
+        i += 1
+    return n
+
+
+def js_tokens(src: str):
+    """``(kind, text)`` pairs: ``string``, ``template``, ``regex``, ``comment``,
+    ``space``, ``word`` or ``punct``."""
+    i, n = 0, len(src)
+    last = ""  # previous significant token text
+    while i < n:
+        ch = src[i]
+        if ch in "\"'":
+            j = _skip_string(src, i)
+            kind = "string"
+        elif ch == "`":
+            j = _skip_template(src, i)
+            kind = "template"
+        elif src.startswith("//", i):
+            j = src.find("\n", i)
+            j = n if j < 0 else j
+            kind = "comment"
+        elif src.startswith("/*", i):
+            j = src.find("*/", i + 2)
+            j = n if j < 0 else j + 2
+            kind = "comment"
+        elif ch == "/" and (not last or (not _WORD.match(last[-1]) and last[-1] not in ")]")
+                            or last in _REGEX_AFTER_WORDS):
+            j = _skip_regex(src, i)
+            kind = "regex"
+        elif ch.isspace():
+            j = i
+            while j < n and src[j].isspace():
+                j += 1
+            kind = "space"
+        elif _WORD.match(ch):
+            j = i
+            while j < n and (_WORD.match(src[j]) or (src[j] == "." and src[i].isdigit())):
+                j += 1
+            kind = "word"
+        else:
+            j = i + 1
+            kind = "punct"
+        text = src[i:j]
+        if kind not in ("space", "comment"):
+            last = text
+        yield kind, text
+        i = j
+
+
+def _needs_space(prev: str, nxt: str) -> bool:
+    a, b = prev[-1], nxt[0]
+    if _WORD.match(a) and _WORD.match(b):
+        return True
+    # Keep "a - -b", "a + +b" and "x / /re/" apart.
+    return (a, b) in {("+", "+"), ("-", "-"), ("/", "/")}
+
+
+def minify_js(src: str, rewrite_string=None) -> str:
+    """Drop comments and collapse whitespace, keeping line breaks as ``\\n``.
+
+    ``rewrite_string`` optionally maps each string literal's text (with quotes)
+    to a replacement.
+    """
+    out: list[str] = []
+    gap = ""  # "" none, " " space, "\n" line break
+    for kind, text in js_tokens(src):
+        if kind == "comment" and not text.startswith("/*!"):
+            if "\n" in text or text.startswith("//"):
+                gap = "\n" if "\n" in text else (gap or " ")
+            else:
+                gap = gap or " "
+            continue
+        if kind == "space":
+            gap = "\n" if "\n" in text or gap == "\n" else (gap or " ")
+            continue
+        if kind == "string" and rewrite_string is not None:
+            text = rewrite_string(text)
+        if out and gap == "\n":
+            out.append("\n")
+        elif out and gap and _needs_space(out[-1], text):
+            out.append(" ")
+        gap = ""
+        out.append(text)
+    return "".join(out).strip() + "\n"
+
+
+# --- SVG ---------------------------------------------------------------------
+
+_SVG_COMMENT = re.compile(r"<!--.*?-->", re.S)
+# Indentation between tags; whitespace without a line break may be text.
+_SVG_INDENT = re.compile(r">\s*\n\s*<")
+_SVG_STYLE = re.compile(r"(<style\b[^>]*>)(?!\s*<!\[CDATA\[)(.*?)(</style>)", re.S)
+
+
+def minify_svg(svg: str) -> str:
+    svg = _SVG_STYLE.sub(lambda m: m.group(1) + minify_css(m.group(2)).strip() + m.group(3), svg)
+    return _SVG_INDENT.sub("><", _SVG_COMMENT.sub("", svg)).strip() + "\n"
@@ -0,0 +1,72 @@
+"""Per-check timing and memory accounting for release gate reports."""
+from __future__ import annotations
+
+import contextlib
+import time
+import tracemalloc
+
+
+class Meter:
+    """Accumulated wall/CPU time, peak traced memory and per-page cost of one check.
+
+    Peak memory is only recorded while ``tracemalloc`` is tracing; subprocess
+    steps fill in ``peak_kb`` from their max RSS instead.
+    """
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_kb: int | None = None
+        self.memory = "tracemalloc"
+        self.files = 0
+        self.pages: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def measure(self, page: str | None = None):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield self
+        finally:
+            wall = time.perf_counter() - wall
+            self.wall += wall
+            self.cpu += time.process_time() - cpu
+            if tracing:
+                peak = max(0, tracemalloc.get_traced_memory()[1] - base) // 1024
+                self.peak_kb = max(self.peak_kb or 0, peak)
+            if page is not None:
+                self.pages[page] = self.pages.get(page, 0.0) + wall
+
+    def merge(self, other: "Meter") -> None:
+        self.wall += other.wall
+        self.cpu += other.cpu
+        if other.peak_kb is not None:
+            self.peak_kb = max(self.peak_kb or 0, other.peak_kb)
+        for page, seconds in other.pages.items():
+            self.pages[page] = self.pages.get(page, 0.0) + seconds
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Meter":
+        """Rebuild a meter from ``as_dict`` output; ``files`` is left at 0 and
+        per-page costs are limited to the slowest pages that were kept."""
+        meter = cls()
+        meter.wall = data["wall"]
+        meter.cpu = data["cpu"]
+        meter.peak_kb = data["peak_kb"]
+        meter.memory = data["memory"] or meter.memory
+        meter.pages = {page: seconds for page, seconds in data["slowest"]}
+        return meter
+
+    def as_dict(self, slowest: int = 5) -> dict:
+        top = sorted(self.pages.items(), key=lambda item: -item[1])[:slowest]
+        return {
+            "wall": round(self.wall, 6),
+            "cpu": round(self.cpu, 6),
+            "files": self.files,
+            "peak_kb": self.peak_kb,
+            "memory": self.memory if self.peak_kb is not None else None,
+            "slowest": [[page, round(seconds, 6)] for page, seconds in top],
+        }
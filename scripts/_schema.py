@@ -0,0 +1,441 @@
+"""Declarative JSON schemas compiled to validator closures, and a streaming reader.
+
+Schemas use a JSON Schema subset: ``type``, ``enum``, ``properties``,
+``required``, ``additionalProperties`` (bool or schema), ``propertyNames``,
+``minProperties``, ``items``, ``minItems``/``maxItems``, ``uniqueItems``,
+``minLength``/``maxLength``, ``pattern`` (searched; like ``format``, not applied
+to empty strings, which ``minLength`` covers), ``minimum``/``maximum``
+and ``format`` (``date``, ``uri``). Extensions:
+
+- ``uniqueBy``: on an array of objects, the named field is unique (empty values are skipped);
+- ``indexOf``: on an integer property, the value indexes the named sibling array;
+- ``collect``: the value (or, under ``propertyNames``, the key) and its path
+  are appended to ``buckets[name]`` for cross-file checks.
+
+Each schema is compiled once; the walk over the data then runs closures only.
+Paths are linked tuples built as the walk descends and rendered only for errors.
+"""
+from __future__ import annotations
+
+from datetime import date
+import json
+import re
+from typing import Any, Callable, Iterator
+
+Where = tuple  # () or (parent Where, key)
+Validator = Callable[[Any, Where, list], None]
+Buckets = dict[str, list[tuple[Any, Where]]]
+
+_TYPES: dict[str, tuple[type, ...]] = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+    "null": (type(None),),
+}
+_FORMATS: dict[str, Callable[[str], bool]] = {
+    "date": lambda value: _is_date(value),
+    "uri": lambda value: re.match(r"https?://[^\s/]+\S*$", value) is not None,
+}
+
+
+def _is_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return len(value) == 10
+
+
+def render(path: Where) -> str:
+    keys = []
+    while path:
+        path, key = path
+        keys.append(key)
+    out = ""
+    for key in reversed(keys):
+        out += f"[{key}]" if isinstance(key, int) else (f".{key}" if out else str(key))
+    return out or "(root)"
+
+
+def _show(value: Any) -> str:
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= 40 else text[:37] + "..."
+
+
+def _fail(errors: list, path: Where, message: str) -> None:
+    errors.append(f"{render(path)}: {message}")
+
+
+def _type_check(names: list[str]) -> Callable[[Any], bool]:
+    kinds = tuple(kind for name in names for kind in _TYPES[name])
+    # bool is an int subclass; only "boolean" accepts it.
+    if int in kinds and "boolean" not in names:
+        return lambda value: isinstance(value, kinds) and not isinstance(value, bool)
+    return lambda value: isinstance(value, kinds)
+
+
+class Container:
+    """Incremental checks for an array or an object-as-map, fed one member at a
+    time so a streamed container is validated without being held in memory."""
+
+    def __init__(self, schema: dict, buckets: Buckets):
+        self.is_array = schema.get("type") == "array" or "items" in schema
+        if self.is_array:
+            self.member_check = compile_schema(schema.get("items", {}), buckets)
+            self.key_check = None
+            self.low, self.high = schema.get("minItems"), schema.get("maxItems")
+        else:
+            self.member_check = compile_schema(schema.get("additionalProperties", {}), buckets) \
+                if isinstance(schema.get("additionalProperties", {}), dict) else None
+            self.key_check = compile_schema(schema["propertyNames"], buckets) if "propertyNames" in schema else None
+            self.low, self.high = schema.get("minProperties"), schema.get("maxProperties")
+        self.unique_by = schema.get("uniqueBy")
+        self.unique_items = bool(schema.get("uniqueItems"))
+
+    def start(self) -> dict:
+        return {"count": 0, "seen": {}}
+
+    def member(self, state: dict, key: Any, value: Any, path: Where, errors: list) -> None:
+        state["count"] += 1
+        child = (path, key)
+        if self.key_check is not None:
+            self.key_check(key, (path, key), errors)
+        if self.member_check is not None:
+            self.member_check(value, child, errors)
+        if self.unique_by is not None and isinstance(value, dict):
+            marker = value.get(self.unique_by)
+            if marker not in (None, ""):
+                self._unique(state, ("by", _hashable(marker)), child, errors, self.unique_by, marker)
+        if self.unique_items:
+            self._unique(state, ("item", _hashable(value)), child, errors, "item", value)
+
+    @staticmethod
+    def _unique(state: dict, marker: Any, path: Where, errors: list, noun: str, value: Any) -> None:
+        first = state["seen"].setdefault(marker, path)
+        if first is not path:
+            _fail(errors, path, f"duplicate {noun} {_show(value)} (first at {render(first)})")
+
+    def finish(self, state: dict, path: Where, errors: list) -> None:
+        noun = "items" if self.is_array else "entries"
+        if self.low is not None and state["count"] < self.low:
+            _fail(errors, path, f"needs at least {self.low} {noun}, has {state['count']}")
+        if self.high is not None and state["count"] > self.high:
+            _fail(errors, path, f"allows at most {self.high} {noun}, has {state['count']}")
+
+
+def _hashable(value: Any) -> Any:
+    return json.dumps(value, sort_keys=True) if isinstance(value, (dict, list)) else value
+
+
+def compile_schema(schema: dict, buckets: Buckets | None = None) -> Validator:
+    """A validator ``(value, path, errors)`` that appends ``"path: message"`` strings."""
+    buckets = {} if buckets is None else buckets
+    checks: list[Validator] = []
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+        allowed_set = {_hashable(option) for option in allowed}
+
+        def check_enum(value, path, errors):
+            if _hashable(value) not in allowed_set:
+                _fail(errors, path, f"{_show(value)} is not one of {', '.join(map(_show, allowed))}")
+        checks.append(check_enum)
+
+    if "minLength" in schema or "maxLength" in schema or "pattern" in schema or "format" in schema:
+        low, high = schema.get("minLength"), schema.get("maxLength")
+        pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+        fmt = schema.get("format")
+        fmt_check = _FORMATS[fmt] if fmt else None
+
+        def check_string(value, path, errors):
+            if not isinstance(value, str):
+                return
+            if low is not None and len(value) < low:
+                _fail(errors, path, "must not be empty" if low == 1 else f"shorter than {low} characters")
+            if high is not None and len(value) > high:
+                _fail(errors, path, f"longer than {high} characters")
+            if pattern is not None and value and pattern.search(value) is None:
+                _fail(errors, path, f"{_show(value)} does not match {pattern.pattern}")
+            if fmt_check is not None and value and not fmt_check(value):
+                _fail(errors, path, f"{_show(value)} is not a valid {fmt}")
+        checks.append(check_string)
+
+    if "minimum" in schema or "maximum" in schema:
+        minimum, maximum = schema.get("minimum"), schema.get("maximum")
+
+        def check_range(value, path, errors):
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return
+            if minimum is not None and value < minimum:
+                _fail(errors, path, f"{value} is below the minimum {minimum}")
+            if maximum is not None and value > maximum:
+                _fail(errors, path, f"{value} is above the maximum {maximum}")
+        checks.append(check_range)
+
+    if "properties" in schema or "required" in schema or "additionalProperties" in schema or "propertyNames" in schema:
+        checks.append(_compile_object(schema, buckets))
+
+    if "items" in schema or "minItems" in schema or "uniqueBy" in schema or "uniqueItems" in schema:
+        container = Container({**schema, "type": "array"}, buckets)
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return
+            state = container.start()
+            for index, item in enumerate(value):
+                container.member(state, index, item, path, errors)
+            container.finish(state, path, errors)
+        checks.append(check_array)
+
+    if "collect" in schema:
+        bucket = buckets.setdefault(schema["collect"], [])
+
+        def collect(value, path, errors):
+            bucket.append((value, path))
+        checks.append(collect)
+
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        type_ok = _type_check(names)
+        expected = " or ".join(names)
+        inner = _chain(checks)
+
+        def check(value, path, errors):
+            if not type_ok(value):
+                _fail(errors, path, f"expected {expected}, got {_show(value)}")
+            elif inner is not None:
+                inner(value, path, errors)
+        return check
+    return _chain(checks) or (lambda value, path, errors: None)
+
+
+def _chain(checks: list[Validator]) -> Validator | None:
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+
+    def run_all(value, path, errors):
+        for check in checks:
+            check(value, path, errors)
+    return run_all
+
+
+def _compile_object(schema: dict, buckets: Buckets) -> Validator:
+    properties = {name: compile_schema(sub, buckets) for name, sub in schema.get("properties", {}).items()}
+    index_of = {name: sub["indexOf"] for name, sub in schema.get("properties", {}).items() if "indexOf" in sub}
+    required = schema.get("required", [])
+    extra = schema.get("additionalProperties", True)
+    extra_check = compile_schema(extra, buckets) if isinstance(extra, dict) else None
+    container = Container({**schema, "type": "object"}, buckets) \
+        if "propertyNames" in schema or "minProperties" in schema else None
+
+    def check_object(value, path, errors):
+        if not isinstance(value, dict):
+            return
+        for name in required:
+            if name not in value:
+                _fail(errors, path, f"missing required {name}")
+        for name, item in value.items():
+            check = properties.get(name)
+            if check is not None:
+                check(item, (path, name), errors)
+            elif extra is False:
+                _fail(errors, (path, name), "is not an allowed property")
+            elif extra_check is not None and container is None:
+                extra_check(item, (path, name), errors)
+        for name, sibling in index_of.items():
+            index, options = value.get(name), value.get(sibling)
+            if type(index) is int and isinstance(options, list) and not 0 <= index < len(options):
+                _fail(errors, (path, name), f"{index} is not an index into {sibling} ({len(options)} items)")
+        if container is not None:
+            state = container.start()
+            for name, item in value.items():
+                if name not in properties:
+                    container.member(state, name, item, path, errors)
+            container.finish(state, path, errors)
+    return check_object
+
+
+class Document:
+    """Validates a top-level object from ``iter_document`` events, feeding the
+    streamed member (if any) through a ``Container`` one entry at a time."""
+
+    def __init__(self, schema: dict, stream: str | None, buckets: Buckets):
+        self.schema = schema
+        self.stream = stream
+        members = {name: sub for name, sub in schema.get("properties", {}).items() if name != stream}
+        self.root = compile_schema({**schema, "properties": members,
+                                    "required": [name for name in schema.get("required", []) if name != stream]},
+                                   buckets)
+        self.container = Container(schema["properties"][stream], buckets) if stream else None
+
+    def validate(self, events: Iterator[tuple[str, Any, Any]], errors: list) -> None:
+        top: dict[str, Any] = {}
+        state = None
+        for kind, key, value in events:
+            if kind == "member":
+                top[key] = value
+                if key == self.stream:
+                    expected = "array" if self.container.is_array else "object"
+                    _fail(errors, ((), key), f"expected {expected}, got {_show(value)}")
+            elif kind == "item":
+                if state is None:
+                    state = self.container.start()
+                self.container.member(state, key, value, ((), self.stream), errors)
+            elif kind == "stream":
+                # The streamed member's type, seen before its entries.
+                top[key] = value
+                expected = "array" if self.container.is_array else "object"
+                if value != expected:
+                    _fail(errors, ((), key), f"expected {expected}, got {value}")
+        if self.container is not None:
+            if self.stream in top:
+                self.container.finish(state or self.container.start(), ((), self.stream), errors)
+            elif self.stream in self.schema.get("required", []):
+                _fail(errors, (), f"missing required {self.stream}")
+            top.pop(self.stream, None)
+        self.root(top, (), errors)
+
+
+def iter_document(text_or_handle, stream: str | None = None, chunk_size: int = 1 << 16):
+    """Events for a JSON document whose root is an object.
+
+    ``("member", name, value)`` for each top-level member, except ``stream``,
+    which is reported as ``("stream", name, "array"|"object")`` followed by
+    ``("item", index_or_key, value)`` per entry. A string is parsed with
+    ``json.loads``; a file handle is read ``chunk_size`` characters at a time.
+    """
+    if isinstance(text_or_handle, str):
+        data = json.loads(text_or_handle)
+        if not isinstance(data, dict):
+            raise ValueError("top level must be an object")
+        for name, value in data.items():
+            if name == stream and isinstance(value, (list, dict)):
+                yield "stream", name, "array" if isinstance(value, list) else "object"
+                entries = enumerate(value) if isinstance(value, list) else value.items()
+                for key, item in entries:
+                    yield "item", key, item
+            else:
+                yield "member", name, value
+        return
+    reader = _Reader(text_or_handle, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.take()
+    else:
+        while True:
+            name = reader.value()
+            if not isinstance(name, str):
+                reader.error("expected a property name")
+            reader.expect(":")
+            if name == stream and reader.peek() in "[{":
+                yield from _stream_entries(reader, name)
+            else:
+                yield "member", name, reader.value()
+            if reader.take_one_of(",}") == "}":
+                break
+    if reader.peek() != "":
+        reader.error("extra data after the top-level object")
+
+
+def _stream_entries(reader: _Reader, name: str):
+    opener = reader.take()
+    closer = "]" if opener == "[" else "}"
+    yield "stream", name, "array" if opener == "[" else "object"
+    if reader.peek() == closer:
+        reader.take()
+        return
+    index = 0
+    while True:
+        if opener == "[":
+            yield "item", index, reader.value()
+            index += 1
+        else:
+            key = reader.value()
+            if not isinstance(key, str):
+                reader.error("expected a property name")
+            reader.expect(":")
+            yield "item", key, reader.value()
+        if reader.take_one_of("," + closer) == closer:
+            return
+
+
+class _Reader:
+    """Chunked JSON tokenizer over a text handle, for values one at a time."""
+
+    _decoder = json.JSONDecoder()
+    _SPACE = re.compile(r"[ \t\n\r]*")
+    _NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+    def __init__(self, handle, chunk_size: int):
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.line = 1  # line number of buf[0]
+        self.eof = False
+
+    def _fill(self, size: int | None = None) -> bool:
+        if self.eof:
+            return False
+        data = self.handle.read(size or self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.line += self.buf.count("\n", 0, self.pos)
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = self._SPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self) -> str:
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    def expect(self, char: str) -> None:
+        if self.take() != char:
+            self.pos -= 1
+            self.error(f"expected {char!r}")
+
+    def take_one_of(self, chars: str) -> str:
+        char = self.take()
+        if char == "" or char not in chars:
+            self.pos -= 1
+            self.error(f"expected one of {', '.join(map(repr, chars))}")
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as err:
+                if self._fill(size):
+                    size *= 2
+                    continue
+                self.error(err.msg, err.pos)
+            # A value followed only by number characters up to the buffer end
+            # may be a number cut at a chunk boundary (``1.`` of ``1.5``).
+            if self._NUMBER_TAIL.match(self.buf, end).end() == len(self.buf) and self._fill(size):
+                size *= 2
+                continue
+            self.pos = end
+            return value
+
+    def error(self, message: str, pos: int | None = None):
+        pos = self.pos if pos is None else pos
+        line = self.line + self.buf.count("\n", 0, pos)
+        raise ValueError(f"{message} (line {line})")
@@ -0,0 +1,80 @@
+"""Deterministic work partitioning and partial-result files for sharded gate runs."""
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+from _profile import Meter
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """``"2/4"`` -> ``(2, 4)``; shards are numbered from 1."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"expected INDEX/COUNT, got {spec!r}") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"shard index must be between 1 and {count}, got {index}")
+    return index, count
+
+
+def owner(key: str, count: int) -> int:
+    """The shard (1-based) that owns ``key``, stable across runs and machines."""
+    return int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16) % count + 1
+
+
+def owns(shard: tuple[int, int] | None, key: str) -> bool:
+    return shard is None or owner(key, shard[1]) == shard[0]
+
+
+def write_partial(path: Path, shard: tuple[int, int], results: dict, slowest: int) -> None:
+    payload = {
+        "shard": list(shard),
+        "results": {
+            label: [rc, output, note, meter.as_dict(slowest)]
+            for label, (rc, output, note, meter) in results.items()
+        },
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=1) + "\n", encoding="utf-8")
+
+
+def merge(paths: list[Path], labels: list[str]) -> dict:
+    """Combine partial result files into one result per label.
+
+    Raises ``ValueError`` unless the files are exactly shards 1..N of one run
+    and every label was produced by at least one of them.
+    """
+    partials = [json.loads(path.read_text(encoding="utf-8")) for path in paths]
+    counts = {partial["shard"][1] for partial in partials}
+    if len(counts) != 1:
+        raise ValueError(f"shard files come from runs with different shard counts: {sorted(counts)}")
+    count = counts.pop()
+    indexes = sorted(partial["shard"][0] for partial in partials)
+    if indexes != list(range(1, count + 1)):
+        raise ValueError(f"expected shards 1..{count}, got {indexes}")
+
+    merged: dict = {}
+    for label in labels:
+        parts = [
+            (partial["shard"][0], partial["results"][label])
+            for partial in sorted(partials, key=lambda p: p["shard"][0])
+            if label in partial["results"]
+        ]
+        if not parts:
+            raise ValueError(f"no shard ran {label!r}")
+        meter = Meter()
+        outputs = []
+        for index, (rc, output, note, metrics) in parts:
+            meter.merge(Meter.from_dict(metrics))
+            meter.files += metrics["files"]
+            if output and len(parts) > 1:
+                outputs.append(f"[shard {index}/{count}]\n{output}")
+            elif output:
+                outputs.append(output)
+        rc = max(part[1][0] for part in parts)
+        notes = {part[1][2] for part in parts}
+        note = notes.pop() if len(notes) == 1 else f"merged from {len(parts)} shards"
+        merged[label] = (rc, "".join(out if out.endswith("\n") else out + "\n" for out in outputs), note, meter)
+    return merged
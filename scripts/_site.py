@@ -0,0 +1,228 @@
+"""Shared page model so every checker reads and tokenizes a page only once."""
+from __future__ import annotations
+
+from bisect import bisect_left
+import hashlib
+from html.parser import HTMLParser
+from pathlib import Path
+import re
+from typing import Callable, Iterable
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Event kinds recorded for each page: (kind, tag_or_data, attrs, line).
+START = 0
+END = 1
+DATA = 2
+
+_NEWLINE = re.compile("\n")
+
+
+class _Recorder(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.events: list[tuple] = []
+
+    def handle_starttag(self, tag, attrs):
+        self.events.append((START, tag, tuple(attrs), self.getpos()[0]))
+
+    def handle_startendtag(self, tag, attrs):
+        line = self.getpos()[0]
+        self.events.append((START, tag, tuple(attrs), line))
+        self.events.append((END, tag, None, line))
+
+    def handle_endtag(self, tag):
+        self.events.append((END, tag, None, self.getpos()[0]))
+
+    def handle_data(self, data):
+        self.events.append((DATA, data, None, self.getpos()[0]))
+
+
+class Page:
+    """One HTML page: raw text, its tag/text event stream and a newline index.
+
+    Events, the newline index and the content digest are computed on first
+    use, so pages whose results come from a cache are never tokenized.
+    """
+
+    __slots__ = ("path", "name", "text", "stamp", "_events", "_newlines", "_digest")
+
+    def __init__(self, path: Path, text: str, stamp: tuple[int, int] = (0, 0)):
+        self.path = path
+        self.name = path.name
+        self.text = text
+        self.stamp = stamp
+        self._events: list[tuple] | None = None
+        self._newlines: list[int] | None = None
+        self._digest: str | None = None
+
+    @property
+    def events(self) -> list[tuple]:
+        if self._events is None:
+            recorder = _Recorder()
+            recorder.feed(self.text)
+            recorder.close()
+            self._events = recorder.events
+        return self._events
+
+    @property
+    def newlines(self) -> list[int]:
+        if self._newlines is None:
+            self._newlines = [m.start() for m in _NEWLINE.finditer(self.text)]
+        return self._newlines
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+        return self._digest
+
+    def line_for_offset(self, offset: int) -> int:
+        return bisect_left(self.newlines, offset) + 1
+
+
+class PageVisitor:
+    """Base for checks that consume a Page's events instead of raw HTML.
+
+    Subclasses implement the same hooks as ``HTMLParser``; ``lineno`` holds the
+    source line of the event currently being dispatched. ``result`` returns the
+    JSON-serializable findings for the page, which is what gets cached.
+    """
+
+    lineno = 0
+
+    def __init__(self, page: Page):
+        self.page = page
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        pass
+
+    def handle_endtag(self, tag: str) -> None:
+        pass
+
+    def handle_data(self, data: str) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def result(self):
+        return None
+
+
+_PAGE_CACHE: dict[Path, Page] = {}
+
+
+def load_page(path: Path) -> Page:
+    """Return the page, re-reading only when the file changed on disk."""
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _PAGE_CACHE.get(path)
+    if cached is not None and cached.stamp == stamp:
+        return cached
+    page = Page(path, path.read_text(encoding="utf-8", errors="ignore"), stamp)
+    _PAGE_CACHE[path] = page
+    return page
+
+
+def load_pages(root: Path = ROOT, ignored: Iterable[str] = ()) -> list[Page]:
+    skip = set(ignored)
+    return [load_page(p) for p in sorted(root.glob("*.html")) if p.name not in skip]
+
+
+def _overrides(visitor: PageVisitor, hook: str) -> bool:
+    return getattr(type(visitor), hook) is not getattr(PageVisitor, hook)
+
+
+def visit(
+    pages: Iterable[Page],
+    visitors: dict[str, Callable[[Page], PageVisitor]],
+    meters: dict | None = None,
+) -> dict[str, list[PageVisitor]]:
+    """Replay each page's events once, dispatching to every visitor factory.
+
+    Returns the finished visitor instances grouped by key, in page order.
+    Visitors that implement no event hooks never trigger tokenization.
+
+    ``meters`` (key -> ``_profile.Meter``) switches to profiling: each page is
+    tokenized under the ``"parse"`` meter, then replayed to one visitor at a
+    time so every key's cost per page is measured separately.
+    """
+    if meters is not None:
+        return _visit_metered(pages, visitors, meters)
+    results: dict[str, list[PageVisitor]] = {key: [] for key in visitors}
+    for page in pages:
+        active = [(key, factory(page)) for key, factory in visitors.items()]
+        instances = [v for _, v in active]
+        starts = [v for v in instances if _overrides(v, "handle_starttag")]
+        ends = [v for v in instances if _overrides(v, "handle_endtag")]
+        datas = [v for v in instances if _overrides(v, "handle_data")]
+        if starts or ends or datas:
+            for kind, value, attrs, line in page.events:
+                if kind == START:
+                    for v in starts:
+                        v.lineno = line
+                        v.handle_starttag(value, attrs)
+                elif kind == DATA:
+                    for v in datas:
+                        v.lineno = line
+                        v.handle_data(value)
+                else:
+                    for v in ends:
+                        v.lineno = line
+                        v.handle_endtag(value)
+        for key, v in active:
+            v.close()
+            results[key].append(v)
+    return results
+
+
+def _visit_metered(pages, visitors, meters) -> dict[str, list[PageVisitor]]:
+    results: dict[str, list[PageVisitor]] = {key: [] for key in visitors}
+    for page in pages:
+        if page._events is None:
+            with meters["parse"].measure(page.name):
+                page.events
+        for key, factory in visitors.items():
+            with meters[key].measure(page.name):
+                (v,) = visit([page], {key: factory})[key]
+            results[key].append(v)
+    return results
+
+
+def scan(
+    pages: Iterable[Page],
+    visitors: dict[str, Callable[[Page], PageVisitor]],
+    caches: dict | None = None,
+    meters: dict | None = None,
+) -> dict[str, list[tuple[str, object]]]:
+    """Collect ``(page name, result)`` pairs per visitor key, in page order.
+
+    ``caches`` optionally maps a visitor key to a ``_cache.ResultCache``; pages
+    whose content digest is already cached for that key are not visited.
+    ``meters`` is passed through to ``visit``.
+    """
+    caches = caches or {}
+    results: dict[str, list[tuple[str, object]]] = {key: [] for key in visitors}
+    for page in pages:
+        found: dict[str, object] = {}
+        pending: dict[str, Callable[[Page], PageVisitor]] = {}
+        for key, factory in visitors.items():
+            cache = caches.get(key)
+            if cache is not None:
+                hit, value = cache.get(page.name, page.digest)
+                if hit:
+                    found[key] = value
+                    continue
+            pending[key] = factory
+        if pending:
+            for key, (v,) in visit([page], pending, meters).items():
+                found[key] = v.result()
+                cache = caches.get(key)
+                if cache is not None:
+                    cache.put(page.name, page.digest, found[key])
+        for key in visitors:
+            results[key].append((page.name, found[key]))
+            if meters is not None:
+                meters[key].files += 1
+    return results
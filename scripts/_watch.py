@@ -0,0 +1,96 @@
+"""Stat-polling file watcher for ``release_gate.py --watch`` (stdlib only)."""
+from __future__ import annotations
+
+from fnmatch import fnmatch
+import os
+from pathlib import Path
+import time
+from typing import Iterable
+
+from _changes import ChangeSet
+
+ROOT = Path(__file__).resolve().parents[1]
+
+Snapshot = dict[str, tuple[int, int]]
+
+
+def _ignored(name: str) -> bool:
+    # Editor swap/backup files and dotfiles.
+    return name.startswith((".", "#")) or name.endswith(("~", ".swp", ".tmp"))
+
+
+class Watcher:
+    """Detect added, modified and deleted files by comparing stat snapshots.
+
+    ``top_level`` patterns match files in the repo root; ``trees`` are
+    directories scanned recursively.
+    """
+
+    def __init__(self, top_level: Iterable[str], trees: Iterable[str], root: Path = ROOT,
+                 interval: float = 0.25, settle: float = 0.05):
+        self.root = root
+        self.top_level = list(top_level)
+        self.trees = list(trees)
+        self.interval = interval
+        self.settle = settle
+        self.state = self.snapshot()
+
+    def _scan(self, directory: str, recursive: bool, out: Snapshot) -> None:
+        try:
+            entries = list(os.scandir(self.root / directory))
+        except OSError:
+            return
+        for entry in entries:
+            if _ignored(entry.name):
+                continue
+            rel = f"{directory}/{entry.name}" if directory else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    self._scan(rel, True, out)
+                continue
+            if not recursive and not any(fnmatch(entry.name, p) for p in self.top_level):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            out[rel] = (st.st_mtime_ns, st.st_size)
+
+    def snapshot(self) -> Snapshot:
+        out: Snapshot = {}
+        self._scan("", False, out)
+        for tree in self.trees:
+            self._scan(tree, True, out)
+        return out
+
+    def poll(self) -> ChangeSet | None:
+        """Changes since the previous poll, or None when nothing changed."""
+        current = self.snapshot()
+        previous, self.state = self.state, current
+        if current == previous:
+            return None
+        added = current.keys() - previous.keys()
+        deleted = previous.keys() - current.keys()
+        modified = {p for p in current.keys() & previous.keys() if current[p] != previous[p]}
+        return ChangeSet("last run", set(added), modified, set(deleted))
+
+    def wait(self) -> ChangeSet:
+        """Block until something changes, then let bursts (save + rename) settle."""
+        while True:
+            changes = self.poll()
+            if changes is not None:
+                break
+            time.sleep(self.interval)
+        while True:
+            time.sleep(self.settle)
+            more = self.poll()
+            if more is None:
+                return changes
+            # A file added then modified in one burst is still just added.
+            changes.modified |= more.modified - changes.added
+            changes.added |= more.added - changes.deleted
+            changes.modified |= more.added & changes.deleted
+            changes.deleted -= more.added
+            changes.deleted |= more.deleted - changes.added
+            changes.added -= more.deleted
+            changes.modified -= more.deleted
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""Stream efi_events exports into compact, re-queryable analytics rollups.
+
+Exports are JSONL or CSV dumps of the ``efi_events`` table
+(docs/supabase-schema.sql), given as files or directories of segment files.
+Rows are read one at a time, so memory does not grow with the export. The
+rollup keeps:
+
+- event counts per ``event_name`` x ``page`` x UTC day, as uint32/uint64
+  columns in ``counts.<n>.bin`` (read back with ``array.fromfile``);
+- HyperLogLog sketches of distinct visitors per day, page and event, in
+  ``sketches.<n>.bin``. Day sketches merge for any date range. A visitor is
+  the first ``x-forwarded-for`` address plus user agent from ``context``;
+- step counts for the funnels in scripts/rules/funnels.json, plus the
+  visitors still inside a session, so a funnel can continue across runs.
+
+``rollup.json`` holds the dimension tables and the byte offset reached in
+each segment. Re-runs read only what was appended since. A segment whose
+start changed, or that shrank, was rewritten and needs ``--rebuild``. A
+final line without a newline is left for the next run unless it is a
+complete row. Segments are expected in time order (as exported): funnel
+sessions idle for SESSION_GAP before the newest event seen are closed.
+"""
+from __future__ import annotations
+
+import argparse
+from array import array
+from collections import Counter
+import csv
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+import random
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_OUT = ROOT / ".cache" / "analytics"
+FUNNELS_PATH = ROOT / "scripts" / "rules" / "funnels.json"
+FORMAT_VERSION = 1
+EXPORT_SUFFIXES = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+CSV_COLUMNS = ["event_id", "at", "event_name", "page", "source", "properties", "context"]
+NO_PAGE = "(none)"
+HLL_PRECISION = 12
+SESSION_GAP = 30 * 60
+# Visitors idle for longer than SESSION_GAP leave the funnel state this often.
+PRUNE_EVERY = 50_000
+# Bytes at the start of a segment that must not change between runs.
+HEAD_BYTES = 4096
+# Count columns: name -> array typecode.
+COLUMNS = {"event": "I", "page": "I", "day": "I", "count": "Q"}
+
+_RANK_WEIGHT = [2.0 ** -rank for rank in range(65)]
+
+
+class RollupError(Exception):
+    pass
+
+
+class HyperLogLog:
+    """Distinct-count sketch of ``2**precision`` one-byte registers
+    (standard error about ``1.04 / sqrt(2**precision)``)."""
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: bytes | None = None):
+        self.precision = precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(1 << precision)
+        self._shift = 64 - precision
+        self._mask = (1 << self._shift) - 1
+
+    def add(self, value: int) -> None:
+        """Add a 64-bit hash."""
+        index = value >> self._shift
+        rank = self._shift - (value & self._mask).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(_RANK_WEIGHT[rank] for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+
+def visitor_hash(context) -> int | None:
+    """64-bit hash of the client address and user agent; None when neither is known."""
+    if not isinstance(context, dict):
+        return None
+    address = str(context.get("ip_hint") or "").split(",")[0].strip()
+    agent = str(context.get("user_agent") or "")
+    if not address and not agent:
+        return None
+    digest = hashlib.blake2b(f"{address}\n{agent}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def load_funnels(path: Path = FUNNELS_PATH) -> dict[str, list[str]]:
+    return json.loads(path.read_text(encoding="utf-8"))["funnels"]
+
+
+@dataclass
+class Rollup:
+    dims: dict[str, list[str]] = field(default_factory=lambda: {"event": [], "page": [], "day": []})
+    columns: dict[str, array] = field(default_factory=lambda: {name: array(code) for name, code in COLUMNS.items()})
+    sketches: dict[str, HyperLogLog] = field(default_factory=dict)
+    funnels: dict[str, dict] = field(default_factory=dict)
+    # Funnel name -> visitor hash -> [step reached, time of their last event].
+    open: dict[str, dict[int, list]] = field(default_factory=dict)
+    segments: dict[str, dict] = field(default_factory=dict)
+    rows: int = 0
+    skipped: int = 0
+    latest: float = 0.0
+    generation: int = 0
+
+    def day_range(self) -> tuple[str, str] | None:
+        return (min(self.dims["day"]), max(self.dims["day"])) if self.dims["day"] else None
+
+
+def load(out: Path = DEFAULT_OUT) -> Rollup:
+    """The rollup stored in ``out``; empty when there is none yet."""
+    meta_path = out / "rollup.json"
+    if not meta_path.is_file():
+        return Rollup()
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    if meta.get("version") != FORMAT_VERSION:
+        raise RollupError(f"{meta_path} has format version {meta.get('version')}; rerun with --rebuild")
+    rollup = Rollup(dims=meta["dims"], funnels=meta["funnels"], segments=meta["segments"], rows=meta["rows"],
+                    skipped=meta["skipped"], latest=meta["latest"], generation=meta["generation"])
+    rollup.open = {name: {int(visitor, 16): state for visitor, state in visitors.items()}
+                   for name, visitors in meta["open"].items()}
+    with open(out / f"counts.{rollup.generation}.bin", "rb") as handle:
+        for name, code in COLUMNS.items():
+            column = rollup.columns[name] = array(code)
+            column.fromfile(handle, meta["cells"])
+            if meta["byteorder"] != sys.byteorder:
+                column.byteswap()
+    size = 1 << meta["precision"]
+    with open(out / f"sketches.{rollup.generation}.bin", "rb") as handle:
+        for key in meta["sketches"]:
+            rollup.sketches[key] = HyperLogLog(meta["precision"], handle.read(size))
+    return rollup
+
+
+def save(rollup: Rollup, out: Path = DEFAULT_OUT) -> None:
+    """Write the next generation of binary files, then switch rollup.json to it."""
+    out.mkdir(parents=True, exist_ok=True)
+    previous = rollup.generation
+    rollup.generation += 1
+    with open(out / f"counts.{rollup.generation}.bin", "wb") as handle:
+        for name in COLUMNS:
+            rollup.columns[name].tofile(handle)
+    keys = sorted(rollup.sketches)
+    with open(out / f"sketches.{rollup.generation}.bin", "wb") as handle:
+        for key in keys:
+            handle.write(rollup.sketches[key].registers)
+    meta = {
+        "version": FORMAT_VERSION,
+        "generation": rollup.generation,
+        "byteorder": sys.byteorder,
+        "cells": len(rollup.columns["count"]),
+        "precision": HLL_PRECISION,
+        "dims": rollup.dims,
+        "sketches": keys,
+        "funnels": rollup.funnels,
+        "open": {name: {f"{visitor:016x}": state for visitor, state in visitors.items()}
+                 for name, visitors in rollup.open.items()},
+        "segments": rollup.segments,
+        "rows": rollup.rows,
+        "skipped": rollup.skipped,
+        "latest": rollup.latest,
+    }
+    temporary = out / "rollup.json.tmp"
+    temporary.write_text(json.dumps(meta, indent=1) + "\n", encoding="utf-8")
+    os.replace(temporary, out / "rollup.json")
+    for stale in (f"counts.{previous}.bin", f"sketches.{previous}.bin"):
+        (out / stale).unlink(missing_ok=True)
+
+
+def export_segments(paths: list[Path]) -> list[tuple[str, Path]]:
+    """``(segment name, file)`` for export files and directories of them, in name order."""
+    found: dict[str, Path] = {}
+    for path in paths:
+        files = sorted(p for p in path.iterdir() if p.suffix in EXPORT_SUFFIXES) if path.is_dir() else [path]
+        for file in files:
+            if file.suffix not in EXPORT_SUFFIXES:
+                raise RollupError(f"{file}: expected one of {', '.join(sorted(EXPORT_SUFFIXES))}")
+            if file.name in found and found[file.name] != file:
+                raise RollupError(f"two export segments are named {file.name}")
+            found[file.name] = file
+    return sorted(found.items())
+
+
+def _lines(handle, start: int):
+    """``(line, offset after it)`` from byte ``start``."""
+    handle.seek(start)
+    position = start
+    for line in handle:
+        position += len(line)
+        yield line, position
+
+
+def _jsonl_rows(handle, segment: dict):
+    """Rows from ``segment["offset"]`` on (None when malformed), moving the offset
+    past each; an unterminated, unparseable tail ends the read."""
+    for line, end in _lines(handle, segment["offset"]):
+        if not line.strip():
+            segment["offset"] = end
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            if not line.endswith(b"\n"):
+                return
+            row = None
+        segment["offset"] = end
+        yield row if isinstance(row, dict) else None
+
+
+def _csv_rows(handle, segment: dict, size: int):
+    """Like _jsonl_rows; a row may span lines inside quotes. The header row is
+    kept in ``segment``."""
+    position = segment["offset"]
+
+    def lines():
+        nonlocal position
+        for line, end in _lines(handle, segment["offset"]):
+            position = end
+            yield line.decode("utf-8")
+
+    reader = csv.reader(lines(), strict=True)
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            if position >= size:
+                return
+            raise RollupError(f"malformed CSV before byte {position}: {error}") from None
+        if segment.get("header") is None:
+            segment["header"] = values
+            segment["offset"] = position
+            continue
+        header = segment["header"]
+        if len(values) != len(header) and position >= size:
+            return
+        segment["offset"] = position
+        if len(values) != len(header):
+            yield None
+            continue
+        row = dict(zip(header, values))
+        try:
+            row["context"] = json.loads(row.get("context") or "{}")
+        except ValueError:
+            row["context"] = {}
+        yield row
+
+
+def _timestamp(value) -> float:
+    moment = datetime.fromisoformat(str(value).strip())
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _head(path: Path, length: int) -> str:
+    with open(path, "rb") as handle:
+        return hashlib.sha256(handle.read(length)).hexdigest()
+
+
+def _prepare_funnels(rollup: Rollup, funnels: dict[str, list[str]]) -> None:
+    for name, steps in funnels.items():
+        known = rollup.funnels.get(name)
+        if known is not None and known["steps"] != steps:
+            raise RollupError(f"funnel {name!r} changed since the rollup was built; rerun with --rebuild")
+        rollup.funnels.setdefault(name, {"steps": steps, "counts": [0] * len(steps)})
+        rollup.open.setdefault(name, {})
+
+
+def _prune(rollup: Rollup, now: float) -> None:
+    for visitors in rollup.open.values():
+        for visitor in [v for v, (_, last) in visitors.items() if now - last > SESSION_GAP]:
+            del visitors[visitor]
+
+
+def ingest(paths: list[Path], out: Path = DEFAULT_OUT, funnels: dict[str, list[str]] | None = None,
+           rebuild: bool = False) -> dict[str, int]:
+    """Add new rows from the export ``paths`` to the rollup in ``out``; what was read."""
+    rollup = Rollup() if rebuild else load(out)
+    _prepare_funnels(rollup, load_funnels() if funnels is None else funnels)
+    funnel_steps = [(rollup.funnels[name]["steps"], rollup.funnels[name]["counts"], rollup.open[name])
+                    for name in rollup.funnels]
+    ids = {kind: {value: index for index, value in enumerate(values)} for kind, values in rollup.dims.items()}
+    counts: Counter = Counter()
+    for cell in zip(*(rollup.columns[name] for name in COLUMNS)):
+        counts[cell[:3]] = cell[3]
+    day_ids: dict[int, int] = {}
+    sketches = rollup.sketches
+    stats = {"segments": 0, "unchanged": 0, "rows": 0, "bytes": 0}
+
+    def intern(kind: str, value: str) -> int:
+        index = ids[kind].get(value)
+        if index is None:
+            index = ids[kind][value] = len(rollup.dims[kind])
+            rollup.dims[kind].append(value)
+        return index
+
+    def sketch(key: str) -> HyperLogLog:
+        found = sketches.get(key)
+        if found is None:
+            found = sketches[key] = HyperLogLog()
+        return found
+
+    for name, path in export_segments(paths):
+        size = path.stat().st_size
+        segment = rollup.segments.get(name)
+        if segment is None:
+            segment = {"offset": 0, "head_length": min(size, HEAD_BYTES), "head": _head(path, min(size, HEAD_BYTES))}
+        elif size < segment["offset"] or _head(path, segment["head_length"]) != segment["head"]:
+            raise RollupError(f"{name} was rewritten since it was last read; rerun with --rebuild")
+        if size == segment["offset"]:
+            stats["unchanged"] += 1
+            continue
+        stats["segments"] += 1
+        start = segment["offset"]
+        with open(path, "rb") as handle:
+            rows = _csv_rows(handle, segment, size) if EXPORT_SUFFIXES[path.suffix] == "csv" else _jsonl_rows(handle, segment)
+            for row in rows:
+                try:
+                    at = _timestamp(row["at"])
+                    event = str(row["event_name"])
+                except (TypeError, KeyError, ValueError):
+                    rollup.skipped += 1
+                    continue
+                page = str(row.get("page") or NO_PAGE)
+                day_number = int(at // 86400)
+                day = day_ids.get(day_number)
+                if day is None:
+                    iso = (date(1970, 1, 1) + timedelta(days=day_number)).isoformat()
+                    day = day_ids[day_number] = intern("day", iso)
+                counts[intern("event", event), intern("page", page), day] += 1
+                rollup.rows += 1
+                stats["rows"] += 1
+                if at > rollup.latest:
+                    rollup.latest = at
+                visitor = visitor_hash(row.get("context"))
+                if visitor is None:
+                    continue
+                sketch("day:" + rollup.dims["day"][day]).add(visitor)
+                sketch("page:" + page).add(visitor)
+                sketch("event:" + event).add(visitor)
+                for steps, step_counts, visitors in funnel_steps:
+                    state = visitors.get(visitor)
+                    if state is not None and at - state[1] > SESSION_GAP:
+                        state = None
+                    reached = state[0] if state is not None else -1
+                    step = reached + 1
+                    if step < len(steps) and steps[step] in (page, event):
+                        step_counts[step] += 1
+                        visitors[visitor] = [step, at]
+                    elif state is not None:
+                        state[1] = max(state[1], at)
+                if rollup.rows % PRUNE_EVERY == 0:
+                    _prune(rollup, rollup.latest)
+        stats["bytes"] += segment["offset"] - start
+        rollup.segments[name] = segment
+
+    _prune(rollup, rollup.latest)
+    cells = sorted(counts.items())
+    for position, name in enumerate(COLUMNS):
+        values = [cell[position] for cell, _ in cells] if name != "count" else [count for _, count in cells]
+        rollup.columns[name] = array(COLUMNS[name], values)
+    save(rollup, out)
+    return stats
+
+
+def _day_filter(rollup: Rollup, since: str | None, until: str | None) -> list[bool]:
+    return [(since is None or day >= since) and (until is None or day <= until) for day in rollup.dims["day"]]
+
+
+def totals(rollup: Rollup, by: str, since: str | None = None, until: str | None = None,
+           event: str | None = None, page: str | None = None) -> Counter:
+    """Event counts grouped ``by`` event, page or day, within the filters."""
+    keep = _day_filter(rollup, since, until)
+    wanted = {}
+    for kind, value in (("event", event), ("page", page)):
+        if value is not None:
+            if value not in rollup.dims[kind]:
+                return Counter()
+            wanted[kind] = rollup.dims[kind].index(value)
+    labels = rollup.dims[by]
+    event_id, page_id = wanted.get("event"), wanted.get("page")
+    grouped: Counter = Counter()
+    columns = rollup.columns
+    for key, events, pages, day, count in zip(columns[by], columns["event"], columns["page"], columns["day"],
+                                              columns["count"]):
+        if keep[day] and event_id in (None, events) and page_id in (None, pages):
+            grouped[labels[key]] += count
+    return grouped
+
+
+def distinct(rollup: Rollup, since: str | None = None, until: str | None = None) -> int:
+    """Estimated distinct visitors on the days in range."""
+    union = HyperLogLog()
+    for day, kept in zip(rollup.dims["day"], _day_filter(rollup, since, until)):
+        if kept and f"day:{day}" in rollup.sketches:
+            union.merge(rollup.sketches[f"day:{day}"])
+    return union.count()
+
+
+def distinct_for(rollup: Rollup, kind: str, value: str) -> int:
+    """Estimated distinct visitors for one page or event, over all days."""
+    found = rollup.sketches.get(f"{kind}:{value}")
+    return found.count() if found is not None else 0
+
+
+def report(rollup: Rollup, since: str | None, until: str | None, event: str | None, page: str | None,
+           by: str | None, top: int) -> list[str]:
+    days = rollup.day_range()
+    if days is None:
+        return ["No events in the rollup yet."]
+    lines = [f"efi_events rollup: {rollup.rows:,} rows from {len(rollup.segments)} segments "
+             f"({rollup.skipped:,} skipped), {days[0]}..{days[1]}"]
+    window = f"{since or days[0]}..{until or days[1]}"
+    if event is None and page is None:
+        lines.append(f"~{distinct(rollup, since, until):,} distinct visitors in {window}")
+    for kind in [by] if by else ["event", "page"]:
+        grouped = totals(rollup, kind, since, until, event, page)
+        rows = sorted(grouped.items()) if kind == "day" else grouped.most_common(top)
+        lines.append(f"By {kind} ({window}, {sum(grouped.values()):,} events):")
+        for label, count in rows:
+            visitors = f"  ~{distinct_for(rollup, kind, label):,} visitors (all time)" if kind != "day" else ""
+            lines.append(f"  {label:<32} {count:>10,}{visitors}")
+    if rollup.funnels:
+        lines.append("Funnels (all time, sessions reaching each step):")
+    for name, funnel in rollup.funnels.items():
+        first = funnel["counts"][0] or 1
+        steps = " -> ".join(f"{step} {count:,} ({count / first:.0%})"
+                            for step, count in zip(funnel["steps"], funnel["counts"]))
+        lines.append(f"  {name}: {steps}")
+    return lines
+
+
+# Synthetic exports for tests and benchmarks: pages a session can wander
+# through after the landing page, and the events some pages fire.
+SYNTHETIC_PAGES = ["index.html", "curriculum.html", "enroll.html", "checkout.html", "esqr.html",
+                   "gap-analyzer.html", "resources.html", "about.html", "module-1.html", "community.html"]
+SYNTHETIC_EVENTS = {"esqr.html": "esqr_lead_capture", "gap-analyzer.html": "lead_magnet_unlocked",
+                    "enroll.html": "enroll_click"}
+_AGENTS = ["Mozilla/5.0 (Windows NT 10.0; Win64; x64)", "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_0)",
+           "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X)"]
+
+
+def generate_export(path: Path, rows: int, seed: int = 0, start: str = "2026-01-01", days: int = 30,
+                    visitors: int | None = None) -> tuple[Counter, set[int]]:
+    """Write ``rows`` synthetic efi_events rows (JSONL or CSV by suffix) in time
+    order; the exact ``(event, page, day)`` counts and the visitor hashes written."""
+    rng = random.Random(seed)
+    pool = visitors or max(100, rows // 40)
+    origin = datetime.fromisoformat(start).replace(tzinfo=timezone.utc).timestamp()
+    span = days * 86400
+    counts: Counter = Counter()
+    seen: set[int] = set()
+    as_csv = EXPORT_SUFFIXES[path.suffix] == "csv"
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle, lineterminator="\n") if as_csv else None
+        if writer:
+            writer.writerow(CSV_COLUMNS)
+        written = 0
+        while written < rows:
+            who = rng.randrange(pool)
+            context = {"user_agent": _AGENTS[who % len(_AGENTS)],
+                       "ip_hint": f"10.{who >> 16 & 255}.{who >> 8 & 255}.{who & 255}, 172.16.0.1"}
+            seen.add(visitor_hash(context))
+            at = origin + span * written / rows
+            session = ["index.html"]
+            while len(session) < 6 and rng.random() < 0.7:
+                funnel = SYNTHETIC_PAGES[:4]
+                last = session[-1]
+                if last in funnel[:-1] and rng.random() < 0.6:
+                    session.append(funnel[funnel.index(last) + 1])
+                else:
+                    session.append(rng.choice(SYNTHETIC_PAGES))
+            events = []
+            for page in session:
+                events.append(("page_view", page))
+                if page in SYNTHETIC_EVENTS and rng.random() < 0.3:
+                    events.append((SYNTHETIC_EVENTS[page], page))
+            for name, page in events[:rows - written]:
+                stamp = datetime.fromtimestamp(at, timezone.utc)
+                counts[name, page, stamp.date().isoformat()] += 1
+                row = {"event_id": f"evt_{written:012x}", "at": stamp.isoformat(timespec="milliseconds"),
+                       "event_name": name, "page": page, "source": "direct", "properties": {"title": page},
+                       "context": context}
+                if writer:
+                    writer.writerow([json.dumps(value) if isinstance(value, dict) else value for value in row.values()])
+                else:
+                    handle.write(json.dumps(row) + "\n")
+                written += 1
+                at += rng.uniform(5, 120)
+    return counts, seen
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("exports", nargs="*", type=Path,
+                        help="JSONL/CSV export segments or directories of them; omit to only report.")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help="Rollup directory.")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the rollup and re-read every segment.")
+    parser.add_argument("--since", help="First day (YYYY-MM-DD) to report.")
+    parser.add_argument("--until", help="Last day (YYYY-MM-DD) to report.")
+    parser.add_argument("--event", help="Only count this event_name.")
+    parser.add_argument("--page", help="Only count this page.")
+    parser.add_argument("--by", choices=["event", "page", "day"], help="Group by one dimension only.")
+    parser.add_argument("--top", type=int, default=15, help="Rows per event/page table.")
+    parser.add_argument("--generate", type=int, metavar="ROWS",
+                        help="Write ROWS synthetic rows as new segments in the export directory, then ingest.")
+    parser.add_argument("--segments", type=int, default=4, help="Segments for --generate.")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.generate:
+            if len(args.exports) != 1:
+                parser.error("--generate needs exactly one export directory")
+            directory = args.exports[0]
+            directory.mkdir(parents=True, exist_ok=True)
+            first = len(list(directory.glob("efi_events-*.jsonl")))
+            for number in range(args.segments):
+                share = args.generate // args.segments + (number < args.generate % args.segments)
+                generate_export(directory / f"efi_events-{first + number + 1:04d}.jsonl", share, seed=first + number,
+                                start=(date(2026, 1, 1) + timedelta(days=30 * (first + number))).isoformat())
+            print(f"Wrote {args.generate:,} synthetic rows to {directory}")
+        if args.exports:
+            stats = ingest(args.exports, args.out, rebuild=args.rebuild)
+            print(f"Read {stats['rows']:,} new rows ({stats['bytes'] / 1048576:.1f} MiB) from {stats['segments']} "
+                  f"segments; {stats['unchanged']} unchanged.")
+        rollup = load(args.out)
+    except RollupError as error:
+        print(f"Analytics rollup failed: {error}")
+        return 1
+    for line in report(rollup, args.since, args.until, args.event, args.page, args.by, args.top):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Benchmark the checkers on synthetic sites of growing size.
+
+Each synthetic site is generated from the real pages: templates are cycled,
+internal page links are re-pointed at other synthetic pages (keeping each
+template's link density, forms and landmarks), local PDF links point at
+generated PDFs, and a matching sitemap is generated. The checkers are copied
+into the synthetic tree and run there unmodified, one cold subprocess each.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import build_sitemap
+import link_graph
+from _site import load_pages
+
+ROOT = Path(__file__).resolve().parents[1]
+DOMAIN = "https://executivefunctioninginstitute.com/"
+BASELINE_PATH = ROOT / ".cache" / "benchmark-baseline.json"
+DEFAULT_SIZES = [100, 1000]
+DEFAULT_THRESHOLD = 0.25
+# One generated PDF per this many pages.
+PAGES_PER_PDF = 25
+
+_GATE = "import sys; sys.path.insert(0, 'scripts'); import release_gate as g; from _site import load_pages, scan; "
+CHECKERS = {
+    "links": ["scripts/check_links.py", "--no-cache"],
+    "accessibility": ["scripts/check_accessibility.py"],
+    "ux audit": ["scripts/check_ux_audit.py"],
+    "copy style": ["scripts/check_copy_style.py"],
+    "perf lint": ["scripts/check_perf_lint.py"],
+    "pdfs (deep)": ["scripts/check_pdfs.py", "--deep"],
+    "canonical": ["-c", _GATE + "g.check_canonical_tags(scan(load_pages(g.ROOT), {'c': g.CanonicalParser})['c'])"],
+    "sitemap": ["-c", _GATE + "g.check_sitemap(load_pages(g.ROOT))"],
+}
+
+_HREF = re.compile(r'(href|src)="([^"]*)"')
+_CANONICAL = re.compile(r'<link rel="canonical" href="[^"]*"')
+
+
+def synthetic_pdf(pages: int) -> bytes:
+    """A small, structurally valid PDF (classic xref table) with ``pages`` pages."""
+    kids = " ".join(f"{3 + i} 0 R" for i in range(pages))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode(),
+    ]
+    objects += [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>"] * pages
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def generate_site(dest: Path, pages: int, seed: int = 0) -> list[str]:
+    """Write a synthetic site of ``pages`` pages (plus checkers) into ``dest``."""
+    rng = random.Random(seed)
+    templates = [page for page in load_pages(ROOT, ignored={"404.html"})]
+    graph = link_graph.LinkGraph()
+    graph.update(templates)
+    names = ["index.html"] + [f"page-{i:05d}.html" for i in range(1, pages)]
+    pdfs = [f"docs/synthetic-{i:04d}.pdf" for i in range(max(1, pages // PAGES_PER_PDF))]
+
+    dest.mkdir(parents=True, exist_ok=True)
+    shutil.copytree(ROOT / "scripts", dest / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    for target in graph.assets():
+        source = ROOT / target
+        if source.is_file() and not target.lower().endswith(".pdf"):
+            (dest / target).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, dest / target)
+    (dest / "docs").mkdir(exist_ok=True)
+    for i, pdf in enumerate(pdfs):
+        (dest / pdf).write_bytes(synthetic_pdf(1 + i % 12))
+
+    def relink(match: re.Match) -> str:
+        attr, link = match.groups()
+        target = link_graph.local_target(link)
+        if target is None:
+            return match.group(0)
+        fragment = link[link.index("#"):] if "#" in link else ""
+        if target.endswith(".html"):
+            return f'{attr}="{rng.choice(names)}{fragment}"'
+        if target.lower().endswith(".pdf"):
+            return f'{attr}="{rng.choice(pdfs)}"'
+        return match.group(0)
+
+    for i, name in enumerate(names):
+        html = templates[i % len(templates)].text
+        html = _CANONICAL.sub(f'<link rel="canonical" href="{DOMAIN}{name}"', html)
+        (dest / name).write_text(_HREF.sub(relink, html), encoding="utf-8")
+
+    (dest / build_sitemap.STATE_PATH).unlink(missing_ok=True)
+    build_sitemap.build(load_pages(dest), "2026-01-01", dest)
+    return names
+
+
+def run_checker(site: Path, args: list[str]) -> dict:
+    """Run one checker cold in ``site``; wall time, exit code and peak RSS."""
+    shutil.rmtree(site / ".cache", ignore_errors=True)
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, *args], cwd=site, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    # Drain stderr before reaping so a chatty checker cannot fill the pipe and block.
+    stderr = proc.stderr.read().decode("utf-8", "replace")
+    proc.stderr.close()
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - started
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in KiB on Linux.
+    return {"wall": wall, "peak_kb": usage.ru_maxrss, "rc": proc.returncode, "stderr": stderr}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Regressions: slower or heavier than the baseline by more than ``threshold``."""
+    flagged = []
+    for key, result in current.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if result["wall"] > base["wall"] * (1 + threshold):
+            flagged.append(f"{key}: {result['wall']:.2f}s vs baseline {base['wall']:.2f}s")
+        if result["peak_kb"] > base["peak_kb"] * (1 + threshold):
+            flagged.append(f"{key}: peak {result['peak_kb'] // 1024} MiB vs baseline {base['peak_kb'] // 1024} MiB")
+    return flagged
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated synthetic site sizes in pages (e.g. 100,1000,10000).")
+    parser.add_argument("--checks", default=",".join(CHECKERS), help="Comma-separated subset of checkers.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for link rewiring.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Flag wall time or peak memory above baseline by more than this fraction.")
+    parser.add_argument("--keep", type=Path, help="Generate sites under this directory and keep them.")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    checks = [check.strip() for check in args.checks.split(",")]
+    unknown = [check for check in checks if check not in CHECKERS]
+    if unknown:
+        parser.error(f"unknown checks: {', '.join(unknown)}")
+
+    results: dict[str, dict] = {}
+    workdir = args.keep or Path(tempfile.mkdtemp(prefix="efi-bench-"))
+    try:
+        print(f"{'pages':>6}  {'check':<14} {'wall s':>8} {'pages/s':>9} {'peak MiB':>9}  rc")
+        for size in sizes:
+            site = workdir / f"site-{size}"
+            shutil.rmtree(site, ignore_errors=True)
+            generate_site(site, size, args.seed)
+            for check in checks:
+                result = run_checker(site, CHECKERS[check])
+                result["pages_per_sec"] = size / result["wall"] if result["wall"] else 0.0
+                results[f"{size}/{check}"] = {k: v for k, v in result.items() if k != "stderr"}
+                print(
+                    f"{size:>6}  {check:<14} {result['wall']:>8.2f} {result['pages_per_sec']:>9.0f} "
+                    f"{result['peak_kb'] / 1024:>9.1f}  {result['rc']}"
+                )
+                if result["stderr"].strip():
+                    print("        " + result["stderr"].strip().splitlines()[-1])
+    finally:
+        if args.keep is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    try:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        baseline = {}
+    regressions = compare(results, baseline, args.threshold)
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True), encoding="utf-8")
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%} of baseline:")
+        for line in regressions:
+            print(f" - {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Build dist/: minified, content-hashed, precompressed CSS, JS and SVG.
+
+Assets are built in dependency order so references can point at hashed
+names: SVGs first, then stylesheets (their ``url()`` references) and scripts
+(string literals that name an asset), then the HTML pages. Every other file
+a page links to is copied as-is. Each built asset gets ``.gz`` and, when the
+optional ``brotli`` package is installed, ``.br`` siblings.
+
+Builds are incremental: an asset is rebuilt only when its source or the
+hashed names it refers to changed. Each stage runs on a process pool.
+``--verify`` also runs ``check_links.py --root dist`` on the output. Netlify
+runs the build without it, so a broken link (which the release gate reports)
+does not block a deploy.
+"""
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+import posixpath
+import re
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:  # optional; .gz siblings are always written
+    brotli = None
+
+from _cache import ResultCache, checker_version, file_digest, text_digest
+from _minify import minify_css, minify_js, minify_svg
+from _site import load_pages
+import check_links
+import link_graph
+from link_graph import local_target
+
+ROOT = Path(__file__).resolve().parents[1]
+DIST = ROOT / "dist"
+MANIFEST = "asset-manifest.json"
+# Built in this order; later stages may reference earlier ones.
+STAGES = [["images/*.svg"], ["css/*.css", "js/*.js"]]
+# Served files that pages do not link to directly.
+EXTRA_FILES = ["favicon.svg", "robots.txt", "sitemap*.xml", "data/*.json", "data/bundles/*.json", "data/search/*.json"]
+# The download function redirects to the files named in its ASSET_MAP.
+FUNCTIONS_COMMON = ROOT / "netlify" / "functions" / "_common.js"
+HASH_LENGTH = 10
+
+_CSS_URL = re.compile(r"""url\(\s*(["']?)([^"')]+)\1\s*\)""")
+_HTML_REF = re.compile(r"""\b(href|src)=(["'])(.*?)\2""")
+_ASSET_MAP = re.compile(r"ASSET_MAP\s*=\s*\{(.*?)\}", re.S)
+_JS_VALUE = re.compile(r""":\s*(["'])(.*?)\1""")
+
+
+def hashed_name(rel: str, data: bytes) -> str:
+    stem, suffix = posixpath.splitext(rel)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{suffix}"
+
+
+def function_assets(path: Path = FUNCTIONS_COMMON) -> list[str]:
+    """Repo-relative files named in the functions' ``ASSET_MAP``."""
+    block = _ASSET_MAP.search(path.read_text(encoding="utf-8")) if path.is_file() else None
+    return sorted(value.lstrip("/") for _, value in _JS_VALUE.findall(block.group(1))) if block else []
+
+
+def rewrite_link(link: str, base: str, mapping: dict[str, str]) -> str:
+    """``link`` (as written in ``base``) pointed at its hashed name, if it has one."""
+    target = local_target(link, base)
+    if target not in mapping:
+        return link
+    tail = link[min(i for i in (link.find("?"), link.find("#"), len(link)) if i >= 0):]
+    if link.lstrip().startswith("/"):
+        return "/" + mapping[target] + tail
+    return posixpath.relpath(mapping[target], posixpath.dirname(base) or ".") + tail
+
+
+def rewrite_css(css: str, rel: str, mapping: dict[str, str]) -> str:
+    return _CSS_URL.sub(
+        lambda m: f"url({m.group(1)}{rewrite_link(m.group(2), rel, mapping)}{m.group(1)})", css
+    )
+
+
+def rewrite_html(html: str, page: str, mapping: dict[str, str]) -> str:
+    return _HTML_REF.sub(
+        lambda m: f"{m.group(1)}={m.group(2)}{rewrite_link(m.group(3), page, mapping)}{m.group(2)}", html
+    )
+
+
+def rewrite_js_string(literal: str, mapping: dict[str, str]) -> str:
+    """A JS string literal naming an asset, re-pointed at its hashed name.
+    Literals are resolved against the site root, where every page lives."""
+    value = literal[1:-1]
+    if "\\" in value or not value:
+        return literal
+    return literal[0] + rewrite_link(value, link_graph.ENTRY_PAGE, mapping) + literal[0]
+
+
+def write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def build_asset(rel: str, mapping: dict[str, str], dist: str) -> tuple[str, int, int]:
+    """Minify, rewrite, hash and precompress one asset; ``(hashed rel, raw, minified)``."""
+    source = (ROOT / rel).read_text(encoding="utf-8")
+    if rel.endswith(".css"):
+        text = rewrite_css(minify_css(source), rel, mapping)
+    elif rel.endswith(".js"):
+        text = minify_js(source, lambda literal: rewrite_js_string(literal, mapping))
+    else:
+        text = minify_svg(source)
+    data = text.encode("utf-8")
+    out = hashed_name(rel, data)
+    path = Path(dist) / out
+    write_bytes(path, data)
+    write_bytes(path.with_name(path.name + ".gz"), gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        write_bytes(path.with_name(path.name + ".br"), brotli.compress(data, quality=11))
+    return out, len(source.encode("utf-8")), len(data)
+
+
+def outputs_exist(dist: Path, out: str) -> bool:
+    siblings = [out, out + ".gz"] + ([out + ".br"] if brotli is not None else [])
+    return all((dist / name).is_file() for name in siblings)
+
+
+def build_stage(patterns: list[str], mapping: dict[str, str], dist: Path, cache: ResultCache,
+                jobs: int) -> tuple[int, int, int]:
+    """Build one stage into ``mapping``; ``(rebuilt, raw bytes, minified bytes)``."""
+    rels = sorted({path.relative_to(ROOT).as_posix() for pattern in patterns for path in ROOT.glob(pattern)})
+    deps = text_digest(json.dumps(mapping, sort_keys=True))
+    raw = minified = 0
+    pending: list[tuple[str, str]] = []
+    for rel in rels:
+        digest = text_digest(file_digest(ROOT / rel), deps)
+        hit, entry = cache.get(rel, digest)
+        if hit and outputs_exist(dist, entry[0]):
+            mapping[rel] = entry[0]
+            raw, minified = raw + entry[1], minified + entry[2]
+        else:
+            pending.append((rel, digest))
+
+    names = [rel for rel, _ in pending]
+    snapshot = dict(mapping)
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+            built = list(pool.map(build_asset, names, [snapshot] * len(names), [str(dist)] * len(names)))
+    else:
+        built = [build_asset(rel, snapshot, str(dist)) for rel in names]
+    for (rel, digest), (out, size, small) in zip(pending, built):
+        cache.put(rel, digest, [out, size, small])
+        mapping[rel] = out
+        raw, minified = raw + size, minified + small
+    return len(pending), raw, minified
+
+
+def copy_if_changed(source: Path, dest: Path) -> bool:
+    try:
+        src, dst = source.stat(), dest.stat()
+        if (src.st_size, src.st_mtime_ns) == (dst.st_size, dst.st_mtime_ns):
+            return False
+    except FileNotFoundError:
+        pass
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(source, dest)
+    return True
+
+
+def prune(dist: Path, keep: set[str]) -> int:
+    """Delete files in ``dist`` that this build did not produce."""
+    removed = 0
+    for path in sorted(dist.rglob("*"), reverse=True):
+        rel = path.relative_to(dist).as_posix()
+        if path.is_file() and rel not in keep:
+            path.unlink()
+            removed += 1
+        elif path.is_dir() and not any(path.iterdir()):
+            path.rmdir()
+    return removed
+
+
+def build(dist: Path = DIST, jobs: int = 1, use_cache: bool = True) -> dict[str, str]:
+    """Build ``dist`` and return the source -> hashed name manifest."""
+    version = text_digest(checker_version("_minify", __name__), "brotli" if brotli else "gzip")[:16]
+    cache = ResultCache("build-assets", version, enabled=use_cache)
+    mapping: dict[str, str] = {}
+    rebuilt = raw = minified = 0
+    for patterns in STAGES:
+        count, size, small = build_stage(patterns, mapping, dist, cache, jobs)
+        rebuilt, raw, minified = rebuilt + count, raw + size, minified + small
+    cache.save()
+
+    keep = {MANIFEST}
+    for out in mapping.values():
+        keep |= {out, out + ".gz"} | ({out + ".br"} if brotli is not None else set())
+
+    pages = load_pages(ROOT)
+    written = 0
+    for page in pages:
+        data = rewrite_html(page.text, page.name, mapping).encode("utf-8")
+        dest = dist / page.name
+        keep.add(page.name)
+        if not dest.is_file() or dest.read_bytes() != data:
+            write_bytes(dest, data)
+            written += 1
+
+    graph = link_graph.load_graph(pages)
+    copies = {target for target in graph.assets() if target not in mapping}
+    copies |= {path.relative_to(ROOT).as_posix() for pattern in EXTRA_FILES for path in ROOT.glob(pattern)}
+    copies |= set(function_assets())
+    copied = 0
+    for rel in sorted(copies):
+        source = ROOT / rel
+        if source.is_file():
+            keep.add(rel)
+            copied += copy_if_changed(source, dist / rel)
+
+    write_bytes(dist / MANIFEST, (json.dumps(mapping, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+    removed = prune(dist, keep)
+    print(
+        f"Built {len(mapping)} assets ({rebuilt} rebuilt), {raw / 1024:.1f} KiB -> {minified / 1024:.1f} KiB minified; "
+        f"{written} pages rewritten, {copied} files copied, {removed} stale files removed -> {dist}"
+    )
+    if brotli is None:
+        print("brotli is not installed; .br files were not written (pip install brotli).")
+    return mapping
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dist", type=Path, default=DIST, help="Output directory.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes per stage.")
+    parser.add_argument("--no-cache", action="store_true", help="Rebuild every asset.")
+    parser.add_argument("--verify", action="store_true", help="Also check the local links of the output.")
+    args = parser.parse_args(argv)
+
+    dist = args.dist.resolve()
+    build(dist, jobs=args.jobs, use_cache=not args.no_cache)
+    if args.verify:
+        return check_links.main(["--root", str(dist)])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
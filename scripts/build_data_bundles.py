@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Split quiz and assessment data into minified, content-hashed bundles.
+
+``data/module-quizzes.json`` becomes one ``data/bundles/quiz-<module>.<hash>.json``
+per module and ``data/esqr-config.json`` one ``data/bundles/esqr.<hash>.json``.
+``data/bundle-manifest.json`` maps ids to those names for ``js/module-quiz.js``
+and ``js/esqr.js``. Bundle names change with their content, so netlify.toml
+serves ``/data/bundles/*`` as immutable. The manifest is revalidated.
+
+Bundles are committed; the Netlify build (build_assets.py) copies them as-is.
+Only shards whose content changed are written; stale ones are deleted.
+``--check`` writes nothing and fails if the committed bundles are out of date.
+The data schema check in the release gate runs it.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import posixpath
+import sys
+
+from _cache import ResultCache, checker_version, file_digest
+import _schema
+from build_assets import hashed_name
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA = ROOT / "data"
+BUNDLE_DIR = "bundles"
+MANIFEST = "bundle-manifest.json"
+# (manifest key, source in data/, member split into one bundle per entry, or
+# None for one bundle of the whole file, bundle name prefix)
+SOURCES = [
+    ("quizzes", "module-quizzes.json", "quizzes", "quiz"),
+    ("esqr", "esqr-config.json", None, "esqr"),
+]
+
+
+def minify(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def shards(source: Path, member: str | None, prefix: str):
+    """``(id, bundle path relative to data/, bytes)`` for one source file."""
+    if member is None:
+        data = minify(json.loads(source.read_text(encoding="utf-8")))
+        yield None, hashed_name(f"{BUNDLE_DIR}/{prefix}.json", data), data
+        return
+    with source.open(encoding="utf-8") as handle:
+        for kind, key, value in _schema.iter_document(handle, member):
+            if kind == "item":
+                data = minify(value)
+                yield key, hashed_name(f"{BUNDLE_DIR}/{prefix}-{key}.json", data), data
+
+
+def plan(data_dir: Path = DATA, use_cache: bool = True) -> tuple[dict, dict[str, bytes | None]]:
+    """The manifest, and each bundle's bytes (None when a cached build says an
+    unchanged source produced it and it only needs to match its name's hash)."""
+    cache = ResultCache("data-bundles", checker_version("_schema", __name__), enabled=use_cache)
+    manifest: dict = {}
+    outputs: dict[str, bytes | None] = {}
+    for key, name, member, prefix in SOURCES:
+        source = data_dir / name
+        digest = file_digest(source)
+        hit, entry = cache.get(name, digest)
+        if hit:
+            manifest[key] = entry
+            names = entry.values() if isinstance(entry, dict) else [entry]
+            outputs.update((rel, None) for rel in names)
+            continue
+        built = list(shards(source, member, prefix))
+        manifest[key] = built[0][1] if member is None else {shard: rel for shard, rel, _ in built}
+        outputs.update((rel, data) for _, rel, data in built)
+        cache.put(name, digest, manifest[key])
+    cache.save()
+    return manifest, outputs
+
+
+def intact(path: Path, rel: str) -> bool:
+    """Whether the bundle at ``path`` still hashes to its name ``rel``."""
+    stem, suffix = posixpath.splitext(rel)
+    return hashed_name(posixpath.splitext(stem)[0] + suffix, path.read_bytes()) == rel
+
+
+def manifest_bytes(manifest: dict) -> bytes:
+    return (json.dumps(manifest, indent=2) + "\n").encode("utf-8")
+
+
+def stale(data_dir: Path = DATA, use_cache: bool = True) -> list[str]:
+    """What a build would change in ``data_dir``; empty when up to date."""
+    manifest, outputs = plan(data_dir, use_cache)
+    problems = []
+    for rel, data in sorted(outputs.items()):
+        path = data_dir / rel
+        if not path.is_file():
+            problems.append(f"missing data/{rel}")
+        elif data is not None and path.read_bytes() != data:
+            problems.append(f"data/{rel} does not match its source")
+        elif data is None and not intact(path, rel):
+            problems.append(f"data/{rel} does not match its content hash")
+    extra = {p.relative_to(data_dir).as_posix() for p in (data_dir / BUNDLE_DIR).glob("*.json")} - set(outputs)
+    problems += [f"stale data/{rel}" for rel in sorted(extra)]
+    path = data_dir / MANIFEST
+    if not path.is_file() or path.read_bytes() != manifest_bytes(manifest):
+        problems.append(f"data/{MANIFEST} is out of date")
+    return problems
+
+
+def build(data_dir: Path = DATA, use_cache: bool = True) -> tuple[int, int]:
+    """Write changed bundles and the manifest; ``(written, removed)``."""
+    manifest, outputs = plan(data_dir, use_cache)
+    written = removed = 0
+    (data_dir / BUNDLE_DIR).mkdir(exist_ok=True)
+    for rel, data in outputs.items():
+        path = data_dir / rel
+        if data is None and path.is_file() and intact(path, rel):
+            continue
+        if data is None:
+            # Cached plan but the file was deleted or edited: rebuild it from its source.
+            return build(data_dir, use_cache=False)
+        if not path.is_file() or path.read_bytes() != data:
+            path.write_bytes(data)
+            written += 1
+    for path in (data_dir / BUNDLE_DIR).glob("*.json"):
+        if path.relative_to(data_dir).as_posix() not in outputs:
+            path.unlink()
+            removed += 1
+    path = data_dir / MANIFEST
+    if not path.is_file() or path.read_bytes() != manifest_bytes(manifest):
+        path.write_bytes(manifest_bytes(manifest))
+        written += 1
+    return written, removed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="Fail if the committed bundles are out of date.")
+    parser.add_argument("--no-cache", action="store_true", help="Re-split every source.")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        problems = stale(use_cache=not args.no_cache)
+        if problems:
+            print("Data bundles are out of date (run python3 scripts/build_data_bundles.py):")
+            for problem in problems:
+                print(f" - {problem}")
+            return 1
+        print("Data bundles are up to date.")
+        return 0
+
+    written, removed = build(use_cache=not args.no_cache)
+    count = len(list((DATA / BUNDLE_DIR).glob("*.json")))
+    print(f"{count} data bundles; {written} files written, {removed} stale bundles removed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""Build the prebuilt client-side search index over the pages and Further Sources.
+
+Visible text is extracted from every indexed page (scripts, styles, navigation
+and footers are skipped) and each ``- Label: URL`` line of the Further Sources
+file becomes its own entry. Terms are folded, stop-worded and stemmed with the
+rules stored in the manifest, so ``js/site-search.js`` normalizes queries the
+same way. Each document keeps weighted term frequencies (title x3, headings x2)
+and its length, which is what BM25 needs at query time.
+
+Posting lists are delta-encoded and grouped by the first two characters of the
+term into shards of about SHARD_BYTES. The browser fetches
+``data/search-manifest.json`` and then only the shards for the prefixes typed.
+Shard and document files are content-hashed under ``data/search/``, so
+netlify.toml serves them as immutable.
+
+Per-page term counts are cached by content digest, so a rebuild only
+re-extracts pages that changed. The output is committed; the Netlify build
+(build_assets.py) copies it as-is. ``--check`` reports a stale index without
+writing anything.
+The data schema check in the release gate runs it.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+import json
+from pathlib import Path
+import re
+import sys
+import unicodedata
+
+from _cache import ResultCache, checker_version, file_digest
+from _site import Page, PageVisitor, load_pages, visit
+from build_assets import hashed_name
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA = ROOT / "data"
+SOURCES_FILE = ROOT / "Further Sources"
+INDEX_DIR = "search"
+MANIFEST = "search-manifest.json"
+# Error and operations pages are not worth finding.
+EXCLUDED = {"404.html", "admin.html", "health.html", "telemetry.html"}
+SHARD_BYTES = 8 * 1024
+SUMMARY_CHARS = 160
+TITLE_WEIGHT = 3
+HEADING_WEIGHT = 2
+BM25 = {"k1": 1.2, "b": 0.75}
+
+STOPWORDS = sorted("""
+a about after all also an and any are as at be been but by can do does each for from has have how if in into is
+it its may more most not of on or our over so such than that the their them then there these they this those
+through to under up use used using was we were what when which while who will with within you your
+""".split())
+# Passes of (suffix, replacement, shortest stem left) rules; in each pass the
+# first matching rule applies. Identity rules guard endings that only look like
+# plurals. The last pass drops a final "e" and undoubles consonants, so
+# "include", "included" and "including" share a stem, as do "plan" and "planning".
+STEM_RULES = [
+    [
+        ["ization", "ize", 3], ["ational", "ate", 3], ["fulness", "ful", 3], ["iveness", "ive", 3],
+        ["ousness", "ous", 3], ["ations", "ate", 3], ["ation", "ate", 3], ["ments", "", 4], ["ment", "", 4],
+        ["ness", "", 4], ["ingly", "", 4], ["ings", "", 4], ["ing", "", 4], ["edly", "", 4],
+        ["sses", "ss", 2], ["ies", "y", 3], ["ied", "y", 3], ["ed", "", 4], ["ss", "ss", 1], ["us", "us", 1],
+        ["is", "is", 1], ["s", "", 3],
+    ],
+    [["e", "", 4], *([c * 2, c, 2] for c in "bdgmnprt")],
+]
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SOURCE_LINE = re.compile(r"^-\s+(.+?):\s+(https?://\S+)\s*$")
+_SPACE = re.compile(r"\s+")
+_STOP = frozenset(STOPWORDS)
+_SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "footer", "button"}
+_HEADINGS = {"h1", "h2", "h3", "h4"}
+
+
+def fold(text: str) -> str:
+    """Lowercase with accents removed (matches ``fold`` in js/site-search.js)."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not "\u0300" <= ch <= "\u036f")
+
+
+def stem(word: str) -> str:
+    for rules in STEM_RULES:
+        for suffix, replacement, shortest in rules:
+            if word.endswith(suffix) and len(word) - len(suffix) >= shortest:
+                word = word[: len(word) - len(suffix)] + replacement
+                break
+    return word
+
+
+def terms(text: str) -> list[str]:
+    return [stem(word) for word in _WORD.findall(fold(text)) if len(word) > 1 and word not in _STOP]
+
+
+class TextExtractor(PageVisitor):
+    """Weighted term counts, title and summary of one page's visible text."""
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.counts: Counter[str] = Counter()
+        self.skipping: list[str] = []
+        self.in_title = False
+        self.heading = 0
+        self.title = ""
+        self.description = ""
+        self.body: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self.skipping.append(tag)
+        elif tag == "title":
+            self.in_title = True
+        elif tag in _HEADINGS:
+            self.heading += 1
+        elif tag == "meta":
+            values = dict(attrs)
+            if values.get("name") == "description":
+                self.description = values.get("content") or ""
+
+    def handle_endtag(self, tag):
+        if self.skipping and tag == self.skipping[-1]:
+            self.skipping.pop()
+        elif tag == "title":
+            self.in_title = False
+        elif tag in _HEADINGS and self.heading:
+            self.heading -= 1
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title += data
+            for term in terms(data):
+                self.counts[term] += TITLE_WEIGHT
+            return
+        if self.skipping or not data.strip():
+            return
+        weight = HEADING_WEIGHT if self.heading else 1
+        for term in terms(data):
+            self.counts[term] += weight
+        if not self.heading and sum(map(len, self.body)) < SUMMARY_CHARS * 2:
+            self.body.append(data)
+
+    def result(self):
+        title = _SPACE.sub(" ", self.title).strip().split(" | ")[0]
+        summary = _SPACE.sub(" ", self.description or " ".join(self.body)).strip()
+        if len(summary) > SUMMARY_CHARS:
+            summary = summary[:SUMMARY_CHARS].rsplit(" ", 1)[0] + "…"
+        return [title, summary, dict(self.counts)]
+
+
+def source_entries(text: str) -> list[list]:
+    """One ``[url, title, summary, counts]`` per ``- Label: URL`` line."""
+    entries = []
+    for line in text.splitlines():
+        match = _SOURCE_LINE.match(line.strip())
+        if match:
+            label, url = match.groups()
+            host = re.sub(r"^https?://(www\.)?", "", url).split("/")[0]
+            counts = Counter()
+            for term in terms(label):
+                counts[term] += TITLE_WEIGHT
+            for term in terms(host.replace(".", " ")):
+                counts[term] += 1
+            entries.append([url, label, f"Further Sources · {host}", dict(counts)])
+    return entries
+
+
+def documents(root: Path = ROOT, use_cache: bool = True) -> list[list]:
+    """``[url, title, summary, counts]`` for every indexed page and source."""
+    cache = ResultCache("search-index", checker_version("_site", __name__), enabled=use_cache)
+    pending = []
+    extracted: dict[str, list] = {}
+    for page in load_pages(root, EXCLUDED):
+        hit, result = cache.get(page.name, page.digest)
+        if hit:
+            extracted[page.name] = result
+        else:
+            pending.append(page)
+    for page, extractor in zip(pending, visit(pending, {"text": TextExtractor})["text"]):
+        extracted[page.name] = extractor.result()
+        cache.put(page.name, page.digest, extracted[page.name])
+    docs = [[name, *extracted[name]] for name in sorted(extracted)]
+
+    sources = root / SOURCES_FILE.name
+    if sources.is_file():
+        digest = file_digest(sources)
+        hit, entries = cache.get(sources.name, digest)
+        if not hit:
+            entries = source_entries(sources.read_text(encoding="utf-8"))
+            cache.put(sources.name, digest, entries)
+        docs += entries
+    cache.save()
+    return docs
+
+
+def _dump(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def build_index(docs: list[list]) -> tuple[dict, dict[str, bytes]]:
+    """The manifest and every ``search/`` file's bytes, keyed by path under data/."""
+    postings: dict[str, list[int]] = {}
+    previous: dict[str, int] = {}
+    lengths = []
+    for doc_id, (_, _, _, counts) in enumerate(docs):
+        lengths.append(sum(counts.values()))
+        for term in sorted(counts):
+            postings.setdefault(term, []).extend((doc_id - previous.get(term, 0), counts[term]))
+            previous[term] = doc_id
+
+    by_prefix: dict[str, dict[str, list[int]]] = {}
+    for term in sorted(postings):
+        by_prefix.setdefault(term[:2], {})[term] = postings[term]
+    outputs: dict[str, bytes] = {}
+    shards = []
+    group: dict[str, list[int]] = {}
+    start = ""
+
+    def flush():
+        data = _dump(group)
+        rel = hashed_name(f"{INDEX_DIR}/{start}.json", data)
+        outputs[rel] = data
+        shards.append([start, rel])
+
+    for prefix, entries in by_prefix.items():
+        if group and len(_dump(group)) + len(_dump(entries)) > SHARD_BYTES:
+            flush()
+            group = {}
+        if not group:
+            start = prefix
+        group.update(entries)
+    if group:
+        flush()
+
+    table = [[url, title, summary, length] for (url, title, summary, _), length in zip(docs, lengths)]
+    data = _dump(table)
+    docs_rel = hashed_name(f"{INDEX_DIR}/docs.json", data)
+    outputs[docs_rel] = data
+    manifest = {
+        "version": 1,
+        "docs": docs_rel,
+        "count": len(docs),
+        "avgdl": round(sum(lengths) / len(lengths), 3) if lengths else 0,
+        "bm25": BM25,
+        "stopwords": STOPWORDS,
+        "stem": STEM_RULES,
+        "shards": shards,
+    }
+    return manifest, outputs
+
+
+def manifest_bytes(manifest: dict) -> bytes:
+    return (json.dumps(manifest, indent=1) + "\n").encode("utf-8")
+
+
+def stale(data_dir: Path = DATA, root: Path = ROOT, use_cache: bool = True) -> list[str]:
+    """What a build would change in ``data_dir``; empty when up to date."""
+    manifest, outputs = build_index(documents(root, use_cache))
+    problems = [f"missing data/{rel}" for rel in sorted(outputs) if not (data_dir / rel).is_file()]
+    present = {path.relative_to(data_dir).as_posix() for path in (data_dir / INDEX_DIR).glob("*.json")}
+    problems += [f"stale data/{rel}" for rel in sorted(present - set(outputs))]
+    path = data_dir / MANIFEST
+    if not path.is_file() or path.read_bytes() != manifest_bytes(manifest):
+        problems.append(f"data/{MANIFEST} is out of date")
+    return problems
+
+
+def build(data_dir: Path = DATA, root: Path = ROOT, use_cache: bool = True) -> tuple[dict, int, int]:
+    """Write new index files and the manifest; ``(manifest, written, removed)``.
+    File names carry their content hash, so existing ones are never rewritten."""
+    manifest, outputs = build_index(documents(root, use_cache))
+    written = removed = 0
+    (data_dir / INDEX_DIR).mkdir(parents=True, exist_ok=True)
+    for rel, data in outputs.items():
+        if not (data_dir / rel).is_file():
+            (data_dir / rel).write_bytes(data)
+            written += 1
+    for path in (data_dir / INDEX_DIR).glob("*.json"):
+        if path.relative_to(data_dir).as_posix() not in outputs:
+            path.unlink()
+            removed += 1
+    path = data_dir / MANIFEST
+    if not path.is_file() or path.read_bytes() != manifest_bytes(manifest):
+        path.write_bytes(manifest_bytes(manifest))
+        written += 1
+    return manifest, written, removed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="Fail if the committed index is out of date.")
+    parser.add_argument("--no-cache", action="store_true", help="Re-extract every page.")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        problems = stale(use_cache=not args.no_cache)
+        if problems:
+            print("Search index is out of date (run python3 scripts/build_search_index.py):")
+            for problem in problems:
+                print(f" - {problem}")
+            return 1
+        print("Search index is up to date.")
+        return 0
+
+    manifest, written, removed = build(use_cache=not args.no_cache)
+    files = sorted((DATA / INDEX_DIR).glob("*.json"))
+    size = sum(path.stat().st_size for path in files)
+    print(f"Indexed {manifest['count']} documents into {len(manifest['shards'])} shards "
+          f"({size / 1024:.1f} KiB); {written} files written, {removed} stale files removed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Generate sitemap.xml from the page set, with content-hash ``<lastmod>`` dates.
+
+Every page except IGNORED_HTML is listed under CANONICAL_DOMAIN. The state file
+(scripts/rules/sitemap.json) records each page's priority, content digest and
+lastmod. A page's lastmod moves only when its digest changes, so crawlers
+re-fetch only the pages that actually changed. New and changed pages take
+their last commit date as lastmod, or the build date while they have
+uncommitted changes; ``--reseed`` re-derives every lastmod that way.
+Priorities are edited in the state file; new pages start at DEFAULT_PRIORITY.
+
+Past MAX_URLS entries or MAX_BYTES per file, the URLs are split into
+``sitemap-N.xml`` files and sitemap.xml becomes a sitemap index.
+
+The same page parse checks canonical tags. Canonical results are cached per
+page digest. Nothing is written while a canonical tag is wrong. The release
+gate's sitemap check fails when sitemap.xml or the state file is stale, and
+only warns when just a page's lastmod would move.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+from _cache import ResultCache, checker_version
+from _site import Page, PageVisitor, load_pages, scan
+
+ROOT = Path(__file__).resolve().parents[1]
+CANONICAL_DOMAIN = "https://executivefunctioninginstitute.com/"
+IGNORED_HTML = {"404.html"}
+STATE_PATH = Path("scripts") / "rules" / "sitemap.json"
+SITEMAP = "sitemap.xml"
+DEFAULT_PRIORITY = 0.5
+# Per-file limits from the sitemaps.org protocol.
+MAX_URLS = 50_000
+MAX_BYTES = 50 * 1024 * 1024
+
+_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+_HEAD = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+
+class CanonicalParser(PageVisitor):
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.canonical: str | None = None
+
+    def handle_starttag(self, tag: str, attrs):
+        if tag != "link":
+            return
+        attr = dict(attrs)
+        if attr.get("rel") == "canonical" and "href" in attr:
+            self.canonical = attr["href"].strip()
+
+    def result(self) -> str | None:
+        return self.canonical
+
+
+def canonical_failures(results: list[tuple[str, str | None]]) -> list[str]:
+    failures = []
+    for name, canonical in results:
+        if name in IGNORED_HTML:
+            continue
+        expected = CANONICAL_DOMAIN + name
+        if canonical != expected:
+            failures.append(f"{name}: expected canonical '{expected}', found '{canonical}'")
+    return failures
+
+
+def load_state(root: Path = ROOT) -> dict[str, dict]:
+    path = root / STATE_PATH
+    if not path.is_file():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))["pages"]
+
+
+def state_bytes(state: dict[str, dict]) -> bytes:
+    body = {
+        "description": "Sitemap state for scripts/build_sitemap.py. Edit priorities here; "
+                       "digest and lastmod are maintained by the generator.",
+        "pages": {name: state[name] for name in sorted(state)},
+    }
+    return (json.dumps(body, indent=2) + "\n").encode("utf-8")
+
+
+def _commit_dates(root: Path, names: list[str]) -> dict[str, str]:
+    """Last commit date of each of ``names`` (untracked files and files with
+    uncommitted changes are missing)."""
+    if not names:
+        return {}
+    try:
+        out = subprocess.run(["git", "log", "--format=%x00%cs", "--name-only", "--", *names], cwd=root,
+                             capture_output=True, text=True, check=True).stdout
+        dirty = subprocess.run(["git", "diff", "--name-only", "HEAD", "--", *names], cwd=root,
+                               capture_output=True, text=True, check=True).stdout.split()
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    dates: dict[str, str] = {}
+    for commit in out.split("\0")[1:]:
+        date, *files = commit.split("\n")
+        for name in files:
+            if name and name not in dirty:
+                dates.setdefault(name, date)
+    return dates
+
+
+def update_state(pages: list[Page], state: dict[str, dict], today: str, root: Path = ROOT,
+                 reseed: bool = False) -> dict[str, dict]:
+    """The state for ``pages``: unchanged pages keep their entry, new and
+    changed ones (every page with ``reseed``) get their last commit date as
+    lastmod, or ``today`` when uncommitted, and removed pages are dropped."""
+    listed = [page for page in pages if page.name not in IGNORED_HTML]
+    moved = {page.name for page in listed
+             if reseed or page.name not in state or state[page.name]["digest"] != page.digest}
+    committed = _commit_dates(root, sorted(moved))
+    updated = {}
+    for page in listed:
+        entry = state.get(page.name, {"priority": DEFAULT_PRIORITY})
+        if page.name in moved:
+            entry = {**entry, "lastmod": committed.get(page.name, today), "digest": page.digest}
+        updated[page.name] = entry
+    return updated
+
+
+def _url(name: str, entry: dict) -> str:
+    return (f"  <url><loc>{escape(CANONICAL_DOMAIN + name)}</loc><lastmod>{entry['lastmod']}</lastmod>"
+            f"<priority>{entry['priority']:.1f}</priority></url>\n")
+
+
+def render(state: dict[str, dict], max_urls: int | None = None, max_bytes: int | None = None) -> dict[str, bytes]:
+    """File name -> content: sitemap.xml alone, or an index plus ``sitemap-N.xml`` parts."""
+    max_urls = MAX_URLS if max_urls is None else max_urls
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    head = f'{_HEAD}<urlset xmlns="{_NS}">\n'
+    tail = "</urlset>\n"
+    chunks: list[tuple[list[str], str]] = []
+    urls: list[str] = []
+    size = len(head) + len(tail)
+    newest = ""
+    for name in sorted(state):
+        line = _url(name, state[name])
+        if urls and (len(urls) >= max_urls or size + len(line.encode("utf-8")) > max_bytes):
+            chunks.append((urls, newest))
+            urls, size, newest = [], len(head) + len(tail), ""
+        urls.append(line)
+        size += len(line.encode("utf-8"))
+        newest = max(newest, state[name]["lastmod"])
+    chunks.append((urls, newest))
+    if len(chunks) == 1:
+        return {SITEMAP: (head + "".join(urls) + tail).encode("utf-8")}
+
+    files = {}
+    index = [f'{_HEAD}<sitemapindex xmlns="{_NS}">\n']
+    for number, (part, lastmod) in enumerate(chunks, start=1):
+        name = f"sitemap-{number}.xml"
+        files[name] = (head + "".join(part) + tail).encode("utf-8")
+        index.append(f"  <sitemap><loc>{CANONICAL_DOMAIN}{name}</loc><lastmod>{lastmod}</lastmod></sitemap>\n")
+    index.append("</sitemapindex>\n")
+    files[SITEMAP] = "".join(index).encode("utf-8")
+    return files
+
+
+def outputs(pages: list[Page], today: str, root: Path = ROOT,
+            reseed: bool = False) -> tuple[dict[str, dict], dict[str, bytes]]:
+    state = update_state(pages, load_state(root), today, root, reseed)
+    return state, render(state)
+
+
+def sitemap_locs(path: Path = ROOT / SITEMAP) -> list[str]:
+    """Every page URL in a sitemap, following a sitemap index into its parts."""
+    ns = {"sm": _NS}
+    tree = ET.parse(path)
+    trees = [tree]
+    for node in tree.findall("./sm:sitemap/sm:loc", ns):
+        trees.append(ET.parse(path.parent / node.text.strip().removeprefix(CANONICAL_DOMAIN)))
+    return [
+        node.text.strip()
+        for part in trees
+        for node in part.findall(".//sm:url/sm:loc", ns)
+        if node.text and node.text.strip()
+    ]
+
+
+def _parts(root: Path) -> set[str]:
+    return {path.name for path in root.glob("sitemap-*.xml")}
+
+
+def stale(pages: list[Page], root: Path = ROOT, lastmod: bool = True) -> list[str]:
+    """Why the committed sitemap no longer matches the pages; empty when current.
+    With ``lastmod=False``, pages whose content changed since their recorded
+    lastmod are not reported."""
+    state = load_state(root)
+    problems = [f"{page.name} changed since its recorded lastmod" for page in pages
+                if lastmod and page.name not in IGNORED_HTML and page.name in state
+                and state[page.name]["digest"] != page.digest]
+    names = {page.name for page in pages}
+    problems += [f"{page.name} is not in {STATE_PATH.as_posix()}" for page in pages
+                 if page.name not in IGNORED_HTML and page.name not in state]
+    problems += [f"{name} is in {STATE_PATH.as_posix()} but no longer exists" for name in sorted(set(state) - names)]
+    if not problems:
+        files = render(state)
+        problems += [f"{name} is out of date" for name, data in files.items()
+                     if not (root / name).is_file() or (root / name).read_bytes() != data]
+        problems += [f"{name} is no longer part of the sitemap" for name in sorted(_parts(root) - set(files))]
+    return problems
+
+
+def build(pages: list[Page], today: str, root: Path = ROOT, reseed: bool = False) -> list[str]:
+    """Write the state, sitemap.xml and any parts; the names of files written."""
+    state, files = outputs(pages, today, root, reseed)
+    written = []
+    files[STATE_PATH.as_posix()] = state_bytes(state)
+    for name, data in files.items():
+        path = root / name
+        if not path.is_file() or path.read_bytes() != data:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            written.append(name)
+    for name in sorted(_parts(root) - set(files)):
+        (root / name).unlink()
+    return written
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="Fail if sitemap.xml is out of date; write nothing.")
+    parser.add_argument("--date", default=datetime.now(timezone.utc).date().isoformat(),
+                        help="lastmod for pages with uncommitted changes (default: today, UTC).")
+    parser.add_argument("--reseed", action="store_true",
+                        help="Reset every lastmod to the page's last commit date.")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every page for its canonical tag.")
+    args = parser.parse_args(argv)
+
+    pages = load_pages(ROOT)
+    cache = ResultCache("pages-canonical", checker_version("_site", __name__), enabled=not args.no_cache)
+    failures = canonical_failures(scan(pages, {"canonical": CanonicalParser}, {"canonical": cache})["canonical"])
+    cache.save()
+    if failures:
+        print("Canonical tag checks failed; sitemap not written:")
+        for failure in failures:
+            print(f" - {failure}")
+        return 1
+
+    if args.check:
+        problems = stale(pages)
+        if problems:
+            print("sitemap.xml is out of date (run python3 scripts/build_sitemap.py):")
+            for problem in problems:
+                print(f" - {problem}")
+            return 1
+        print("sitemap.xml is up to date.")
+        return 0
+
+    written = build(pages, args.date, reseed=args.reseed)
+    listed = len(pages) - len(IGNORED_HTML & {page.name for page in pages})
+    print(f"Sitemap lists {listed} pages; {', '.join(written) if written else 'nothing'} written.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,17 +2,19 @@
 """Lightweight static accessibility checks for HTML pages."""
 from __future__ import annotations
 
-from html.parser import HTMLParser
+import argparse
 from pathlib import Path
 import sys
 
+import _changes
+from _site import Page, PageVisitor, load_pages, scan
+
 ROOT = Path(__file__).resolve().parents[1]
 
 
-class A11yParser(HTMLParser):
-    def __init__(self, path: Path):
-        super().__init__()
-        self.path = path
+class A11yParser(PageVisitor):
+    def __init__(self, page: Page):
+        super().__init__(page)
         self.issues: list[str] = []
         self.has_main = False
         self.button_stack: list[dict] = []
@@ -44,31 +46,36 @@ class A11yParser(HTMLParser):
                 self.issues.append('Button missing accessible label (aria-label/title/text).')
 
     def close(self):
-        super().close()
         if not self.has_main:
             self.issues.append('Missing <main> landmark.')
 
+    def result(self) -> list[str]:
+        return self.issues
+
 
-def main() -> int:
-    files = sorted(ROOT.glob('*.html'))
-    failures = []
-    for f in files:
-        parser = A11yParser(f)
-        parser.feed(f.read_text(encoding='utf-8', errors='ignore'))
-        parser.close()
-        if parser.issues:
-            failures.append((f, parser.issues))
+def report(results: list[tuple[str, list[str]]]) -> int:
+    failures = [(name, issues) for name, issues in results if issues]
 
     if failures:
         print('Accessibility check failed:')
-        for f, issues in failures:
+        for name, issues in failures:
             for issue in issues:
-                print(f' - {f.name}: {issue}')
+                print(f' - {name}: {issue}')
         return 1
 
-    print(f'Accessibility checks OK across {len(files)} HTML files.')
+    print(f'Accessibility checks OK across {len(results)} HTML files.')
     return 0
 
 
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _changes.add_argument(parser)
+    changes = _changes.from_args(parser.parse_args(argv), parser)
+    pages = load_pages(ROOT)
+    if changes is not None:
+        pages = changes.select_pages(pages, [Path(__file__)])
+    return report(scan(pages, {'a11y': A11yParser})['a11y'])
+
+
 if __name__ == '__main__':
     sys.exit(main())
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""Check the effective Cache-Control of every served file and simulate browser caching.
+
+``netlify.toml`` is parsed the way the dev server applies it. Each file in the
+publish directory (pages, ``css/``, ``js/``, ``images/``, ``data/``, PDFs and
+root files) is resolved to the Cache-Control Netlify would send: later
+``[[headers]]`` rules override earlier ones, and Netlify's default applies when
+no rule sets one.
+Files behind a forced redirect are not served as themselves and are only
+listed. The check fails when:
+
+- a content-hashed file (``name.<hash>.ext``) is not cached as ``immutable``
+  for at least a year;
+- a file whose name does not change with its content is marked ``immutable``
+  or cached for longer than MAX_MUTABLE_AGE.
+
+It then replays a sample navigation through the sitemap against a simulated
+browser cache: a first session, then a return visit RETURN_AFTER_HOURS later.
+Each request for a page and its subresources counts as a cache hit, a
+revalidation (a 304 round trip) or a full download, and the report estimates
+the latency that revalidation round trips add at a given RTT.
+
+When the publish directory is the output of scripts/build_assets.py, it is
+(incrementally) built first, so the check sees the hashed names Netlify serves.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import Counter, defaultdict
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+import io
+import json
+from pathlib import Path
+import random
+import re
+import sys
+
+from _cache import ResultCache, checker_version
+from _site import Page, PageVisitor, load_pages, scan
+import _minify
+import build_assets
+from build_assets import HASH_LENGTH
+import build_sitemap
+from dev_server import DEFAULT_CACHE_CONTROL, SiteConfig
+from link_graph import local_target
+
+ROOT = Path(__file__).resolve().parents[1]
+CONFIG = ROOT / "netlify.toml"
+# Files served from the publish directory, by class.
+SERVED = {
+    "html": ["*.html"],
+    "css": ["css/**/*"],
+    "js": ["js/**/*"],
+    "images": ["images/**/*", "favicon.svg"],
+    "data": ["data/**/*.json"],
+    "pdf": ["*.pdf"],
+    "other": ["robots.txt", "sitemap*.xml"],
+}
+IMMUTABLE_AGE = 365 * 24 * 3600
+MAX_MUTABLE_AGE = 3600
+NAVIGATION_PAGES = 8
+SECONDS_BETWEEN_PAGES = 30
+RETURN_AFTER_HOURS = 24.0
+DEFAULT_RTT_MS = 100.0
+# Data files the scripts fetch at runtime: script -> manifest file and the
+# manifest entries (``{module}`` is the page name without .html) it loads.
+SCRIPT_FETCHES = {
+    "js/module-quiz.js": ("data/bundle-manifest.json", ["quizzes.{module}"]),
+    "js/esqr.js": ("data/bundle-manifest.json", ["esqr"]),
+}
+
+_FINGERPRINT = re.compile(rf"\.[0-9a-f]{{{HASH_LENGTH}}}(?=\.[A-Za-z0-9]+$)")
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*(\d+)", re.I)
+_SUBRESOURCE_RELS = {"stylesheet", "icon", "preload", "modulepreload", "manifest"}
+
+
+@dataclass
+class Policy:
+    """A parsed Cache-Control value."""
+
+    value: str
+    max_age: int
+    immutable: bool
+    no_store: bool
+
+    @classmethod
+    def parse(cls, value: str) -> "Policy":
+        directives = {part.strip().split("=")[0].lower() for part in value.split(",")}
+        match = _MAX_AGE.search(value)
+        max_age = 0 if "no-cache" in directives or match is None else int(match.group(1))
+        return cls(value, max_age, "immutable" in directives, "no-store" in directives)
+
+
+class SubresourceParser(PageVisitor):
+    """Files a browser fetches to render a page: scripts, styles, images, icons."""
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.found: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs):
+        values = dict(attrs)
+        link = None
+        if tag == "link" and set((values.get("rel") or "").lower().split()) & _SUBRESOURCE_RELS:
+            link = values.get("href")
+        elif tag in ("script", "img", "source", "video", "audio", "track"):
+            link = values.get("src")
+        target = local_target(link, self.page.name) if link else None
+        if target is not None and target not in self.found:
+            self.found.append(target)
+
+    def result(self) -> list[str]:
+        return self.found
+
+
+def cache_inputs() -> list[Path]:
+    return [CONFIG, Path(build_assets.__file__), Path(_minify.__file__), build_assets.FUNCTIONS_COMMON,
+            *served_files(ROOT).values()]
+
+
+def published_root(config: SiteConfig) -> Path:
+    """The directory Netlify publishes, built first when it is the asset build output."""
+    root = (ROOT / config.publish).resolve()
+    if root == build_assets.DIST.resolve():
+        with redirect_stdout(io.StringIO()):
+            build_assets.build(root)
+    return root
+
+
+def served_files(root: Path) -> dict[str, Path]:
+    """Repo-relative path -> file for everything the site serves."""
+    files = {}
+    for patterns in SERVED.values():
+        for pattern in patterns:
+            for path in root.glob(pattern):
+                if path.is_file() and not path.name.endswith((".gz", ".br")):
+                    files[path.relative_to(root).as_posix()] = path
+    # Downloads the functions redirect to, wherever they live.
+    for rel in build_assets.function_assets():
+        if (root / rel).is_file():
+            files[rel] = root / rel
+    return dict(sorted(files.items()))
+
+
+def file_class(rel: str) -> str:
+    for name, patterns in SERVED.items():
+        if any(Path(rel).match(pattern) or Path(rel).match(pattern.replace("**/", "")) for pattern in patterns):
+            return name
+    return "other"
+
+
+def is_fingerprinted(rel: str) -> bool:
+    return _FINGERPRINT.search(rel) is not None
+
+
+def cache_control(config: SiteConfig, rel: str) -> str:
+    headers = {key.lower(): value for key, value in config.headers_for("/" + rel).items()}
+    return headers.get("cache-control", DEFAULT_CACHE_CONTROL)
+
+
+def forced_redirect(config: SiteConfig, rel: str) -> str | None:
+    """Where a forced rule sends requests for ``rel``; other rules never
+    apply to a path that exists as a file."""
+    for rule in config.redirects:
+        if rule.force:
+            target = rule.target("/" + rel)
+            if target is not None:
+                return target
+    return None
+
+
+def policy_findings(config: SiteConfig, files: dict[str, Path],
+                    max_mutable_age: int = MAX_MUTABLE_AGE) -> tuple[dict[str, Policy], list[str], list[str]]:
+    """``(policy per served file, failures, notes)``."""
+    policies: dict[str, Policy] = {}
+    failures: list[str] = []
+    notes: list[str] = []
+    for rel in files:
+        target = forced_redirect(config, rel)
+        if target is not None:
+            notes.append(f"{rel}: served by a forced redirect to {target}")
+            continue
+        policy = policies[rel] = Policy.parse(cache_control(config, rel))
+        if is_fingerprinted(rel):
+            if not policy.immutable or policy.max_age < IMMUTABLE_AGE:
+                failures.append(f"{rel}: content-hashed but served with '{policy.value}' "
+                                f"(use 'public, max-age={IMMUTABLE_AGE}, immutable')")
+        elif policy.immutable:
+            failures.append(f"{rel}: its name does not change with its content but it is marked immutable")
+        elif policy.max_age > max_mutable_age:
+            failures.append(f"{rel}: its name does not change with its content but it is cached for "
+                            f"{policy.max_age}s (over {max_mutable_age}s)")
+    return policies, failures, notes
+
+
+def runtime_fetches(root: Path, page: str, scripts: list[str]) -> list[str]:
+    """Data files ``page`` loads through SCRIPT_FETCHES."""
+    fetched = []
+    for script in scripts:
+        source = _FINGERPRINT.sub("", script)
+        if source not in SCRIPT_FETCHES:
+            continue
+        manifest_rel, keys = SCRIPT_FETCHES[source]
+        try:
+            manifest = json.loads((root / manifest_rel).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        fetched.append(manifest_rel)
+        for key in keys:
+            value = manifest
+            for part in key.format(module=page.removesuffix(".html")).split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            if isinstance(value, str):
+                fetched.append(f"{Path(manifest_rel).parent.as_posix()}/{value}")
+    return fetched
+
+
+def navigation(pages: list[str], count: int, seed: int) -> list[str]:
+    """``index.html`` followed by a seeded sample of other sitemap pages."""
+    rest = [page for page in pages if page != "index.html"]
+    sample = random.Random(seed).sample(rest, min(count - 1, len(rest))) if count > 1 else []
+    return (["index.html"] if "index.html" in pages else []) + sample
+
+
+def simulate(visits: list[tuple[float, str]], requests_for: dict[str, list[str]], policies: dict[str, Policy],
+             sizes: dict[str, int]) -> list[tuple[float, str, str, str]]:
+    """Replay page views at their times; ``(time, page, file, outcome)`` per request.
+    Outcomes are ``hit``, ``revalidate`` (a 304) and ``download``."""
+    stored: dict[str, float] = {}
+    log = []
+    for when, page in visits:
+        for rel in requests_for[page]:
+            if rel not in sizes:
+                continue
+            policy = policies.get(rel) or Policy.parse(DEFAULT_CACHE_CONTROL)
+            if rel not in stored or policy.no_store:
+                outcome = "download"
+            elif when - stored[rel] < policy.max_age:
+                outcome = "hit"
+            else:
+                outcome = "revalidate"
+            if outcome != "hit" and not policy.no_store:
+                stored[rel] = when
+            log.append((when, page, rel, outcome))
+    return log
+
+
+def report(log: list[tuple[float, str, str, str]], sizes: dict[str, int], rtt_ms: float,
+           return_at: float) -> list[str]:
+    lines = []
+    by_session: dict[str, Counter] = defaultdict(Counter)
+    by_class: dict[str, Counter] = defaultdict(Counter)
+    downloaded: Counter = Counter()
+    revalidated: Counter = Counter()
+    for when, _, rel, outcome in log:
+        session = "return visit" if when >= return_at else "first visit"
+        by_session[session][outcome] += 1
+        by_class[file_class(rel)][outcome] += 1
+        if outcome == "download":
+            downloaded[session] += sizes[rel]
+        elif outcome == "revalidate":
+            revalidated[rel] += 1
+    lines.append(f"{'':<14} {'requests':>8} {'hits':>6} {'304s':>6} {'downloads':>9} {'KiB':>8} {'304 cost':>9}")
+    for session in ("first visit", "return visit"):
+        counts = by_session[session]
+        total = sum(counts.values())
+        cost = counts["revalidate"] * rtt_ms
+        lines.append(f"{session:<14} {total:>8} {counts['hit']:>6} {counts['revalidate']:>6} {counts['download']:>9} "
+                     f"{downloaded[session] / 1024:>8.1f} {cost:>7.0f}ms")
+    lines.append("By file class (hits/304s/downloads): " + ", ".join(
+        f"{name} {c['hit']}/{c['revalidate']}/{c['download']}" for name, c in sorted(by_class.items())))
+    if revalidated:
+        lines.append("Most revalidated: " + ", ".join(f"{rel} x{n}" for rel, n in revalidated.most_common(5)))
+    return lines
+
+
+def analyze(root: Path | None = None, config_path: Path = CONFIG, pages_count: int = NAVIGATION_PAGES, seed: int = 0,
+            return_after_hours: float = RETURN_AFTER_HOURS, rtt_ms: float = DEFAULT_RTT_MS,
+            max_mutable_age: int = MAX_MUTABLE_AGE, use_cache: bool = True) -> tuple[list[str], list[str], list[str]]:
+    """``(failures, notes, simulation report lines)`` for the site in ``root``
+    (default: the publish directory)."""
+    config = SiteConfig(config_path)
+    published = root is None
+    root = published_root(config) if published else root
+    files = served_files(root)
+    policies, failures, notes = policy_findings(config, files, max_mutable_age)
+    sizes = {rel: path.stat().st_size for rel, path in files.items() if rel in policies}
+
+    pages = load_pages(root)
+    cache = ResultCache("pages-subresources", checker_version("_site", __name__), enabled=use_cache)
+    found = dict(scan(pages, {"subresources": SubresourceParser}, {"subresources": cache})["subresources"])
+    cache.save(prune=published)
+    requests_for = {name: [name, *subresources, *runtime_fetches(root, name, subresources)]
+                    for name, subresources in found.items()}
+
+    sitemap = root / build_sitemap.SITEMAP
+    listed = [local_target(loc.removeprefix(build_sitemap.CANONICAL_DOMAIN)) for loc in build_sitemap.sitemap_locs(sitemap)] \
+        if sitemap.is_file() else sorted(found)
+    route = [page for page in navigation([page for page in listed if page in found], pages_count, seed)]
+    return_at = (len(route) + 1) * SECONDS_BETWEEN_PAGES + return_after_hours * 3600
+    visits = [(i * SECONDS_BETWEEN_PAGES, page) for i, page in enumerate(route)]
+    visits += [(return_at + i * SECONDS_BETWEEN_PAGES, page) for i, page in enumerate(route)]
+    log = simulate(visits, requests_for, policies, sizes)
+    lines = [f"Navigation: {' -> '.join(route)} (return visit after {return_after_hours:g}h, "
+             f"304 cost at {rtt_ms:g} ms RTT)"]
+    lines += report(log, sizes, rtt_ms, return_at)
+    return failures, notes, lines
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", type=Path, default=None,
+                        help="Directory to analyze (default: the netlify.toml publish directory, built if needed).")
+    parser.add_argument("--pages", type=int, default=NAVIGATION_PAGES, help="Pages per simulated session.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the sampled navigation.")
+    parser.add_argument("--return-after", type=float, default=RETURN_AFTER_HOURS,
+                        help="Hours between the first and the return visit.")
+    parser.add_argument("--rtt", type=float, default=DEFAULT_RTT_MS, help="Round trip time for the 304 cost, in ms.")
+    parser.add_argument("--max-mutable-age", type=int, default=MAX_MUTABLE_AGE,
+                        help="Longest max-age allowed for files whose name does not change with their content.")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every page.")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve() if args.root is not None else None
+    failures, notes, lines = analyze(root, CONFIG, args.pages, args.seed, args.return_after,
+                                     args.rtt, args.max_mutable_age, not args.no_cache)
+    for note in notes:
+        print(f"Note: {note}")
+    print("Simulated browser cache:")
+    for line in lines:
+        print(f"  {line}")
+    if failures:
+        print("Cache policy checks failed:")
+        for failure in failures:
+            print(f" - {failure}")
+        return 1
+    print("Cache policy checks OK.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,13 @@
 """Fail when console.log/debugger statements are present in production JS."""
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 import re
 import sys
 
+import _changes
+
 ROOT = Path(__file__).resolve().parents[1]
 JS_DIR = ROOT / "js"
 
@@ -13,9 +16,20 @@ LOG_RE = re.compile(r"\bconsole\.log\s*\(")
 DBG_RE = re.compile(r"\bdebugger\b")
 
 
-def main() -> int:
+def cache_inputs() -> list[Path]:
+    return sorted(JS_DIR.glob("*.js"))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _changes.add_argument(parser)
+    changes = _changes.from_args(parser.parse_args(argv), parser)
+    paths = cache_inputs()
+    if changes is not None and not changes.touches([Path(__file__)]):
+        paths = [path for path in paths if changes.touches([path])]
+
     failures: list[str] = []
-    for path in sorted(JS_DIR.glob("*.js")):
+    for path in paths:
         text = path.read_text(encoding="utf-8", errors="ignore")
         for idx, line in enumerate(text.splitlines(), start=1):
             if LOG_RE.search(line) or DBG_RE.search(line):
@@ -2,41 +2,130 @@
 """Block known AI-isms and vague cliche copy in HTML content."""
 from __future__ import annotations
 
+import argparse
+import json
 from pathlib import Path
 import re
 import sys
 
+import _changes
+from _site import Page, PageVisitor, load_pages, scan
+
 ROOT = Path(__file__).resolve().parents[1]
+RULES_PATH = Path(__file__).resolve().parent / "rules" / "copy-style.json"
+
+
+class RuleSet:
+    """All rules compiled into one case-insensitive candidate scanner.
+
+    Phrases are merged into a prefix trie emitted as a single lookahead regex,
+    together with the raw patterns, so one pass finds every offset where some
+    rule could start; its cost per text position depends on phrase length
+    rather than rule count. At each such offset every rule that can start
+    there (phrases by first letter, plus all patterns) runs its own check, so
+    rules sharing an offset, or a phrase that prefixes a longer one, all report.
+    """
+
+    def __init__(self, rules: list[dict]):
+        self.messages: list[str] = []
+        self.checks: list[re.Pattern] = []
+        self.by_letter: dict[str, list[int]] = {}
+        self.pattern_rules: list[int] = []
+        trie: dict = {}
+        patterns: list[str] = []
+        for rule in rules:
+            idx = len(self.messages)
+            self.messages.append(rule["message"])
+            if "phrase" in rule:
+                joiners = rule.get("joiners", " ")
+                words = rule["phrase"].lower().split()
+                separator = "[" + re.escape(joiners) + "]"
+                self.checks.append(re.compile(r"\b" + separator.join(map(re.escape, words)) + r"\b", re.IGNORECASE))
+                self.by_letter.setdefault(words[0][0], []).append(idx)
+                node = trie
+                for i, word in enumerate(words):
+                    if i:
+                        node = node.setdefault(("sep", joiners), {})
+                    for ch in word:
+                        node = node.setdefault(("ch", ch), {})
+                node[None] = True
+            else:
+                self.checks.append(re.compile(rule["pattern"], re.IGNORECASE))
+                self.pattern_rules.append(idx)
+                patterns.append(f"(?:{rule['pattern']})")
+        alternatives = []
+        if trie:
+            alternatives.append(r"\b" + _emit(trie))
+        alternatives.extend(patterns)
+        self.pattern = re.compile("(?=" + "|".join(alternatives) + ")" if alternatives else r"(?!x)x", re.IGNORECASE)
+
+    @classmethod
+    def load(cls, paths: list[Path]) -> "RuleSet":
+        rules: list[dict] = []
+        for path in paths:
+            rules.extend(json.loads(path.read_text(encoding="utf-8"))["rules"])
+        return cls(rules)
+
+    def matches(self, text: str):
+        """Yield ``(offset, matched_text, message)`` for every rule hit, by offset then rule order."""
+        pattern = self.pattern
+        pos = 0
+        while True:
+            candidate = pattern.search(text, pos)
+            if candidate is None:
+                return
+            start = candidate.start()
+            rules = sorted(self.by_letter.get(text[start].lower(), []) + self.pattern_rules)
+            for idx in rules:
+                hit = self.checks[idx].match(text, start)
+                if hit is not None and hit.end() > start:
+                    yield start, hit.group(), self.messages[idx]
+            pos = start + 1
+
+
+def _emit(node: dict) -> str:
+    branches = []
+    for key, child in node.items():
+        if key is None:
+            continue
+        kind, value = key
+        atom = re.escape(value) if kind == "ch" else "[" + re.escape(value) + "]"
+        branches.append(atom + _emit(child))
+    if None in node:
+        branches.append(r"\b")
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+RULES = RuleSet.load([RULES_PATH])
 
-RULES = [
-    (re.compile(r"\btransform lives?\b", re.IGNORECASE), "Use a concrete outcome instead of 'transform lives'."),
-    (re.compile(r"\bbegin your journey\b", re.IGNORECASE), "Use 'start the program' phrasing."),
-    (re.compile(r"\bready to transform\b", re.IGNORECASE), "Avoid hype CTA phrasing."),
-    (re.compile(r"\bworld[- ]class\b", re.IGNORECASE), "Avoid unsupported superlatives."),
-    (re.compile(r"\bgame[- ]changer\b", re.IGNORECASE), "Use specific impact language."),
-    (re.compile(r"\bcutting[- ]edge\b", re.IGNORECASE), "Use specific and testable wording."),
-    (re.compile(r"\bholistic approach\b", re.IGNORECASE), "Use concrete model language."),
-    (re.compile(r"\bseamless experience\b", re.IGNORECASE), "Use concrete UX language."),
-    (re.compile(r"\bnext level\b", re.IGNORECASE), "Avoid generic hype phrasing."),
-    (re.compile(r"\bunlock the paid track\b", re.IGNORECASE), "Prefer 'includes' or 'provides access'."),
-    (re.compile(r"\bunlock graded assignments\b", re.IGNORECASE), "Prefer 'includes graded assignments'."),
-]
-
-
-def line_number_for_offset(text: str, offset: int) -> int:
-    return text.count("\n", 0, offset) + 1
-
-
-def main() -> int:
-    failures: list[str] = []
-    for html_file in sorted(ROOT.glob("*.html")):
-        text = html_file.read_text(encoding="utf-8", errors="ignore")
-        for pattern, message in RULES:
-            for match in pattern.finditer(text):
-                line = line_number_for_offset(text, match.start())
-                failures.append(
-                    f"{html_file.name}:{line}: '{match.group(0)}' -> {message}"
-                )
+
+class CopyScanner(PageVisitor):
+    """Scans raw page text (markup included); needs no tag events."""
+
+    rules = RULES
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.failures: list[str] = []
+
+    def close(self) -> None:
+        page = self.page
+        for offset, found, message in self.rules.matches(page.text):
+            line = page.line_for_offset(offset)
+            self.failures.append(f"{page.name}:{line}: '{found}' -> {message}")
+
+    def result(self) -> list[str]:
+        return self.failures
+
+
+def cache_inputs() -> list[Path]:
+    return [RULES_PATH]
+
+
+def report(results: list[tuple[str, list[str]]]) -> int:
+    failures = [failure for _, page_failures in results for failure in page_failures]
 
     if failures:
         print("Copy style violations found:")
@@ -48,5 +137,25 @@ def main() -> int:
     return 0
 
 
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rules",
+        type=Path,
+        action="append",
+        default=[],
+        help="Additional JSON rule pack (repeatable); the default pack is always loaded.",
+    )
+    _changes.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.rules:
+        CopyScanner.rules = RuleSet.load([RULES_PATH, *args.rules])
+    changes = _changes.from_args(args, parser)
+    pages = load_pages(ROOT)
+    if changes is not None:
+        pages = changes.select_pages(pages, [Path(__file__), *cache_inputs(), *args.rules])
+    return report(scan(pages, {"copy": CopyScanner})["copy"])
+
+
 if __name__ == "__main__":
     sys.exit(main())
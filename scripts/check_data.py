@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Validate every file in data/ against its schema, plus cross-file references.
+
+Schemas live in scripts/rules/data-schemas.json and are compiled once by
+``_schema.py``. Files over STREAM_BYTES are read one entry of their
+``stream`` member at a time instead of being loaded whole. Values tagged
+``collect`` in the schemas feed the cross-file checks below: ESQR questions
+against the inputs on esqr.html and skills against strategies, quizzes
+against the module pages that load the quiz script, video modules and local
+fallback readings against the tree, and directory specialties against the
+submission form. The committed outputs of ``build_data_bundles.py`` and
+``build_search_index.py`` must match their sources.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+import json
+from pathlib import Path
+import re
+import sys
+
+import _changes
+import _schema
+from _site import load_pages
+import build_data_bundles
+import build_search_index
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA = ROOT / "data"
+SCHEMAS_PATH = Path(__file__).resolve().parent / "rules" / "data-schemas.json"
+# Larger files with a "stream" member are validated entry by entry.
+STREAM_BYTES = 1 << 20
+
+
+class Located:
+    """Where a collected value came from; rendered only when a check reports it."""
+
+    __slots__ = ("label", "where")
+
+    def __init__(self, label: str, where: _schema.Where):
+        self.label = label
+        self.where = where
+
+    def __str__(self) -> str:
+        return f"{self.label}: {_schema.render(self.where)}"
+
+
+Facts = dict[str, list[tuple[object, Located]]]
+
+_QUESTION_INPUT = re.compile(r"""<input\b[^>]*\bname=["'](q\d+)["']""")
+_QUIZ_SCRIPT = re.compile(r"""<script\b[^>]*\bsrc=["'][^"']*module-quiz\.js["']""")
+_SPECIALTY_SELECT = re.compile(r"""<select\b[^>]*\bid=["']dir-submit-specialty["'][^>]*>(.*?)</select>""", re.S)
+_OPTION = re.compile(r"<option\b([^>]*)>(.*?)</option>", re.S)
+
+
+def cache_inputs() -> list[Path]:
+    return [SCHEMAS_PATH, Path(_schema.__file__), Path(build_data_bundles.__file__),
+            Path(build_search_index.__file__), build_search_index.SOURCES_FILE, *sorted(DATA.glob("*.json")),
+            *sorted(DATA.glob("bundles/*.json")), *sorted(DATA.glob("search/*.json")), *sorted(ROOT.glob("*.html"))]
+
+
+def load_schemas(path: Path = SCHEMAS_PATH) -> dict[str, dict]:
+    return json.loads(path.read_text(encoding="utf-8"))["files"]
+
+
+def validate_file(path: Path, spec: dict, facts: Facts, stream_bytes: int = STREAM_BYTES) -> list[str]:
+    """Schema errors for one data file; its collected values are added to ``facts``."""
+    label = path.relative_to(ROOT).as_posix() if path.is_relative_to(ROOT) else path.name
+    buckets: _schema.Buckets = {}
+    stream = spec.get("stream")
+    document = _schema.Document(spec["schema"], stream, buckets)
+    errors: list[str] = []
+    try:
+        if stream and path.stat().st_size > stream_bytes:
+            with path.open(encoding="utf-8") as handle:
+                document.validate(_schema.iter_document(handle, stream), errors)
+        else:
+            document.validate(_schema.iter_document(path.read_text(encoding="utf-8"), stream), errors)
+    except ValueError as err:
+        errors.append(f"invalid JSON: {err}")
+    for name, values in buckets.items():
+        facts[name].extend((value, Located(label, where)) for value, where in values)
+    return [f"{label}: {error}" for error in errors]
+
+
+def _exactly_once(values: list[tuple[object, Located]], noun: str) -> tuple[dict, list[str]]:
+    first: dict = {}
+    failures = []
+    for value, where in values:
+        if value in first:
+            failures.append(f"{where}: {noun} {value} is already used at {first[value]}")
+        else:
+            first[value] = where
+    return first, failures
+
+
+def cross_checks(facts: Facts, root: Path = ROOT) -> list[str]:
+    pages = {page.name: page.text for page in load_pages(root)}
+    failures: list[str] = []
+
+    questions, dupes = _exactly_once(facts.get("esqr.questions", []), "question")
+    failures += dupes
+    if "esqr.html" in pages and questions:
+        inputs = set(_QUESTION_INPUT.findall(pages["esqr.html"]))
+        failures += [f"{where}: {q} has no input on esqr.html" for q, where in questions.items() if q not in inputs]
+        failures += [f"esqr.html: input {q} is not scored by any skill in data/esqr-config.json"
+                     for q in sorted(inputs - set(questions), key=lambda q: int(q[1:]))]
+    skills = dict(facts.get("esqr.skills", []))
+    strategies = dict(facts.get("esqr.strategies", []))
+    failures += [f"{where}: skill {skill} has no strategies entry" for skill, where in skills.items()
+                 if skill not in strategies]
+    failures += [f"{where}: strategies for unknown skill {skill}" for skill, where in strategies.items()
+                 if skill not in skills]
+
+    quiz_pages = {name[:-5] for name, text in pages.items() if _QUIZ_SCRIPT.search(text)}
+    quizzes = dict(facts.get("quizzes.modules", []))
+    if quizzes:
+        failures += [f"{where}: no {module}.html page loads js/module-quiz.js" for module, where in quizzes.items()
+                     if module not in quiz_pages]
+        failures += [f"{module}.html: loads js/module-quiz.js but data/module-quizzes.json has no {module} quiz"
+                     for module in sorted(quiz_pages - set(quizzes))]
+    failures += _exactly_once(facts.get("quizzes.question_ids", []), "quiz question id")[1]
+
+    for module, where in facts.get("video.modules", []):
+        if f"{module}.html" not in pages:
+            failures.append(f"{where}: no page {module}.html")
+    for reading, where in facts.get("video.fallbacks", []):
+        if isinstance(reading, str) and not re.match(r"https?://", reading) and not (root / reading).is_file():
+            failures.append(f"{where}: fallback reading {reading} does not exist")
+
+    select = _SPECIALTY_SELECT.search(pages.get("coach-directory.html", ""))
+    if select is not None:
+        offered = {re.sub(r"\s+", " ", label).strip() for attrs, label in _OPTION.findall(select.group(1))
+                   if 'value=""' not in attrs}
+        for specialty, where in facts.get("directory.specialties", []):
+            if specialty not in offered:
+                failures.append(f"{where}: specialty {specialty!r} is not offered on coach-directory.html")
+    return failures
+
+
+def validate_all(data: Path = DATA, schemas: dict[str, dict] | None = None,
+                 stream_bytes: int = STREAM_BYTES, root: Path = ROOT) -> tuple[int, list[str]]:
+    """``(files checked, failures)`` for every JSON file in ``data``."""
+    schemas = load_schemas() if schemas is None else schemas
+    facts: Facts = defaultdict(list)
+    failures: list[str] = []
+    files = sorted(data.glob("*.json"))
+    for path in files:
+        spec = schemas.get(path.name)
+        if spec is None:
+            failures.append(f"{path.name}: no schema in {SCHEMAS_PATH.name}")
+            continue
+        failures += validate_file(path, spec, facts, stream_bytes)
+    present = {path.name for path in files}
+    failures += [f"{name}: has a schema but no file in data/" for name in sorted(set(schemas) - present)]
+    failures += cross_checks(facts, root)
+    return len(files), failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    _changes.add_argument(parser)
+    changes = _changes.from_args(parser.parse_args(argv), parser)
+    if changes is not None and not changes.touches([Path(__file__), *cache_inputs()]):
+        print(f"No changes affecting data/ since {changes.ref}; skipped.")
+        return 0
+
+    count, failures = validate_all()
+    failures += [f"{problem} (run python3 scripts/build_data_bundles.py)"
+                 for problem in build_data_bundles.stale(use_cache=False)]
+    failures += [f"{problem} (run python3 scripts/build_search_index.py)"
+                 for problem in build_search_index.stale()]
+    if failures:
+        print("Data schema checks failed:")
+        for failure in failures:
+            print(f" - {failure}")
+        return 1
+    print(f"Data schema checks OK ({count} files).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
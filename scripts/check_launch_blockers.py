@@ -2,10 +2,13 @@
 """Check launch blockers that can be validated from repository state."""
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 import re
 import sys
 
+import _changes
+
 ROOT = Path(__file__).resolve().parents[1]
 
 REQUIRED_FILES = [
@@ -22,6 +25,13 @@ REQUIRED_FILES = [
   "docs/video-pipeline.md",
 ]
 
+REQUIRED_TEXT = [
+  ("netlify.toml", "from = \"/api/*\""),
+  ("netlify.toml", "to = \"/.netlify/functions/:splat\""),
+  ("docs/release-checklist.md", "python3 scripts/release_gate.py"),
+  ("docs/roadmap-to-perfection.md", "Requires Deployment/Operator Input"),
+]
+
 REQUIRED_ENV_KEYS = [
   "EFI_CRM_WEBHOOK_URL",
   "EFI_ESP_WEBHOOK_URL",
@@ -52,7 +62,19 @@ def require_text(path: str, needle: str, failures: list[str]) -> None:
     failures.append(f"Missing required config/text in {path}: {needle}")
 
 
-def main() -> int:
+def cache_inputs() -> list[Path]:
+  rels = set(REQUIRED_FILES) | {path for path, _ in REQUIRED_TEXT} | {".env.example"}
+  return [ROOT / rel for rel in rels]
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(description=__doc__)
+  _changes.add_argument(parser)
+  changes = _changes.from_args(parser.parse_args(argv), parser)
+  if changes is not None and not changes.touches([Path(__file__), *cache_inputs()]):
+    print(f"No changes affecting launch blockers since {changes.ref}; skipped.")
+    return 0
+
   failures: list[str] = []
 
   for rel in REQUIRED_FILES:
@@ -67,10 +89,8 @@ def main() -> int:
       if re.search(rf"^{re.escape(key)}=", env_text, flags=re.MULTILINE) is None:
         failures.append(f"Missing env key in .env.example: {key}")
 
-  require_text("netlify.toml", "from = \"/api/*\"", failures)
-  require_text("netlify.toml", "to = \"/.netlify/functions/:splat\"", failures)
-  require_text("docs/release-checklist.md", "python3 scripts/release_gate.py", failures)
-  require_text("docs/roadmap-to-perfection.md", "Requires Deployment/Operator Input", failures)
+  for rel, needle in REQUIRED_TEXT:
+    require_text(rel, needle, failures)
 
   if failures:
     print("Launch blocker checks failed:")
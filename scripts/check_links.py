@@ -1,82 +1,195 @@
 #!/usr/bin/env python3
-from html.parser import HTMLParser
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import json
 from pathlib import Path
 import sys
 import argparse
-import urllib.request
-import urllib.error
+import time
+import urllib.parse
+
+import _changes
+from _http import ConnectionPool
+from _site import load_pages
+import link_graph
 
 ROOT = Path(__file__).resolve().parents[1]
+EXTERNAL_CACHE = ROOT / '.cache' / 'external-links.json'
+DEFAULT_TTL_HOURS = 24.0
+BLOCKED_HOSTS = {
+    'fonts.googleapis.com',
+    'fonts.gstatic.com'
+}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-class Parser(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.links = []
-    def handle_starttag(self, tag, attrs):
-        d = dict(attrs)
-        if tag in ('a', 'link') and 'href' in d:
-            self.links.append(d['href'])
-        if tag == 'script' and 'src' in d:
-            self.links.append(d['src'])
-
-parser = argparse.ArgumentParser()
-parser.add_argument('--external', action='store_true', help='Also validate external HTTP/HTTPS links.')
-args = parser.parse_args()
-
-bad = []
-external = set()
-for html in ROOT.glob('*.html'):
-    p = Parser()
-    p.feed(html.read_text(encoding='utf-8', errors='ignore'))
-    for link in p.links:
-        if link.startswith(('http://', 'https://')):
-            external.add(link)
-            continue
-        if link.startswith(('mailto:', 'tel:', 'data:', '#', 'javascript:')):
+def collect(results, root=ROOT):
+    bad = []
+    external = set()
+    exists = {}
+    for name, links in results:
+        for link in links:
+            if link.startswith(('http://', 'https://')):
+                external.add(link)
+                continue
+            target = link_graph.local_target(link, name)
+            if target is None:
+                continue
+            if target not in exists:
+                exists[target] = (root / target).exists()
+            if not exists[target]:
+                bad.append((name, link))
+    return bad, external
+
+
+def load_external_cache(path):
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_external_cache(path, entries, ttl):
+    now = time.time()
+    fresh = {url: ts for url, ts in entries.items() if now - ts < ttl}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(fresh, sort_keys=True, indent=0), encoding='utf-8')
+
+
+def fetch_status(pool, url, max_redirects=5):
+    for _ in range(max_redirects + 1):
+        resp = pool.request('HEAD', url)
+        if resp.status >= 400:
+            # Some hosts reject HEAD outright; confirm with a GET before failing.
+            resp = pool.request('GET', url)
+        if resp.status in REDIRECT_STATUSES and resp.headers.get('location'):
+            url = urllib.parse.urljoin(url, resp.headers['location'])
             continue
-        target = link.split('#')[0].split('?')[0]
-        if not target:
+        return resp.status
+    return 'too many redirects'
+
+
+def probe(pool, url, retries=2, backoff=0.5):
+    attempt = 0
+    while True:
+        try:
+            status = fetch_status(pool, url)
+        except Exception:
+            status = 'unreachable'
+        if (status == 'unreachable' or status in RETRY_STATUSES) and attempt < retries:
+            time.sleep(backoff * (2 ** attempt))
+            attempt += 1
             continue
-        if not (html.parent / target).exists():
-            bad.append((html.name, link))
-
-if bad:
-    print('Broken local links found:')
-    for page, link in bad:
-        print(f'- {page}: {link}')
-    sys.exit(1)
-
-if args.external:
-    blocked = [
-        'fonts.googleapis.com',
-        'fonts.gstatic.com'
-    ]
+        return status
+
+
+def interleave_by_host(urls):
+    by_host = defaultdict(list)
+    for url in sorted(urls):
+        by_host[urllib.parse.urlsplit(url).netloc].append(url)
+    queues = list(by_host.values())
+    ordered = []
+    while queues:
+        for queue in queues:
+            ordered.append(queue.pop(0))
+        queues = [q for q in queues if q]
+    return ordered
+
+
+def check_external(external, jobs=16, per_host=4, retries=2, backoff=0.5, timeout=8.0,
+                   ttl=DEFAULT_TTL_HOURS * 3600, cache_path=EXTERNAL_CACHE, use_cache=True):
+    """Return ``(failed, stats)`` for the given absolute URLs.
+
+    URLs are deduped by fragment, checked concurrently over a keep-alive pool
+    capped per host, retried with exponential backoff on transient failures,
+    and skipped when they passed within ``ttl`` seconds.
+    """
+    urls = {urllib.parse.urldefrag(url).url for url in external}
+    urls = {url for url in urls if urllib.parse.urlsplit(url).hostname not in BLOCKED_HOSTS}
+    passed = load_external_cache(cache_path) if use_cache else {}
+    now = time.time()
+    todo = [url for url in urls if now - passed.get(url, 0) >= ttl]
+    stats = {'total': len(urls), 'cached': len(urls) - len(todo)}
+
+    pool = ConnectionPool(per_host=per_host, timeout=timeout)
     failed_external = []
-    for url in sorted(external):
-        if any(host in url for host in blocked):
-            continue
-        req = urllib.request.Request(url, method='HEAD', headers={'User-Agent': 'EFI-LinkCheck/1.0'})
-        try:
-            with urllib.request.urlopen(req, timeout=8) as resp:
-                status = getattr(resp, 'status', 200)
-                if status >= 400:
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            futures = {url: executor.submit(probe, pool, url, retries, backoff) for url in interleave_by_host(todo)}
+            for url, future in futures.items():
+                status = future.result()
+                if isinstance(status, int) and status < 400:
+                    passed[url] = time.time()
+                else:
+                    passed.pop(url, None)
                     failed_external.append((url, status))
-        except Exception:
-            req = urllib.request.Request(url, method='GET', headers={'User-Agent': 'EFI-LinkCheck/1.0'})
-            try:
-                with urllib.request.urlopen(req, timeout=8) as resp:
-                    status = getattr(resp, 'status', 200)
-                    if status >= 400:
-                        failed_external.append((url, status))
-            except urllib.error.HTTPError as e:
-                failed_external.append((url, e.code))
-            except Exception:
-                failed_external.append((url, 'unreachable'))
-    if failed_external:
-        print('Broken external links found:')
-        for url, status in failed_external:
-            print(f'- {url} ({status})')
-        sys.exit(1)
-    print('External links OK')
-
-print('Local links OK')
+    finally:
+        pool.close()
+    if use_cache:
+        save_external_cache(cache_path, passed, ttl)
+    return sorted(failed_external), stats
+
+
+def report(results, external_check=False, root=ROOT, **external_options):
+    bad, external = collect(results, root)
+    if bad:
+        print('Broken local links found:')
+        for page, link in bad:
+            print(f'- {page}: {link}')
+        return 1
+
+    if external_check:
+        failed_external, stats = check_external(external, **external_options)
+        if failed_external:
+            print('Broken external links found:')
+            for url, status in failed_external:
+                print(f'- {url} ({status})')
+            return 1
+        print(f"External links OK ({stats['total']} URLs, {stats['cached']} passed within cache TTL)")
+
+    print('Local links OK')
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--external', action='store_true', help='Also validate external HTTP/HTTPS links.')
+    parser.add_argument('--jobs', type=int, default=16, help='Concurrent external requests overall.')
+    parser.add_argument('--per-host', type=int, default=4, help='Concurrent external requests per host.')
+    parser.add_argument('--retries', type=int, default=2, help='Retries for timeouts, 429 and 5xx responses.')
+    parser.add_argument('--timeout', type=float, default=8.0, help='Per-request timeout in seconds.')
+    parser.add_argument('--ttl-hours', type=float, default=DEFAULT_TTL_HOURS,
+                        help='Skip URLs that passed within this many hours.')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not update the external result cache.')
+    parser.add_argument('--root', type=Path, help='Check a built tree (e.g. dist/) instead of the repo; not indexed.')
+    _changes.add_argument(parser)
+    args = parser.parse_args(argv)
+    changes = _changes.from_args(args, parser)
+    root = args.root.resolve() if args.root else ROOT
+    if args.root:
+        if changes is not None:
+            parser.error('--root cannot be combined with --changed-since')
+        graph = link_graph.LinkGraph()
+        graph.update(load_pages(root))
+    else:
+        graph = link_graph.load_graph(use_cache=not args.no_cache)
+    if args.root or changes is None or changes.touches([Path(__file__), Path(link_graph.__file__)]):
+        results = graph.results()
+    else:
+        # Only edges from changed pages and edges into added/deleted files.
+        results = graph.affected(changes)
+    return report(
+        results,
+        external_check=args.external,
+        jobs=args.jobs,
+        per_host=args.per_host,
+        retries=args.retries,
+        timeout=args.timeout,
+        ttl=args.ttl_hours * 3600,
+        use_cache=not args.no_cache,
+        root=root,
+    )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Check page weight (raw, gzip and brotli transfer size) against budgets.
+
+Every page is resolved to the local files a cold visit downloads: the HTML
+itself, its stylesheets, scripts, icons, images and preloads, plus fonts and
+images referenced from those stylesheets via ``url()`` or ``@import``.
+Compressed sizes are cached per file content digest, so repeated runs only
+compress files that changed. Brotli sizes are reported when the optional
+``brotli`` package is installed.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+import gzip
+import json
+from pathlib import Path
+import re
+import sys
+
+import _changes
+from _cache import ResultCache, checker_version, file_digest, text_digest
+from _site import Page, PageVisitor, load_pages, scan
+from link_graph import local_target
+
+try:
+    import brotli
+except ImportError:  # optional; gzip sizes are always available
+    brotli = None
+
+ROOT = Path(__file__).resolve().parents[1]
+BUDGETS_PATH = Path(__file__).resolve().parent / "rules" / "page-weight.json"
+
+# rel values of <link> elements that make the browser fetch the target.
+FETCHED_RELS = {"stylesheet", "icon", "shortcut", "apple-touch-icon", "preload", "modulepreload", "manifest"}
+SRC_TAGS = {"script", "img", "source", "video", "audio", "track", "iframe", "embed"}
+# Formats that are already compressed; hosts serve them as-is.
+PRECOMPRESSED = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".woff", ".woff2", ".pdf", ".mp4", ".webm"}
+_CSS_REF = re.compile(r"""@import\s+(?:url\()?\s*["']?([^"')\s;]+)|url\(\s*["']?([^"')]+?)["']?\s*\)""")
+
+
+class AssetParser(PageVisitor):
+    """Links to files the browser fetches while loading the page."""
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.assets: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs):
+        attr = dict(attrs)
+        if tag == "link":
+            rels = set((attr.get("rel") or "").lower().split())
+            if rels & FETCHED_RELS and attr.get("href"):
+                self.assets.append(attr["href"])
+            return
+        if tag in SRC_TAGS and attr.get("src"):
+            self.assets.append(attr["src"])
+        if tag == "video" and attr.get("poster"):
+            self.assets.append(attr["poster"])
+        if tag in ("img", "source") and attr.get("srcset"):
+            self.assets += [item.split()[0] for item in attr["srcset"].split(",") if item.strip()]
+
+    def result(self) -> list[str]:
+        return self.assets
+
+
+def css_references(rel: str, text: str) -> list[str]:
+    """Local files referenced by a stylesheet (imports, fonts, images)."""
+    found = []
+    for imported, url in _CSS_REF.findall(text):
+        target = local_target(imported or url, rel)
+        if target is not None:
+            found.append(target)
+    return found
+
+
+def compressed_sizes(data: bytes, suffix: str) -> list:
+    """``[raw, gzip, brotli]`` transfer sizes; brotli is None when unavailable."""
+    if suffix in PRECOMPRESSED:
+        return [len(data), len(data), len(data) if brotli else None]
+    return [
+        len(data),
+        len(gzip.compress(data, compresslevel=9, mtime=0)),
+        len(brotli.compress(data, quality=11)) if brotli else None,
+    ]
+
+
+class SizeTable:
+    """File -> transfer sizes, cached by content digest."""
+
+    def __init__(self, use_cache: bool = True):
+        version = text_digest(checker_version(__name__), "brotli" if brotli else "gzip")[:16]
+        self.cache = ResultCache("page-weight", version, enabled=use_cache)
+        self.sizes: dict[str, list | None] = {}
+
+    def get(self, rel: str) -> list | None:
+        if rel not in self.sizes:
+            path = ROOT / rel
+            digest = file_digest(path) if path.is_file() else None
+            if digest is None:
+                self.sizes[rel] = None
+            else:
+                hit, sizes = self.cache.get(rel, digest)
+                if not hit:
+                    sizes = compressed_sizes(path.read_bytes(), path.suffix.lower())
+                    self.cache.put(rel, digest, sizes)
+                self.sizes[rel] = sizes
+        return self.sizes[rel]
+
+
+def resolve(page: str, links: list[str]) -> list[str]:
+    """Unique local files fetched by ``page``, following stylesheet references."""
+    seen: list[str] = []
+    queue = [target for target in (local_target(link, page) for link in links) if target is not None]
+    while queue:
+        target = queue.pop(0)
+        if target in seen:
+            continue
+        seen.append(target)
+        path = ROOT / target
+        if target.endswith(".css") and path.is_file():
+            queue += css_references(target, path.read_text(encoding="utf-8", errors="ignore"))
+    return seen
+
+
+def load_budgets(path: Path = BUDGETS_PATH) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def budget_for(budgets: dict, page: str) -> dict:
+    return {**budgets.get("default", {}), **budgets.get("pages", {}).get(page, {})}
+
+
+def weigh(pages: list[Page], table: SizeTable, use_cache: bool = True) -> dict[str, dict]:
+    """Per page: total ``raw``/``gzip``/``brotli`` bytes, request count, assets and missing files."""
+    cache = ResultCache("page-weight-assets", checker_version(__name__), enabled=use_cache)
+    found = scan(pages, {"assets": AssetParser}, {"assets": cache})["assets"]
+    cache.save()
+    weights: dict[str, dict] = {}
+    for name, links in found:
+        files = [name] + [target for target in resolve(name, links) if target != name]
+        totals = [0, 0, 0 if brotli else None]
+        missing = []
+        for rel in files:
+            sizes = table.get(rel)
+            if sizes is None:
+                missing.append(rel)
+                continue
+            for i, size in enumerate(sizes):
+                if totals[i] is not None:
+                    totals[i] += size
+        weights[name] = {
+            "raw": totals[0],
+            "gzip": totals[1],
+            "brotli": totals[2],
+            "requests": len(files) - len(missing),
+            "assets": [rel for rel in files[1:] if rel not in missing],
+            "missing": missing,
+        }
+    table.cache.save()
+    return weights
+
+
+def over_budget(name: str, weight: dict, budget: dict) -> list[str]:
+    failures = []
+    for key, limit in sorted(budget.items()):
+        if key == "requests":
+            if weight["requests"] > limit:
+                failures.append(f"{name}: {weight['requests']} requests > budget {limit}")
+            continue
+        measure = key.removesuffix("_kb")
+        actual = weight.get(measure)
+        if actual is not None and actual > limit * 1024:
+            failures.append(f"{name}: {measure} {actual / 1024:.1f} KiB > budget {limit} KiB")
+    return failures
+
+
+def kib(size: int | None) -> str:
+    return "-" if size is None else f"{size / 1024:.1f}"
+
+
+def report(weights: dict[str, dict], table: SizeTable, budgets: dict, top: int) -> int:
+    print(f"Heaviest pages (KiB; brotli {'on' if brotli else 'unavailable: pip install brotli'}):")
+    print(f"  {'page':<44} {'raw':>8} {'gzip':>8} {'brotli':>8} {'reqs':>5}")
+    heaviest = sorted(weights.items(), key=lambda item: (-item[1]["gzip"], item[0]))
+    for name, weight in heaviest[:top]:
+        print(f"  {name:<44} {kib(weight['raw']):>8} {kib(weight['gzip']):>8} "
+              f"{kib(weight['brotli']):>8} {weight['requests']:>5}")
+
+    usage = Counter(rel for weight in weights.values() for rel in weight["assets"])
+    shared = sorted((rel for rel, count in usage.items() if count > 1), key=lambda rel: (-table.get(rel)[1], rel))
+    if shared:
+        print("Shared assets (KiB per load x pages):")
+        for rel in shared[:top]:
+            raw, gz, br = table.get(rel)
+            print(f"  {rel:<44} {kib(raw):>8} {kib(gz):>8} {kib(br):>8} {usage[rel]:>5}")
+
+    failures = []
+    for name, weight in heaviest:
+        failures += [f"{name}: missing {rel}" for rel in weight["missing"]]
+        failures += over_budget(name, weight, budget_for(budgets, name))
+    if failures:
+        print("Page weight budget exceeded:")
+        for failure in failures:
+            print(f" - {failure}")
+        return 1
+    print(f"Page weight OK ({len(weights)} pages within budget).")
+    return 0
+
+
+def cache_inputs() -> list[Path]:
+    """Budgets, pages and every local file they load."""
+    pages = load_pages(ROOT)
+    found = scan(pages, {"assets": AssetParser})["assets"]
+    files = {ROOT / rel for name, links in found for rel in resolve(name, links)}
+    return [BUDGETS_PATH, *(page.path for page in pages), *sorted(files)]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budgets", type=Path, default=BUDGETS_PATH, help="Budget config (JSON).")
+    parser.add_argument("--top", type=int, default=10, help="Pages and shared assets to list.")
+    parser.add_argument("--no-cache", action="store_true", help="Recompress every file.")
+    _changes.add_argument(parser)
+    args = parser.parse_args(argv)
+    changes = _changes.from_args(args, parser)
+    if changes is not None and not changes.touches([Path(__file__), *cache_inputs()]):
+        print(f"No changes affecting page weight since {changes.ref}; skipped.")
+        return 0
+
+    use_cache = not args.no_cache
+    table = SizeTable(use_cache)
+    weights = weigh(load_pages(ROOT), table, use_cache)
+    return report(weights, table, load_budgets(args.budgets), args.top)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,29 @@
 #!/usr/bin/env python3
 """Validate local PDF links resolve to real PDF files."""
-from html.parser import HTMLParser
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import mmap
+import os
 from pathlib import Path
+import re
 import sys
+import zlib
 
-ROOT = Path(__file__).resolve().parents[1]
-
+import _changes
+from _cache import file_digest
+import link_graph
 
-class Parser(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.links = []
+ROOT = Path(__file__).resolve().parents[1]
+# PDFs are the heaviest downloads we serve; deep mode fails files above this.
+DEFAULT_BUDGET_BYTES = 2 * 1024 * 1024
+MAX_PREV_CHAIN = 64
 
-    def handle_starttag(self, tag, attrs):
-        d = dict(attrs)
-        if tag in ("a", "iframe", "embed") and "href" in d:
-            self.links.append(d["href"])
-        if tag in ("iframe", "embed") and "src" in d:
-            self.links.append(d["src"])
+_OBJ_HEADER = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\b")
+_SUBSECTION = re.compile(rb"\s*(\d+)\s+(\d+)\s*?(?:\r\n|\r|\n| )")
+_ENTRY = re.compile(rb"\s*(\d{10})\s(\d{5})\s([nf])")
+_TRAILER = re.compile(rb"\s*trailer\s*")
+_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+_STREAM = re.compile(rb"\s*stream(?:\r\n|\n|\r)")
 
 
 def is_local_pdf(link: str) -> bool:
@@ -29,16 +35,348 @@ def is_local_pdf(link: str) -> bool:
     return True
 
 
-def main() -> int:
+class PdfError(Exception):
+    pass
+
+
+def _int_key(d: bytes, key: bytes):
+    m = re.search(rb"/" + key + rb"\s+(\d+)\b(?!\s+\d+\s+R)", d)
+    return int(m.group(1)) if m else None
+
+
+def _ref_key(d: bytes, key: bytes):
+    m = re.search(rb"/" + key + rb"\s+(\d+)\s+(\d+)\s+R", d)
+    return int(m.group(1)) if m else None
+
+
+def _array_key(d: bytes, key: bytes):
+    m = re.search(rb"/" + key + rb"\s*\[([^\]]*)\]", d)
+    return [int(x) for x in m.group(1).split()] if m else None
+
+
+def _dict_end(buf, start: int) -> int:
+    """Offset just past the ``>>`` closing the dictionary opened at ``start``."""
+    depth = 0
+    i = start
+    n = len(buf)
+    while i < n:
+        two = buf[i:i + 2]
+        if two == b"<<":
+            depth += 1
+            i += 2
+            continue
+        if two == b">>":
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+            continue
+        ch = buf[i:i + 1]
+        if ch == b"(":
+            nest = 1
+            i += 1
+            while i < n and nest:
+                c = buf[i:i + 1]
+                if c == b"\\":
+                    i += 1
+                elif c == b"(":
+                    nest += 1
+                elif c == b")":
+                    nest -= 1
+                i += 1
+            continue
+        if ch == b"<":
+            close = buf.find(b">", i)
+            if close < 0:
+                break
+            i = close + 1
+            continue
+        i += 1
+    raise PdfError(f"unterminated dictionary at byte {start}")
+
+
+def _unpredict(data: bytes, columns: int) -> bytes:
+    """Undo PNG row predictors (PDF /Predictor >= 10)."""
+    row_len = columns + 1
+    prev = bytearray(columns)
+    out = bytearray()
+    for r in range(0, len(data) - len(data) % row_len, row_len):
+        kind = data[r]
+        row = bytearray(data[r + 1:r + row_len])
+        for i in range(columns):
+            left = row[i - 1] if i else 0
+            up = prev[i]
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + ((left + up) >> 1)) & 0xFF
+            elif kind == 4:
+                upleft = prev[i - 1] if i else 0
+                p = left + up - upleft
+                pa, pb, pc = abs(p - left), abs(p - up), abs(p - upleft)
+                pred = left if pa <= pb and pa <= pc else (up if pb <= pc else upleft)
+                row[i] = (row[i] + pred) & 0xFF
+        out += row
+        prev = row
+    return bytes(out)
+
+
+class PdfStructure:
+    """Walks a memory-mapped PDF's trailer and xref sections without
+    materializing its objects; only xref and object streams are inflated."""
+
+    def __init__(self, mm):
+        self.mm = mm
+        self.size = len(mm)
+        # objnum -> (1, offset) for plain objects, (2, stream_objnum, index) for compressed ones
+        self.entries: dict[int, tuple] = {}
+        self.trailer = b""
+        self.xref_kinds: set[str] = set()
+        self._objstm: dict[int, tuple[bytes, list[int]]] = {}
+
+    def startxref(self) -> int:
+        tail_start = max(0, self.size - 2048)
+        tail = self.mm[tail_start:]
+        if b"%%EOF" not in tail:
+            raise PdfError("missing %%EOF marker (truncated upload?)")
+        matches = list(_STARTXREF.finditer(tail))
+        if not matches:
+            raise PdfError("missing startxref")
+        offset = int(matches[-1].group(1))
+        if offset >= self.size:
+            raise PdfError(f"startxref {offset} points past end of file ({self.size} bytes)")
+        return offset
+
+    def load_xref(self) -> None:
+        offset = self.startxref()
+        seen: set[int] = set()
+        while offset is not None:
+            if offset in seen or len(seen) >= MAX_PREV_CHAIN:
+                raise PdfError("xref /Prev chain loops")
+            seen.add(offset)
+            if offset >= self.size:
+                raise PdfError(f"xref section offset {offset} is past end of file")
+            if self.mm[offset:offset + 4] == b"xref":
+                trailer = self._read_table(offset)
+                stm = _int_key(trailer, b"XRefStm")
+                if stm is not None:
+                    self._read_stream(stm)
+            elif _OBJ_HEADER.match(self.mm, offset):
+                trailer = self._read_stream(offset)
+            else:
+                raise PdfError(f"xref offset {offset} points at neither an xref table nor an xref stream")
+            if not self.trailer:
+                self.trailer = trailer
+            offset = _int_key(trailer, b"Prev")
+
+    def _read_table(self, offset: int) -> bytes:
+        self.xref_kinds.add("table")
+        mm = self.mm
+        pos = offset + 4
+        while True:
+            sub = _SUBSECTION.match(mm, pos)
+            if sub is None:
+                break
+            start, count = int(sub.group(1)), int(sub.group(2))
+            pos = sub.end()
+            for i in range(count):
+                entry = _ENTRY.match(mm, pos)
+                if entry is None:
+                    raise PdfError(f"malformed xref entry at byte {pos}")
+                pos = entry.end()
+                if entry.group(3) == b"n":
+                    self.entries.setdefault(start + i, (1, int(entry.group(1))))
+        trailer = _TRAILER.match(mm, pos)
+        if trailer is None:
+            raise PdfError(f"xref table at byte {offset} has no trailer")
+        dict_start = trailer.end()
+        return bytes(mm[dict_start:_dict_end(mm, dict_start)])
+
+    def _stream_at(self, offset: int) -> tuple[bytes, bytes]:
+        """Return (dictionary, decoded data) for the stream object at ``offset``."""
+        mm = self.mm
+        header = _OBJ_HEADER.match(mm, offset)
+        if header is None:
+            raise PdfError(f"no object at byte {offset}")
+        dict_start = mm.find(b"<<", header.end(), header.end() + 64)
+        if dict_start < 0:
+            raise PdfError(f"object at byte {offset} is not a stream")
+        dict_end = _dict_end(mm, dict_start)
+        d = bytes(mm[dict_start:dict_end])
+        stream = _STREAM.match(mm, dict_end)
+        if stream is None:
+            raise PdfError(f"object at byte {offset} is not a stream")
+        length = _int_key(d, b"Length")
+        if length is None:
+            ref = _ref_key(d, b"Length")
+            try:
+                length = int(self.object_body(ref).strip()) if ref is not None else None
+            except ValueError:
+                raise PdfError(f"stream at byte {offset} has a non-numeric indirect /Length") from None
+        if length is None or stream.end() + length > self.size:
+            raise PdfError(f"stream at byte {offset} has a bad /Length")
+        raw = bytes(mm[stream.end():stream.end() + length])
+        filters = re.findall(rb"/(\w+Decode)\b", d)
+        if filters not in ([], [b"FlateDecode"]):
+            raise PdfError(f"unsupported stream filter {filters} at byte {offset}")
+        try:
+            data = zlib.decompress(raw) if filters else raw
+        except zlib.error as err:
+            raise PdfError(f"corrupt stream at byte {offset}: {err}") from None
+        predictor = _int_key(d, b"Predictor")
+        if predictor is not None and predictor >= 10:
+            data = _unpredict(data, _int_key(d, b"Columns") or 1)
+        return d, data
+
+    def _read_stream(self, offset: int) -> bytes:
+        d, data = self._stream_at(offset)
+        if not re.search(rb"/Type\s*/XRef\b", d):
+            raise PdfError(f"startxref {offset} points at neither an xref table nor an xref stream")
+        self.xref_kinds.add("stream")
+        widths = _array_key(d, b"W")
+        size = _int_key(d, b"Size")
+        if not widths or len(widths) != 3 or size is None:
+            raise PdfError(f"xref stream at byte {offset} lacks /W or /Size")
+        index = _array_key(d, b"Index") or [0, size]
+        row = sum(widths)
+        pos = 0
+        for start, count in zip(index[0::2], index[1::2]):
+            for num in range(start, start + count):
+                if pos + row > len(data):
+                    raise PdfError(f"xref stream at byte {offset} is shorter than its /Index")
+                fields = []
+                p = pos
+                for w in widths:
+                    fields.append(int.from_bytes(data[p:p + w], "big") if w else None)
+                    p += w
+                pos += row
+                kind = 1 if fields[0] is None else fields[0]
+                if kind == 1:
+                    self.entries.setdefault(num, (1, fields[1]))
+                elif kind == 2:
+                    self.entries.setdefault(num, (2, fields[1], fields[2] or 0))
+        return d
+
+    def verify_entries(self) -> int:
+        """Count in-use xref entries whose offset does not land on their object."""
+        bad = 0
+        for num, entry in self.entries.items():
+            if entry[0] != 1:
+                continue
+            header = _OBJ_HEADER.match(self.mm, entry[1]) if entry[1] < self.size else None
+            if header is None or int(header.group(1)) != num:
+                bad += 1
+        return bad
+
+    def object_body(self, num: int) -> bytes:
+        entry = self.entries.get(num)
+        if entry is None:
+            raise PdfError(f"object {num} is not in the xref")
+        if entry[0] == 1:
+            header = _OBJ_HEADER.match(self.mm, entry[1])
+            if header is None:
+                raise PdfError(f"object {num} not found at byte {entry[1]}")
+            end = self.mm.find(b"endobj", header.end())
+            return bytes(self.mm[header.end():end if end >= 0 else self.size])
+        stream_num, index = entry[1], entry[2]
+        if stream_num not in self._objstm:
+            holder = self.entries.get(stream_num)
+            if holder is None or holder[0] != 1:
+                raise PdfError(f"object stream {stream_num} is not in the xref")
+            d, data = self._stream_at(holder[1])
+            first = _int_key(d, b"First") or 0
+            try:
+                pairs = [int(x) for x in data[:first].split()]
+            except ValueError:
+                raise PdfError(f"object stream {stream_num} has a malformed header") from None
+            self._objstm[stream_num] = (data, [first + off for off in pairs[1::2]])
+        data, starts = self._objstm[stream_num]
+        if index >= len(starts):
+            raise PdfError(f"object {num} missing from object stream {stream_num}")
+        end = starts[index + 1] if index + 1 < len(starts) else len(data)
+        return data[starts[index]:end]
+
+    def page_count(self) -> int:
+        root = _ref_key(self.trailer, b"Root")
+        if root is None:
+            raise PdfError("trailer has no /Root")
+        pages = _ref_key(self.object_body(root), b"Pages")
+        if pages is None:
+            raise PdfError("catalog has no /Pages")
+        count = _int_key(self.object_body(pages), b"Count")
+        if count is None:
+            raise PdfError("page tree root has no /Count")
+        return count
+
+    def linearized(self) -> bool:
+        head = self.mm[:1024]
+        if re.search(rb"/Linearized\s+[\d.]+", head) is None:
+            return False
+        declared = re.search(rb"/L\s+(\d+)", head)
+        return declared is not None and int(declared.group(1)) == self.size
+
+
+def inspect_pdf(path: Path) -> dict:
+    """Structural summary of one PDF: size, xref kind, pages, linearization, errors."""
+    info = {"size": path.stat().st_size, "pages": None, "xref": None, "linearized": False, "errors": []}
+    if info["size"] == 0:
+        info["errors"].append("empty file")
+        return info
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[:5] != b"%PDF-":
+            info["errors"].append("invalid PDF signature")
+            return info
+        pdf = PdfStructure(mm)
+        try:
+            pdf.load_xref()
+            info["xref"] = "+".join(sorted(pdf.xref_kinds))
+            bad = pdf.verify_entries()
+            if bad:
+                info["errors"].append(f"{bad} xref entries do not point at their objects")
+            info["pages"] = pdf.page_count()
+            info["linearized"] = pdf.linearized()
+        except PdfError as err:
+            info["errors"].append(str(err))
+        except (ValueError, IndexError, OverflowError) as err:
+            info["errors"].append(f"malformed PDF structure: {err}")
+    return info
+
+
+def inspect_all(paths: list[Path], jobs: int, cache=None) -> dict[Path, dict]:
+    """Inspect PDFs on a thread pool (file reads and zlib inflation release the
+    GIL; undoing PNG predictors in _unpredict is pure Python and holds it),
+    reusing cached summaries for files whose content digest is unchanged."""
+    out: dict[Path, dict] = {}
+    todo = []
+    for path in paths:
+        if cache is not None:
+            hit, value = cache.get(str(path.relative_to(ROOT)), file_digest(path))
+            if hit:
+                out[path] = value
+                continue
+        todo.append(path)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for path, info in zip(todo, pool.map(inspect_pdf, todo)):
+            out[path] = info
+            if cache is not None:
+                cache.put(str(path.relative_to(ROOT)), file_digest(path), info)
+    return out
+
+
+def report(results, deep=False, budget=DEFAULT_BUDGET_BYTES, jobs=None, cache=None, owns=None) -> int:
+    """Check every local PDF linked in ``results``; with ``deep``, also inspect
+    structure and size of those PDFs for which ``owns(relative path)`` holds
+    (all of them by default; sharded gate runs split PDFs between runners)."""
     failures = []
     seen = set()
+    valid = []
 
-    for html in ROOT.glob("*.html"):
-        p = Parser()
-        p.feed(html.read_text(encoding="utf-8", errors="ignore"))
-        for link in p.links:
-            target = link.split("#")[0].split("?")[0]
-            if not target or not is_local_pdf(target):
+    for name, links in results:
+        for link in links:
+            target = link_graph.local_target(link, name)
+            if target is None or not is_local_pdf(target):
                 continue
             abs_path = (ROOT / target).resolve()
             if abs_path in seen:
@@ -52,8 +390,32 @@ def main() -> int:
                     sig = f.read(5)
                 if sig != b"%PDF-":
                     failures.append(f"Invalid PDF signature: {target}")
+                    continue
             except Exception as err:
                 failures.append(f"Unreadable PDF: {target} ({err})")
+                continue
+            valid.append(abs_path)
+
+    if owns is not None:
+        deep_paths = [path for path in valid if owns(path.relative_to(ROOT).as_posix())]
+    else:
+        deep_paths = valid
+    if deep and deep_paths:
+        summaries = inspect_all(deep_paths, jobs or os.cpu_count() or 1, cache)
+        print(f"PDF structure (budget {budget:,} bytes per file):")
+        for path in sorted(summaries, key=lambda p: -summaries[p]["size"]):
+            info = summaries[path]
+            rel = path.relative_to(ROOT)
+            pct = info["size"] * 100.0 / budget if budget else 0.0
+            print(
+                f" - {rel}: {info['size']:,} bytes ({pct:.0f}% of budget), "
+                f"{info['pages'] if info['pages'] is not None else '?'} pages, "
+                f"xref {info['xref'] or '?'}, linearized {'yes' if info['linearized'] else 'no'}"
+            )
+            for error in info["errors"]:
+                failures.append(f"Corrupt PDF: {rel} ({error})")
+            if budget and info["size"] > budget:
+                failures.append(f"PDF over byte budget: {rel} ({info['size']:,} > {budget:,} bytes)")
 
     if failures:
         print("PDF checks failed:")
@@ -65,5 +427,24 @@ def main() -> int:
     return 0
 
 
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--deep", action="store_true",
+                        help="Also validate %%EOF/startxref/xref structure, page count and linearization.")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_BUDGET_BYTES,
+                        help="Per-file byte budget enforced in --deep mode (0 disables).")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker threads for --deep.")
+    _changes.add_argument(parser)
+    args = parser.parse_args(argv)
+    changes = _changes.from_args(args, parser)
+    graph = link_graph.load_graph()
+    if changes is None or changes.touches([Path(__file__), Path(link_graph.__file__)]):
+        results = graph.results()
+    else:
+        pdfs = {path for path in changes.touched if path.lower().endswith(".pdf")}
+        results = graph.affected(changes, pdfs)
+    return report(results, deep=args.deep, budget=args.max_bytes, jobs=args.jobs)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Static load-performance lint for HTML pages (render blocking, layout shift, lazy loading)."""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+from urllib.parse import urlsplit
+
+import _changes
+from _site import Page, PageVisitor, load_pages, scan
+from link_graph import local_target
+
+ROOT = Path(__file__).resolve().parents[1]
+# Inline <script>/<style> bodies above this many bytes should be external files.
+MAX_INLINE_BYTES = 4096
+# Accepted findings per rule of pages with known findings; a listed page fails
+# on any finding beyond its accepted count for that rule. Every other page
+# must score MIN_PAGE_SCORE.
+BASELINE_PATH = Path(__file__).resolve().parent / 'rules' / 'perf-baseline.json'
+MIN_PAGE_SCORE = 100.0
+HEAD_TAGS = {'title', 'meta', 'link', 'style', 'script', 'base', 'noscript', 'template'}
+JS_TYPES = {'', 'text/javascript', 'application/javascript', 'module'}
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+# Origins that serve a second origin the page also needs a connection to.
+PAIRED_ORIGINS = {'https://fonts.googleapis.com': 'https://fonts.gstatic.com'}
+
+
+class PerfParser(PageVisitor):
+    """Per-page ``{'checks', 'passes', 'issues', 'rules'}``; every applicable rule counts as
+    one check, and ``rules`` counts the findings of each rule.
+
+    The first screen is everything before ``<main>`` plus its first child
+    block, the same fold ``css_coverage.py`` uses.
+    """
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.checks = 0
+        self.issues: list[str] = []
+        self.rules: dict[str, int] = {}
+        self.in_head = False
+        self.stack: list[str] = []
+        self.main_depth: int | None = None
+        self.main_children = 0
+        self.below_fold = False
+        self.scripts: dict[str, int] = {}
+        self.origins: dict[str, int] = {}
+        self.preconnected: set[str] = set()
+        self.inline: tuple[str, int] | None = None
+        self.inline_size = 0
+
+    def check(self, ok: bool, rule: str, issue: str, line: int | None = None) -> None:
+        self.checks += 1
+        if not ok:
+            self.finding(rule, f'line {self.lineno if line is None else line}: {issue}')
+
+    def finding(self, rule: str, issue: str) -> None:
+        self.issues.append(issue)
+        self.rules[rule] = self.rules.get(rule, 0) + 1
+
+    def handle_starttag(self, tag: str, attrs):
+        attr = dict(attrs)
+        if tag == 'head':
+            self.in_head = True
+        elif tag not in HEAD_TAGS:
+            self.in_head = False
+        if self.main_depth is not None and len(self.stack) == self.main_depth + 1:
+            self.main_children += 1
+            self.below_fold = self.below_fold or self.main_children > 1
+        if tag == 'main' and self.main_depth is None:
+            self.main_depth = len(self.stack)
+
+        if tag == 'script':
+            src = (attr.get('src') or '').strip()
+            if src:
+                key = local_target(src, self.page.name) or src
+                self.scripts[key] = self.scripts.get(key, 0) + 1
+                self.note_origin(src, blocking=self.in_head)
+                if self.in_head:
+                    deferred = 'defer' in attr or 'async' in attr or attr.get('type') == 'module'
+                    self.check(deferred, 'blocking-script', f'render-blocking <script src="{src}"> in <head> (add defer or async)')
+            elif (attr.get('type') or '').strip().lower() in JS_TYPES:
+                self.inline, self.inline_size = ('script', self.lineno), 0
+        if tag == 'style':
+            self.inline, self.inline_size = ('style', self.lineno), 0
+        if tag == 'link':
+            rels = set((attr.get('rel') or '').lower().split())
+            href = (attr.get('href') or '').strip()
+            if rels & {'preconnect', 'dns-prefetch'}:
+                self.preconnected.add(origin(href))
+            elif 'stylesheet' in rels:
+                self.note_origin(href, blocking=True)
+        if tag == 'img':
+            src = attr.get('src') or ''
+            self.check('width' in attr and 'height' in attr, 'image-size',
+                       f'<img src="{src}"> without width/height (layout shift)')
+            if self.below_fold:
+                self.check((attr.get('loading') or '').lower() == 'lazy', 'lazy-image',
+                           f'<img src="{src}"> below the first screen without loading="lazy"')
+
+        if tag not in VOID_TAGS:
+            self.stack.append(tag)
+
+    def handle_data(self, data: str):
+        if self.inline is not None:
+            self.inline_size += len(data.encode('utf-8'))
+
+    def handle_endtag(self, tag: str):
+        if tag == 'head':
+            self.in_head = False
+        if self.inline is not None and tag == self.inline[0]:
+            kind, line = self.inline
+            self.check(self.inline_size <= MAX_INLINE_BYTES, f'inline-{kind}',
+                       f'inline <{kind}> of {self.inline_size} bytes '
+                       f'(over {MAX_INLINE_BYTES}; move it to a cacheable file)', line)
+            self.inline = None
+        if tag in self.stack:
+            while self.stack.pop() != tag:
+                pass
+            if tag == 'main':
+                self.below_fold = True
+            elif self.main_depth is not None and len(self.stack) == self.main_depth + 1 and self.main_children:
+                self.below_fold = True
+
+    def note_origin(self, url: str, blocking: bool) -> None:
+        host = origin(url)
+        if host and blocking:
+            self.origins.setdefault(host, self.lineno)
+
+    def close(self):
+        for script, count in sorted(self.scripts.items()):
+            self.checks += 1
+            if count > 1:
+                self.finding('duplicate-script', f'script {script} included {count} times')
+        needed = dict(self.origins)
+        for host, line in self.origins.items():
+            if host in PAIRED_ORIGINS:
+                needed.setdefault(PAIRED_ORIGINS[host], line)
+        for host, line in sorted(needed.items()):
+            self.check(host in self.preconnected, 'preconnect',
+                       f'no <link rel="preconnect" href="{host}"> for render-blocking resources', line)
+
+    def result(self) -> dict:
+        return {'checks': self.checks, 'passes': self.checks - len(self.issues), 'issues': self.issues,
+                'rules': self.rules}
+
+
+def origin(url: str) -> str:
+    """``scheme://host`` of an absolute URL, or '' for local ones."""
+    parts = urlsplit(url.strip())
+    if url.strip().startswith('//'):
+        return f'https://{parts.netloc}'
+    return f'{parts.scheme}://{parts.netloc}' if parts.scheme in ('http', 'https') and parts.netloc else ''
+
+
+def score(found: dict) -> float:
+    return found['passes'] / found['checks'] * 100.0 if found['checks'] else 100.0
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict[str, dict[str, int]]:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))['pages']
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(results: list[tuple[str, dict]], path: Path = BASELINE_PATH) -> None:
+    payload = {
+        'description': 'Accepted findings per rule for pages with known findings, written by '
+                       'check_perf_lint.py --update-baseline. A page fails on any finding beyond these '
+                       'counts; unlisted pages must have no findings.',
+        'pages': {name: dict(sorted(found['rules'].items())) for name, found in sorted(results) if found['issues']},
+    }
+    path.write_text(json.dumps(payload, indent=2) + '\n', encoding='utf-8')
+
+
+def new_findings(found: dict, accepted: dict[str, int]) -> list[str]:
+    """Rules with more findings than ``accepted`` allows, as ``rule (+n)``."""
+    return [f'{rule} (+{count - accepted.get(rule, 0)})' for rule, count in sorted(found['rules'].items())
+            if count > accepted.get(rule, 0)]
+
+
+def report(results: list[tuple[str, dict]], baseline: dict[str, dict[str, int]] | None = None,
+           min_score: float = MIN_PAGE_SCORE) -> int:
+    baseline = load_baseline() if baseline is None else baseline
+    checks = sum(found['checks'] for _, found in results)
+    passes = sum(found['passes'] for _, found in results)
+    total = passes / checks * 100.0 if checks else 100.0
+    print(f'Web performance lint score: {total:.1f}% ({passes}/{checks} checks passed)')
+    regressed = []
+    for name, found in sorted(results, key=lambda item: (score(item[1]), item[0])):
+        if not found['issues']:
+            continue
+        if name in baseline:
+            new = new_findings(found, baseline[name])
+            status = f'new findings: {", ".join(new)}' if new else 'findings accepted in the baseline'
+        else:
+            new = [f'score below {min_score:.1f}%'] if round(score(found), 1) < min_score else []
+            status = 'not in the baseline'
+        print(f' - {name}: {score(found):.1f}% ({status})')
+        for issue in found['issues']:
+            print(f'     {issue}')
+        if new:
+            regressed.append(name)
+    if regressed:
+        print(f'Web performance lint failed: {", ".join(regressed)} has findings beyond the baseline '
+              f'(fix the findings, or accept them with --update-baseline).')
+        return 1
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--min-score', type=float, default=MIN_PAGE_SCORE,
+                        help='Score required of pages not listed in the baseline.')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help=f'Accept the current findings into {BASELINE_PATH.relative_to(ROOT)}.')
+    _changes.add_argument(parser)
+    args = parser.parse_args(argv)
+    changes = _changes.from_args(args, parser)
+    pages = load_pages(ROOT)
+    if changes is not None and not args.update_baseline:
+        pages = changes.select_pages(pages, [Path(__file__), BASELINE_PATH])
+    results = scan(pages, {'perf': PerfParser})['perf']
+    if args.update_baseline:
+        save_baseline(results)
+        print(f'Baseline written to {BASELINE_PATH.relative_to(ROOT)}')
+    return report(results, min_score=args.min_score)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
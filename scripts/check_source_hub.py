@@ -2,9 +2,12 @@
 """Validate Further Sources integration across key pages."""
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 import sys
 
+import _changes
+
 ROOT = Path(__file__).resolve().parents[1]
 
 REQUIRED_FILES = [
@@ -33,7 +36,18 @@ REQUIRED_PAGE_MARKERS = {
 }
 
 
-def main() -> int:
+def cache_inputs() -> list[Path]:
+    return REQUIRED_FILES + [ROOT / page for page in REQUIRED_PAGE_MARKERS]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _changes.add_argument(parser)
+    changes = _changes.from_args(parser.parse_args(argv), parser)
+    if changes is not None and not changes.touches([Path(__file__), *cache_inputs()]):
+        print(f"No changes affecting Further Sources integration since {changes.ref}; skipped.")
+        return 0
+
     failures: list[str] = []
 
     for req in REQUIRED_FILES:
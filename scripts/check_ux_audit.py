@@ -2,16 +2,19 @@
 """Lightweight sitewide UX audit with actionable checks."""
 from __future__ import annotations
 
-from html.parser import HTMLParser
+import argparse
 from pathlib import Path
 import sys
 
+import _changes
+from _site import PageVisitor, load_pages, visit
+
 ROOT = Path(__file__).resolve().parents[1]
 
 
-class UXParser(HTMLParser):
-    def __init__(self):
-        super().__init__()
+class UXParser(PageVisitor):
+    def __init__(self, page):
+        super().__init__(page)
         self.has_skip_link = False
         self.has_main = False
         self.has_nav_toggle = False
@@ -45,16 +48,13 @@ class UXParser(HTMLParser):
             self._label_depth -= 1
 
 
-def main() -> int:
-    files = sorted(ROOT.glob("*.html"))
+def report(visited) -> int:
     warnings = []
     passes = 0
     checks = 0
 
-    for f in files:
-        text = f.read_text(encoding="utf-8", errors="ignore")
-        p = UXParser()
-        p.feed(text)
+    for p in visited:
+        f = p.page
 
         checks += 2
         if p.has_skip_link:
@@ -94,5 +94,15 @@ def main() -> int:
     return 0
 
 
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _changes.add_argument(parser)
+    changes = _changes.from_args(parser.parse_args(argv), parser)
+    pages = load_pages(ROOT)
+    if changes is not None:
+        pages = changes.select_pages(pages, [Path(__file__)])
+    return report(visit(pages, {"ux": UXParser})["ux"])
+
+
 if __name__ == "__main__":
     sys.exit(main())
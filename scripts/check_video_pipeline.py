@@ -2,16 +2,30 @@
 """Validate video library/caption pipeline metadata."""
 from __future__ import annotations
 
+import argparse
 import json
 from pathlib import Path
 import sys
 
+import _changes
+
 ROOT = Path(__file__).resolve().parents[1]
 LIB = ROOT / "data" / "video-library.json"
 ALLOWED_TRANSCRIPT_STATUS = {"youtube_transcript", "publisher_transcript", "local_transcript", "none"}
 
 
-def main() -> int:
+def cache_inputs() -> list[Path]:
+  return [LIB]
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(description=__doc__)
+  _changes.add_argument(parser)
+  changes = _changes.from_args(parser.parse_args(argv), parser)
+  if changes is not None and not changes.touches([Path(__file__), *cache_inputs()]):
+    print(f"No changes affecting the video library since {changes.ref}; skipped.")
+    return 0
+
   if not LIB.exists():
     print(f"Missing video library manifest: {LIB}")
     return 1
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""Report unused CSS rules and extract per-page critical CSS.
+
+Every selector in the stylesheet is matched against the DOM of every page
+that loads it. Matching goes right to left from candidates looked up in
+indexes (a site-wide key -> pages index, then a per-page tag/class/id ->
+elements index), so the cost follows the number of plausible matches rather
+than selectors x elements.
+
+Scripts add classes and attributes at runtime, so a selector that matches
+only once the class, id and attribute names appearing in ``js/*.js`` string
+literals are ignored is reported as JS-dependent rather than unused.
+Pseudo-classes are treated as always satisfiable.
+
+The critical subset of a page is every rule matching an element above the
+fold: everything before ``<main>`` (skip links, navigation, header) plus the
+first block inside it, and their ancestors. Print-only rules are never
+critical.
+"""
+from __future__ import annotations
+
+import argparse
+from bisect import bisect_left
+from pathlib import Path
+import re
+import sys
+
+from _minify import css_tokens, js_tokens, minify_css
+from _site import END, START, Page, load_pages
+import link_graph
+
+ROOT = Path(__file__).resolve().parents[1]
+STYLESHEET = "css/styles.css"
+SCRIPTS = "js/*.js"
+# At-rules whose blocks contain ordinary rules.
+GROUPING_AT_RULES = ("@media", "@supports", "@layer", "@container")
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+}
+# Block elements that may hold the fold when a page has no <main>.
+FOLD_FALLBACK = 2
+
+_NAME = r"(?:[\w-]|\\.)+"
+_SIMPLE = re.compile(
+    rf"(?P<tag>\*|{_NAME})|#(?P<id>{_NAME})|\.(?P<cls>{_NAME})|\[(?P<attr>[^\]]*)\]|(?P<pseudo>::?{_NAME})"
+)
+_ATTR = re.compile(r"""\s*([\w:-]+)\s*(?:([~|^$*]?=)\s*(?:"([^"]*)"|'([^']*)'|([^\s\]]+)))?\s*(i)?\s*$""", re.I)
+_JS_WORD = re.compile(r"[\w-]+")
+
+
+class Element:
+    __slots__ = ("tag", "id", "classes", "attrs", "parent", "prev", "pos")
+
+    def __init__(self, tag: str, attrs, parent: "Element | None", prev: "Element | None", pos: int):
+        self.tag = tag
+        self.pos = pos
+        self.attrs = {name: value or "" for name, value in attrs}
+        self.id = self.attrs.get("id")
+        self.classes = set(self.attrs.get("class", "").split())
+        self.parent = parent
+        self.prev = prev
+
+
+class PageIndex:
+    """A page's elements in document order, indexed by tag, class and id."""
+
+    def __init__(self, page: Page):
+        self.name = page.name
+        self.elements: list[Element] = []
+        self.by_key: dict[str, list[Element]] = {}
+        stack: list[Element] = []
+        last_child: dict[int, Element | None] = {}
+        for kind, tag, attrs, _ in page.events:
+            if kind == START:
+                parent = stack[-1] if stack else None
+                element = Element(tag, attrs, parent, last_child.get(id(parent)), len(self.elements))
+                last_child[id(parent)] = element
+                self.elements.append(element)
+                for key in keys_of(element):
+                    self.by_key.setdefault(key, []).append(element)
+                if tag not in VOID_TAGS:
+                    stack.append(element)
+            elif kind == END and any(open_.tag == tag for open_ in stack):
+                while stack.pop().tag != tag:
+                    pass
+        self.fold = {element.pos for element in fold_elements(self.elements)}
+        self.fold_end = max(self.fold, default=-1)
+
+    def candidates(self, compound: "Compound") -> list[Element]:
+        keys = compound.keys()
+        if not keys:
+            return self.elements
+        return min((self.by_key.get(key, []) for key in keys), key=len)
+
+
+def keys_of(element: Element) -> list[str]:
+    keys = [f"<{element.tag}"] + [f".{cls}" for cls in element.classes] + [f"[{name}" for name in element.attrs]
+    if element.id:
+        keys.append(f"#{element.id}")
+    return keys
+
+
+def fold_elements(elements: list[Element]) -> list[Element]:
+    """Elements above the fold, with their ancestors."""
+    main = next((element for element in elements if element.tag == "main"), None)
+    if main is not None:
+        start = elements.index(main)
+        fold = elements[:start]
+        blocks = [element for element in elements[start + 1:start + 2] if element.parent is main]
+    else:
+        body = next((element for element in elements if element.tag == "body"), None)
+        start = elements.index(body) if body is not None else -1
+        fold = []
+        blocks = [element for element in elements if element.parent is body][:FOLD_FALLBACK]
+    # A subtree is contiguous in document order.
+    for block in blocks:
+        end = elements.index(block, start + 1)
+        while end < len(elements) and within(elements[end], block):
+            fold.append(elements[end])
+            end += 1
+    seen = {id(element) for element in fold}
+    for element in list(fold):
+        parent = element.parent
+        while parent is not None and id(parent) not in seen:
+            seen.add(id(parent))
+            fold.append(parent)
+            parent = parent.parent
+    return fold
+
+
+def within(element: Element | None, ancestor: Element) -> bool:
+    while element is not None:
+        if element is ancestor:
+            return True
+        element = element.parent
+    return False
+
+
+class Compound:
+    """One compound selector (``tag#id.class[attr]``); pseudo-classes are dropped."""
+
+    __slots__ = ("tag", "id", "classes", "attrs")
+
+    def __init__(self, tag: str | None = None, id_: str | None = None, classes=(), attrs=()):
+        self.tag = tag
+        self.id = id_
+        self.classes = tuple(classes)
+        self.attrs = tuple(attrs)
+
+    @classmethod
+    def parse(cls, text: str) -> "Compound":
+        compound = cls()
+        classes, attrs = [], []
+        pos = 0
+        while pos < len(text):
+            match = _SIMPLE.match(text, pos)
+            if match is None:
+                raise ValueError(f"unsupported selector part {text[pos:]!r}")
+            pos = match.end()
+            if match["tag"] and match["tag"] != "*":
+                compound.tag = unescape(match["tag"]).lower()
+            elif match["id"]:
+                compound.id = unescape(match["id"])
+            elif match["cls"]:
+                classes.append(unescape(match["cls"]))
+            elif match["attr"] is not None:
+                parsed = _ATTR.match(match["attr"])
+                if parsed is None:
+                    raise ValueError(f"unsupported attribute selector [{match['attr']}]")
+                name, op, *values, flag = parsed.groups()
+                value = next((v for v in values if v is not None), None)
+                attrs.append((name.lower(), op, value, bool(flag)))
+            elif match["pseudo"]:
+                if text.startswith("(", pos):
+                    pos = closing_paren(text, pos) + 1
+                if match["pseudo"].lower() == ":root":
+                    compound.tag = "html"
+        compound.classes, compound.attrs = tuple(classes), tuple(attrs)
+        return compound
+
+    def keys(self) -> list[str]:
+        keys = [f".{cls}" for cls in self.classes]
+        if self.id:
+            keys.append(f"#{self.id}")
+        if self.tag:
+            keys.append(f"<{self.tag}")
+        return keys + [f"[{attr[0]}" for attr in self.attrs]
+
+    def matches(self, element: Element) -> bool:
+        if self.tag and element.tag != self.tag:
+            return False
+        if self.id and element.id != self.id:
+            return False
+        if not element.classes.issuperset(self.classes):
+            return False
+        return all(attr_matches(element, *attr) for attr in self.attrs)
+
+    def relaxed(self, dynamic: set[str]) -> "Compound":
+        """This compound without the classes, id and attributes scripts may set."""
+        return Compound(
+            self.tag,
+            None if self.id in dynamic else self.id,
+            [cls for cls in self.classes if cls not in dynamic],
+            [attr for attr in self.attrs if attr[0] not in dynamic and attr[2] not in dynamic],
+        )
+
+
+def unescape(name: str) -> str:
+    return re.sub(r"\\(.)", r"\1", name)
+
+
+def closing_paren(text: str, start: int) -> int:
+    depth = 0
+    for pos in range(start, len(text)):
+        depth += {"(": 1, ")": -1}.get(text[pos], 0)
+        if depth == 0:
+            return pos
+    raise ValueError(f"unbalanced parentheses in {text!r}")
+
+
+def attr_matches(element: Element, name: str, op: str | None, value: str | None, fold_case: bool) -> bool:
+    if name not in element.attrs:
+        return False
+    if op is None:
+        return True
+    actual = element.attrs[name]
+    if fold_case:
+        actual, value = actual.lower(), value.lower()
+    if op == "=":
+        return actual == value
+    if op == "~=":
+        return value in actual.split()
+    if op == "|=":
+        return actual == value or actual.startswith(value + "-")
+    if op == "^=":
+        return bool(value) and actual.startswith(value)
+    if op == "$=":
+        return bool(value) and actual.endswith(value)
+    return bool(value) and value in actual
+
+
+def split_top_level(text: str, separators: str) -> list[tuple[str, str]]:
+    """Split at ``separators`` outside brackets, parens and strings.
+    Returns ``(separator before, part)`` pairs; the first separator is ``""``."""
+    parts: list[tuple[str, str]] = []
+    depth, quote, sep, start = 0, "", "", 0
+    for pos, ch in enumerate(text):
+        if quote:
+            quote = "" if ch == quote else quote
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif depth == 0 and ch in separators:
+            parts.append((sep, text[start:pos]))
+            sep, start = ch, pos + 1
+    parts.append((sep, text[start:]))
+    return parts
+
+
+class Selector:
+    """A complex selector as ``(combinator, compound)`` pairs, left to right."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.parts: list[tuple[str, Compound]] = []
+        combinator = ""
+        for sep, token in split_top_level(text.strip(), " \t\n>+~"):
+            if sep.strip():
+                combinator = sep
+            elif sep and not combinator:
+                combinator = " "
+            if token:
+                self.parts.append((combinator if self.parts else "", Compound.parse(token)))
+                combinator = ""
+
+    def relaxed(self, dynamic: set[str]) -> "Selector":
+        copy = Selector.__new__(Selector)
+        copy.text = self.text
+        copy.parts = [(comb, compound.relaxed(dynamic)) for comb, compound in self.parts]
+        return copy
+
+    @property
+    def subject(self) -> Compound:
+        return self.parts[-1][1]
+
+    def matches(self, element: Element, index: int | None = None) -> bool:
+        index = len(self.parts) - 1 if index is None else index
+        combinator, compound = self.parts[index]
+        if not compound.matches(element):
+            return False
+        if index == 0:
+            return True
+        if combinator == ">":
+            return element.parent is not None and self.matches(element.parent, index - 1)
+        if combinator == "+":
+            return element.prev is not None and self.matches(element.prev, index - 1)
+        step = "parent" if combinator == " " else "prev"
+        other = getattr(element, step)
+        while other is not None:
+            if self.matches(other, index - 1):
+                return True
+            other = getattr(other, step)
+        return False
+
+
+class Rule:
+    """One style rule (or a non-grouping at-rule such as ``@keyframes``).
+
+    ``selectors`` is None for at-rules and selectors this module cannot parse;
+    such rules are always kept.
+    """
+
+    __slots__ = ("selectors", "prelude", "text", "media", "line", "size")
+
+    def __init__(self, prelude: str, body: str, media: tuple[str, ...], line: int):
+        self.prelude = " ".join(prelude.split())
+        self.text = minify_css(f"{prelude}{{{body}}}").strip()
+        self.media = media
+        self.line = line
+        self.size = len(self.text.encode("utf-8"))
+        self.selectors: list[Selector] | None = None
+        if not prelude.startswith("@"):
+            try:
+                self.selectors = [Selector(part) for _, part in split_top_level(prelude, ",") if part.strip()]
+            except ValueError:
+                pass  # unsupported syntax: kept, like at-rules
+
+
+def _block_end(css: str, start: int) -> int:
+    depth = 0
+    pos = start
+    while pos < len(css):
+        ch = css[pos]
+        if ch in "\"'":
+            pos = css.index(ch, pos + 1) + 1
+            continue
+        depth += {"{": 1, "}": -1}.get(ch, 0)
+        if depth == 0:
+            return pos
+        pos += 1
+    raise ValueError("unbalanced braces in stylesheet")
+
+
+def parse_stylesheet(source: str) -> list[Rule]:
+    # Comments become spaces so offsets and line numbers still match the source.
+    css = "".join(
+        re.sub(r"[^\n]", " ", text) if kind == "comment" else text for kind, text in css_tokens(source)
+    )
+    newlines = [m.start() for m in re.finditer("\n", css)]
+    rules: list[Rule] = []
+    media: list[str] = []
+    pos = start = 0
+    while pos < len(css):
+        ch = css[pos]
+        if ch in "\"'":
+            pos = css.index(ch, pos + 1) + 1
+        elif ch == "{":
+            prelude = css[start:pos].strip()
+            if prelude.startswith(GROUPING_AT_RULES):
+                media.append(" ".join(prelude.split()))
+                pos = start = pos + 1
+                continue
+            end = _block_end(css, pos)
+            offset = start + len(css[start:pos]) - len(css[start:pos].lstrip())
+            rules.append(Rule(prelude, css[pos + 1:end], tuple(media), bisect_left(newlines, offset) + 1))
+            pos = start = end + 1
+        elif ch == "}":
+            if not media:
+                raise ValueError(f"unmatched '}}' on line {bisect_left(newlines, pos) + 1}")
+            media.pop()
+            pos = start = pos + 1
+        elif ch == ";":
+            pos = start = pos + 1
+        else:
+            pos += 1
+    return rules
+
+
+def script_words(paths: list[Path]) -> set[str]:
+    """Class, id and attribute names that scripts may set: words in their string literals."""
+    words: set[str] = set()
+    for path in paths:
+        for kind, text in js_tokens(path.read_text(encoding="utf-8")):
+            if kind in ("string", "template"):
+                words.update(_JS_WORD.findall(text))
+    return words
+
+
+class Coverage:
+    """Rule usage across a set of pages."""
+
+    def __init__(self, rules: list[Rule], pages: list[Page], dynamic: set[str]):
+        self.rules = rules
+        self.indexes = [PageIndex(page) for page in pages]
+        self.pages_by_key: dict[str, set[int]] = {}
+        for i, index in enumerate(self.indexes):
+            for key in index.by_key:
+                self.pages_by_key.setdefault(key, set()).add(i)
+        # rule index -> page index -> whether a match is above the fold (strict),
+        # and the pages matched once script-set names are ignored
+        self.strict: dict[int, dict[int, bool]] = {}
+        self.loose: dict[int, set[int]] = {}
+        for r, rule in enumerate(rules):
+            if rule.selectors is None:
+                continue
+            self.strict[r] = self.match(rule.selectors)
+            relaxed = [selector.relaxed(dynamic) for selector in rule.selectors]
+            self.loose[r] = set(self.strict[r]) | set(self.match(relaxed, skip=set(self.strict[r]), fold=False))
+
+    def candidate_pages(self, selector: Selector) -> set[int] | range:
+        """Pages having every tag, class, id and attribute name the selector needs."""
+        pages: set[int] | None = None
+        for key in {key for _, compound in selector.parts for key in compound.keys()}:
+            found = self.pages_by_key.get(key, set())
+            pages = found if pages is None else pages & found
+        return range(len(self.indexes)) if pages is None else pages
+
+    def match(self, selectors: list[Selector], skip: set[int] = frozenset(),
+              fold: bool = True) -> dict[int, bool]:
+        """Pages where any selector matches -> whether it matches above the fold.
+
+        Candidates are in document order, so the scan stops at the first match,
+        or with ``fold`` at the first match above it or once past the fold.
+        """
+        matched: dict[int, bool] = {}
+        for selector in selectors:
+            for i in self.candidate_pages(selector):
+                if i in skip or matched.get(i) or (i in matched and not fold):
+                    continue
+                index = self.indexes[i]
+                for element in index.candidates(selector.subject):
+                    if i in matched and element.pos > index.fold_end:
+                        break
+                    if selector.matches(element):
+                        matched[i] = element.pos in index.fold
+                        if matched[i] or not fold:
+                            break
+        return matched
+
+    def status(self, r: int) -> str:
+        if r not in self.strict:
+            return "kept"
+        if self.strict[r]:
+            return "used"
+        return "dynamic" if self.loose[r] else "unused"
+
+    def critical(self, i: int) -> list[Rule]:
+        return [
+            rule for r, rule in enumerate(self.rules)
+            if r in self.strict
+            and not any("print" in media for media in rule.media)
+            and self.strict[r].get(i)
+        ]
+
+    def used_on(self, i: int) -> int:
+        """Bytes of rules that may apply on page ``i`` (including JS-dependent ones)."""
+        return sum(rule.size for r, rule in enumerate(self.rules) if r not in self.loose or i in self.loose[r])
+
+
+def render(rules: list[Rule]) -> str:
+    """Rules as CSS, re-wrapped in their grouping at-rules."""
+    out: list[str] = []
+    for rule in rules:
+        text = rule.text
+        for media in reversed(rule.media):
+            text = f"{media}{{{text}}}"
+        out.append(text)
+    return "\n".join(out) + "\n" if out else ""
+
+
+def pages_loading(stylesheet: str) -> list[Page]:
+    pages = load_pages(ROOT)
+    graph = link_graph.load_graph(pages)
+    return [
+        page for page in pages
+        if any(link_graph.local_target(link, page.name) == stylesheet for link in graph.links(page.name))
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--css", default=STYLESHEET, help="Stylesheet to analyze (repo-relative).")
+    parser.add_argument("--critical", type=Path, metavar="DIR", help="Write each page's critical CSS to DIR/<page>.css.")
+    parser.add_argument("--fail-on-unused", action="store_true", help="Exit 1 if any rule is unused.")
+    args = parser.parse_args(argv)
+
+    source = (ROOT / args.css).read_text(encoding="utf-8")
+    try:
+        rules = parse_stylesheet(source)
+    except ValueError as err:
+        print(f"{args.css}: {err}")
+        return 1
+    pages = pages_loading(args.css)
+    coverage = Coverage(rules, pages, script_words(sorted(ROOT.glob(SCRIPTS))))
+    total = sum(rule.size for rule in rules)
+    statuses = [coverage.status(r) for r in range(len(rules))]
+
+    print(f"{args.css}: {len(rules)} rules, {total / 1024:.1f} KiB minified, loaded by {len(pages)} pages")
+    for status, heading in (("unused", "Unused rules (no page matches)"),
+                            ("dynamic", "JS-dependent rules (match only with classes/attributes set by scripts)")):
+        picked = [rule for rule, s in zip(rules, statuses) if s == status]
+        print(f"{heading}: {len(picked)} rules, {sum(rule.size for rule in picked) / 1024:.1f} KiB")
+        if status == "unused":
+            for rule in picked:
+                scope = f" [{' '.join(rule.media)}]" if rule.media else ""
+                print(f"  {args.css}:{rule.line}  {rule.prelude}{scope}")
+
+    print("Per page (KiB): unused = rules that cannot apply to the page; critical = inline subset; "
+          "saved = render-blocking bytes saved by inlining critical CSS and loading the rest async")
+    print(f"  {'page':<44} {'unused':>8} {'critical':>9} {'saved':>8}")
+    rows = []
+    for i, page in enumerate(pages):
+        critical = render(coverage.critical(i))
+        size = len(critical.encode("utf-8"))
+        rows.append((page.name, total - coverage.used_on(i), size, total - size))
+        if args.critical:
+            args.critical.mkdir(parents=True, exist_ok=True)
+            (args.critical / f"{Path(page.name).stem}.css").write_text(critical, encoding="utf-8")
+    for name, unused, critical, saved in sorted(rows, key=lambda row: (-row[1], row[0])):
+        print(f"  {name:<44} {unused / 1024:>8.1f} {critical / 1024:>9.1f} {saved / 1024:>8.1f}")
+    if args.critical:
+        print(f"Critical CSS written to {args.critical}/")
+    return 1 if args.fail_on_unused and "unused" in statuses else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
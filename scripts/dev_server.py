@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""Local dev server that behaves like the Netlify deploy.
+
+Applies the ``[[headers]]`` and ``[[redirects]]`` rules in ``netlify.toml``
+(re-read when the file changes), serves precompressed ``.br``/``.gz``
+siblings or compresses text on the fly, answers conditional requests with
+304 and byte ranges with 206, and routes ``/.netlify/functions/*`` (and so
+``/api/*``) to ``functions_host.js``, which runs the real handlers in
+``netlify/functions`` under node. Variables from ``.env`` are passed to the
+functions unless already set in the environment.
+
+Requests are handled on a thread each; responses use HTTP/1.1 keep-alive.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+import gzip
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import mimetypes
+import os
+from pathlib import Path
+import posixpath
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import tomllib
+from urllib.parse import unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+ROOT = Path(__file__).resolve().parents[1]
+CONFIG = ROOT / "netlify.toml"
+ENV_FILE = ROOT / ".env"
+FUNCTIONS_HOST = Path(__file__).resolve().parent / "functions_host.js"
+FUNCTIONS_PREFIX = "/.netlify/functions/"
+# Netlify's default for responses without a Cache-Control rule.
+DEFAULT_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+# Smaller bodies are not worth compressing.
+MIN_COMPRESS_BYTES = 256
+COMPRESSIBLE = re.compile(r"^(text/|application/(json|javascript|xml|manifest\+json)|image/svg\+xml)")
+# On-the-fly compressed bodies kept in memory, by total size.
+COMPRESS_CACHE_BYTES = 32 * 1024 * 1024
+CHUNK = 64 * 1024
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "te", "trailer", "upgrade"}
+
+mimetypes.add_type("text/javascript", ".js")
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+mimetypes.add_type("image/svg+xml", ".svg")
+
+
+def _pattern(path: str) -> re.Pattern:
+    """Regex for a Netlify path pattern: ``:name`` is one segment, ``*`` the rest."""
+    out = []
+    for token in re.split(r"(:[A-Za-z_]\w*|\*)", path):
+        if token == "*":
+            out.append("(?P<splat>.*)")
+        elif token.startswith(":"):
+            out.append(f"(?P<{token[1:]}>[^/]+)")
+        else:
+            out.append(re.escape(token))
+    return re.compile("".join(out) + "/?$")
+
+
+@dataclass
+class Redirect:
+    source: str
+    to: str
+    status: int
+    force: bool
+    pattern: re.Pattern
+
+    def target(self, path: str) -> str | None:
+        match = self.pattern.match(path)
+        if match is None:
+            return None
+        groups = {name: value or "" for name, value in match.groupdict().items()}
+        return re.sub(r":([A-Za-z_]\w*)", lambda m: groups.get(m.group(1), m.group(0)), self.to)
+
+
+@dataclass
+class HeaderRule:
+    source: str
+    values: dict[str, str]
+    pattern: re.Pattern
+
+
+class SiteConfig:
+    """The ``netlify.toml`` rules, reloaded whenever the file's mtime changes."""
+
+    def __init__(self, path: Path = CONFIG):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: int | None = None
+        self.redirects: list[Redirect] = []
+        self.headers: list[HeaderRule] = []
+        self.refresh()
+
+    def refresh(self) -> None:
+        try:
+            stamp = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            stamp = None
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            data = tomllib.loads(self.path.read_text(encoding="utf-8")) if stamp is not None else {}
+            self.redirects = [
+                Redirect(rule["from"], rule["to"], int(rule.get("status", 301)), bool(rule.get("force", False)),
+                         _pattern(rule["from"]))
+                for rule in data.get("redirects", [])
+            ]
+            self.headers = [
+                HeaderRule(rule["for"], {str(k): str(v) for k, v in rule.get("values", {}).items()},
+                           _pattern(rule["for"]))
+                for rule in data.get("headers", [])
+            ]
+            self._stamp = stamp
+            self.publish = data.get("build", {}).get("publish", ".")
+
+    def headers_for(self, path: str) -> dict[str, str]:
+        """Custom headers for ``path``; later rules override earlier ones."""
+        out: dict[str, str] = {}
+        for rule in self.headers:
+            if rule.pattern.match(path):
+                out.update(rule.values)
+        return out
+
+
+def load_env_file(path: Path = ENV_FILE) -> dict[str, str]:
+    """``KEY=VALUE`` lines of a dotenv file (comments and blanks skipped)."""
+    env: dict[str, str] = {}
+    if not path.is_file():
+        return env
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, _, value = line.partition("=")
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        env[key.strip()] = value
+    return env
+
+
+class FunctionsHost:
+    """A ``functions_host.js`` child process listening on a free local port."""
+
+    def __init__(self, env_file: Path = ENV_FILE):
+        self.env_file = env_file
+        self.port: int | None = None
+        self.error = ""
+        self.process: subprocess.Popen | None = None
+        self.drain: threading.Thread | None = None
+
+    def start(self) -> bool:
+        node = shutil.which("node")
+        if node is None:
+            self.error = "node is not installed"
+            return False
+        env = {**load_env_file(self.env_file), **os.environ}
+        self.process = subprocess.Popen([node, str(FUNCTIONS_HOST), "0"], stdout=subprocess.PIPE, env=env, text=True)
+        line = self.process.stdout.readline().strip()
+        if not line.startswith("LISTENING "):
+            self.stop()
+            self.error = "functions_host.js did not start"
+            return False
+        self.port = int(line.split()[1])
+        # Keep draining stdout so console.log in a handler never blocks node.
+        self.drain = threading.Thread(target=shutil.copyfileobj, args=(self.process.stdout, sys.stdout), daemon=True)
+        self.drain.start()
+        return True
+
+    def stop(self) -> None:
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait()
+            # The pipe reaches EOF once node exits; let the drain finish before closing it.
+            if self.drain is not None:
+                self.drain.join(timeout=5)
+                self.drain = None
+            self.process.stdout.close()
+        self.port = None
+
+
+class _Unsatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Inclusive ``(start, end)`` of a single ``bytes=`` range, or None to
+    ignore the header (malformed, other units or multiple ranges)."""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                raise _Unsatisfiable
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise _Unsatisfiable
+    return start, end
+
+
+def accepted_encodings(header: str) -> list[str]:
+    """``br``/``gzip`` in server preference order, when the client accepts them."""
+    prefs: dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            prefs[name.strip().lower()] = quality
+    return [enc for enc in ("br", "gzip") if prefs.get(enc, prefs.get("*", 0.0)) > 0]
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    tags = [tag.strip() for tag in header.split(",")]
+    bare = etag.removeprefix("W/")
+    return "*" in tags or any(tag.removeprefix("W/") == bare for tag in tags)
+
+
+class CompressCache:
+    """LRU of on-the-fly compressed bodies keyed by file stat and encoding."""
+
+    def __init__(self, max_bytes: int = COMPRESS_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._lock = threading.Lock()
+        self._items: OrderedDict[tuple, bytes] = OrderedDict()
+
+    def get(self, path: Path, stat: os.stat_result, encoding: str) -> bytes:
+        key = (str(path), stat.st_mtime_ns, stat.st_size, encoding)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        data = path.read_bytes()
+        body = brotli.compress(data, quality=5) if encoding == "br" else gzip.compress(data, compresslevel=6, mtime=0)
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = body
+                self.size += len(body)
+            while self.size > self.max_bytes and self._items:
+                self.size -= len(self._items.popitem(last=False)[1])
+        return body
+
+
+class DevServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], root: Path, config: SiteConfig,
+                 functions: FunctionsHost | None, quiet: bool = False):
+        super().__init__(address, DevHandler)
+        self.root = root.resolve()
+        self.config = config
+        self.functions = functions
+        self.quiet = quiet
+        self.compressed = CompressCache()
+
+
+class DevHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "EFI-DevServer"
+    server: DevServer
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; without this, Nagle's
+        # algorithm holds the body until the client's delayed ACK (~40 ms).
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        self.dispatch()
+
+    def do_HEAD(self):
+        self.dispatch()
+
+    def do_POST(self):
+        self.dispatch()
+
+    do_PUT = do_PATCH = do_DELETE = do_OPTIONS = do_POST
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    # -- routing --------------------------------------------------------
+
+    def dispatch(self) -> None:
+        self.server.config.refresh()
+        parts = urlsplit(self.path)
+        path = posixpath.normpath(unquote(parts.path)) + ("/" if parts.path.endswith("/") and parts.path != "/" else "")
+        if not path.startswith("/"):
+            path = "/" + path
+        query = f"?{parts.query}" if parts.query else ""
+
+        for rule in self.server.config.redirects:
+            target = rule.target(path)
+            if target is None or (not rule.force and self.static_file(path) is not None):
+                continue
+            if rule.status in (301, 302, 303, 307, 308):
+                self.send_simple(rule.status, "", extra={"Location": target + ("" if "?" in target else query)})
+                return
+            if target.startswith(("http://", "https://")):
+                self.proxy(target + ("" if "?" in target else query))
+                return
+            if target.startswith(FUNCTIONS_PREFIX):
+                self.call_function(target + query)
+                return
+            self.serve_static(path, urlsplit(target).path, rule.status)
+            return
+
+        if path.startswith(FUNCTIONS_PREFIX):
+            self.call_function(path + query)
+        else:
+            self.serve_static(path, path, 200)
+
+    def static_file(self, path: str) -> Path | None:
+        """The file Netlify would serve for ``path``: itself, ``index.html``
+        in a directory, or the pretty-URL ``path.html``. Dotfiles and dot
+        directories (``.env``, ``.git/``) are never served."""
+        rel = path.lstrip("/")
+        if any(part.startswith(".") for part in rel.split("/")):
+            return None
+        candidate = (self.server.root / rel).resolve()
+        if candidate != self.server.root and self.server.root not in candidate.parents:
+            return None
+        for option in (candidate, candidate / "index.html", candidate.with_name(candidate.name + ".html")):
+            if option.is_file():
+                return option
+        return None
+
+    # -- static files ---------------------------------------------------
+
+    def serve_static(self, request_path: str, path: str, status: int) -> None:
+        if self.command not in ("GET", "HEAD"):
+            self.send_simple(405, "Method not allowed\n", extra={"Allow": "GET, HEAD"})
+            return
+        file = self.static_file(path)
+        if file is None:
+            status, file = 404, self.static_file("/404.html")
+            if file is None:
+                self.send_simple(404, "Not found\n", request_path=request_path)
+                return
+
+        stat = file.stat()
+        ctype = mimetypes.guess_type(file.name)[0] or "application/octet-stream"
+        if ctype.startswith("text/") or ctype in ("application/json", "image/svg+xml"):
+            ctype += "; charset=utf-8"
+        headers = {
+            "Content-Type": ctype,
+            "Cache-Control": DEFAULT_CACHE_CONTROL,
+            "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        }
+        headers.update(self.server.config.headers_for(request_path))
+        base_tag = f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+        range_header = self.headers.get("Range")
+
+        encoding, body = None, None
+        compressible = COMPRESSIBLE.match(ctype) is not None
+        if compressible:
+            headers["Vary"] = "Accept-Encoding"
+        if status == 200 and range_header is None:
+            encoding, body = self.encoded_body(file, stat, ctype, compressible)
+        etag = f'"{base_tag}-{encoding}"' if encoding else f'"{base_tag}"'
+        headers["ETag"] = etag
+
+        if status == 200 and self.not_modified(etag, stat.st_mtime):
+            self.send_headers(304, headers)
+            return
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            self.send_body(status, headers, body)
+            return
+
+        start, end = 0, stat.st_size - 1
+        if status == 200:
+            headers["Accept-Ranges"] = "bytes"
+            if_range = self.headers.get("If-Range")
+            if range_header and (if_range is None or if_range.strip() == etag):
+                try:
+                    span = parse_range(range_header, stat.st_size)
+                except _Unsatisfiable:
+                    headers["Content-Range"] = f"bytes */{stat.st_size}"
+                    self.send_body(416, headers, b"")
+                    return
+                if span is not None:
+                    status, (start, end) = 206, span
+                    headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        headers["Content-Length"] = str(end - start + 1)
+        self.send_headers(status, headers)
+        if self.command == "HEAD":
+            return
+        with file.open("rb") as handle:
+            handle.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = handle.read(min(CHUNK, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def encoded_body(self, file: Path, stat: os.stat_result, ctype: str,
+                     compressible: bool) -> tuple[str | None, bytes | None]:
+        """A precompressed sibling, or an on-the-fly compressed copy of text."""
+        for encoding in accepted_encodings(self.headers.get("Accept-Encoding", "")):
+            sibling = file.with_name(file.name + (".br" if encoding == "br" else ".gz"))
+            if sibling.is_file() and sibling.stat().st_mtime_ns >= stat.st_mtime_ns:
+                return encoding, sibling.read_bytes()
+            if compressible and stat.st_size >= MIN_COMPRESS_BYTES and (encoding == "gzip" or brotli is not None):
+                return encoding, self.server.compressed.get(file, stat, encoding)
+        return None, None
+
+    def not_modified(self, etag: str, mtime: float) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag)
+        since = self.headers.get("If-Modified-Since")
+        if since is None:
+            return False
+        try:
+            return int(mtime) <= parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    # -- functions and proxies ------------------------------------------
+
+    def call_function(self, target: str) -> None:
+        functions = self.server.functions
+        if functions is None or functions.port is None:
+            reason = functions.error if functions is not None else "functions are disabled (--no-functions)"
+            self.send_simple(502, f"Netlify functions unavailable: {reason}\n")
+            return
+        self.proxy(f"http://127.0.0.1:{functions.port}{target}")
+
+    def proxy(self, url: str) -> None:
+        parts = urlsplit(url)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        headers = {key: value for key, value in self.headers.items() if key.lower() not in HOP_BY_HOP}
+        host = self.headers.get("Host", "")
+        headers.update({"X-Forwarded-Host": host, "X-Forwarded-Proto": "http",
+                        "X-Forwarded-For": self.client_address[0], "Client-IP": self.client_address[0]})
+        if parts.netloc.split(":")[0] != "127.0.0.1":
+            headers["Host"] = parts.netloc
+        cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        conn = cls(parts.netloc, timeout=30)
+        try:
+            conn.request(self.command, parts.path + (f"?{parts.query}" if parts.query else ""), body, headers)
+            response = conn.getresponse()
+            data = response.read()
+        except OSError as exc:
+            self.send_simple(502, f"Upstream {parts.netloc} failed: {exc}\n")
+            return
+        finally:
+            conn.close()
+        # send_response() adds its own Date and Server.
+        skip = HOP_BY_HOP | {"content-length", "date", "server"}
+        out = [(k, v) for k, v in response.getheaders() if k.lower() not in skip]
+        self.send_response(response.status)
+        for key, value in out:
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    # -- responses ------------------------------------------------------
+
+    def send_headers(self, status: int, headers: dict[str, str]) -> None:
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+
+    def send_body(self, status: int, headers: dict[str, str], body: bytes) -> None:
+        headers["Content-Length"] = str(len(body))
+        self.send_headers(status, headers)
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_simple(self, status: int, text: str, extra: dict[str, str] | None = None,
+                    request_path: str | None = None) -> None:
+        headers = {"Content-Type": "text/plain; charset=utf-8", "Cache-Control": "no-store"}
+        if request_path is not None:
+            headers.update(self.server.config.headers_for(request_path))
+        headers.update(extra or {})
+        self.send_body(status, headers, text.encode("utf-8"))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("port", nargs="?", type=int, default=4173, help="Port to listen on (default 4173).")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default 127.0.0.1).")
+    parser.add_argument("--root", type=Path, default=None,
+                        help="Directory to serve, e.g. dist (default: the netlify.toml publish directory).")
+    parser.add_argument("--no-functions", action="store_true", help="Do not start the node functions host.")
+    parser.add_argument("--quiet", action="store_true", help="Do not log requests.")
+    args = parser.parse_args(argv)
+
+    config = SiteConfig()
+    root = args.root if args.root is not None else ROOT / config.publish
+    functions = None
+    if not args.no_functions:
+        functions = FunctionsHost()
+        if not functions.start():
+            print(f"Netlify functions unavailable ({functions.error}); /api/* will answer 502.")
+    server = DevServer((args.host, args.port), root, config, functions, quiet=args.quiet)
+    print(f"Serving {root.resolve()} on http://{args.host}:{server.server_address[1]}/"
+          + (f" (functions on port {functions.port})" if functions and functions.port else ""), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if functions is not None:
+            functions.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env node
+// Local stand-in for Netlify Functions, used by scripts/dev_server.py.
+//
+// Serves POST/GET /.netlify/functions/<name>[/rest] by calling
+// netlify/functions/<name>.js `handler` with a Netlify-style event, the same
+// contract the functions get in production. Prints `LISTENING <port>` once
+// ready. Modules are reloaded when a file in netlify/functions changes.
+const fs = require('fs');
+const http = require('http');
+const path = require('path');
+
+const FUNCTIONS_DIR = path.resolve(__dirname, '../netlify/functions');
+const PREFIX = '/.netlify/functions/';
+const TEXT_TYPES = /^(text\/|application\/(json|x-www-form-urlencoded|xml|javascript))/i;
+
+function dropModuleCache() {
+  Object.keys(require.cache)
+    .filter((file) => file.startsWith(FUNCTIONS_DIR + path.sep))
+    .forEach((file) => { delete require.cache[file]; });
+}
+
+function loadHandler(name) {
+  if (!/^[A-Za-z0-9][A-Za-z0-9_-]*$/.test(name)) return null;
+  const file = path.join(FUNCTIONS_DIR, `${name}.js`);
+  if (!fs.existsSync(file)) return null;
+  const mod = require(file);
+  return typeof mod.handler === 'function' ? mod.handler : null;
+}
+
+function toEvent(req, url, body) {
+  const headers = {};
+  Object.entries(req.headers).forEach(([key, value]) => {
+    headers[key.toLowerCase()] = Array.isArray(value) ? value.join(', ') : value;
+  });
+  const query = {};
+  const multi = {};
+  url.searchParams.forEach((value, key) => {
+    query[key] = value;
+    (multi[key] = multi[key] || []).push(value);
+  });
+  const text = !body.length || TEXT_TYPES.test(headers['content-type'] || '');
+  return {
+    path: url.pathname,
+    rawUrl: `http://${headers.host || 'localhost'}${url.pathname}${url.search}`,
+    rawQuery: url.search.slice(1),
+    httpMethod: req.method,
+    headers,
+    multiValueHeaders: Object.fromEntries(Object.entries(headers).map(([k, v]) => [k, [v]])),
+    queryStringParameters: query,
+    multiValueQueryStringParameters: multi,
+    body: body.length ? body.toString(text ? 'utf8' : 'base64') : null,
+    isBase64Encoded: !text
+  };
+}
+
+function send(res, statusCode, headers, body) {
+  res.writeHead(statusCode, headers);
+  res.end(body);
+}
+
+async function handle(req, res, body) {
+  const url = new URL(req.url, 'http://localhost');
+  if (!url.pathname.startsWith(PREFIX)) {
+    send(res, 404, { 'Content-Type': 'text/plain' }, 'Not a function path\n');
+    return;
+  }
+  const name = url.pathname.slice(PREFIX.length).split('/')[0];
+  let handler;
+  try {
+    handler = loadHandler(name);
+  } catch (err) {
+    console.error(`[functions] ${name}: failed to load: ${err.stack || err}`);
+    send(res, 500, { 'Content-Type': 'text/plain' }, `Function ${name} failed to load\n`);
+    return;
+  }
+  if (!handler) {
+    send(res, 404, { 'Content-Type': 'text/plain' }, `Function not found: ${name}\n`);
+    return;
+  }
+
+  const result = await handler(toEvent(req, url, body), { clientContext: {} });
+  if (!result || typeof result.statusCode !== 'number') {
+    throw new Error(`${name} returned no statusCode`);
+  }
+  const headers = { ...(result.headers || {}) };
+  Object.entries(result.multiValueHeaders || {}).forEach(([key, values]) => { headers[key] = values; });
+  const payload = result.body == null ? '' : String(result.body);
+  send(res, result.statusCode, headers, Buffer.from(payload, result.isBase64Encoded ? 'base64' : 'utf8'));
+}
+
+const server = http.createServer((req, res) => {
+  const chunks = [];
+  req.on('data', (chunk) => chunks.push(chunk));
+  req.on('end', () => {
+    handle(req, res, Buffer.concat(chunks)).catch((err) => {
+      console.error(`[functions] ${req.method} ${req.url}: ${err.stack || err}`);
+      if (!res.headersSent) send(res, 500, { 'Content-Type': 'text/plain' }, 'Function invocation failed\n');
+      else res.end();
+    });
+  });
+});
+
+fs.watch(FUNCTIONS_DIR, () => dropModuleCache());
+
+server.listen(Number(process.argv[2] || 0), '127.0.0.1', () => {
+  console.log(`LISTENING ${server.address().port}`);
+});
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Persistent site link graph: page -> links, target -> referring pages.
+
+The index is stored in ``.cache/link-graph.json`` and refreshed incrementally;
+only pages whose content digest changed are re-parsed. Link and PDF checks
+read their edges from it, and the CLI answers reverse lookups.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import deque
+import json
+import os
+from pathlib import Path
+import posixpath
+import sys
+from typing import Iterable
+from urllib.parse import unquote
+
+from _cache import checker_version
+from _site import Page, PageVisitor, load_pages, visit
+
+ROOT = Path(__file__).resolve().parents[1]
+GRAPH_PATH = ROOT / ".cache" / "link-graph.json"
+ENTRY_PAGE = "index.html"
+# Pages reached by redirects or errors rather than links.
+UNLINKED_OK = {"404.html"}
+
+NON_LOCAL = ("http://", "https://", "//", "mailto:", "tel:", "data:", "javascript:", "#")
+HREF_TAGS = {"a", "area", "link", "iframe", "embed"}
+SRC_TAGS = {"script", "img", "source", "iframe", "embed", "video", "audio", "track"}
+
+Results = list[tuple[str, list[str]]]
+
+
+class LinkParser(PageVisitor):
+    """Every ``href``/``src`` reference on a page, in document order."""
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.links: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs):
+        for name, value in attrs:
+            if value and ((name == "href" and tag in HREF_TAGS) or (name == "src" and tag in SRC_TAGS)):
+                self.links.append(value)
+
+    def result(self) -> list[str]:
+        return self.links
+
+
+def local_target(link: str, page: str = ENTRY_PAGE) -> str | None:
+    """Repo-relative file a link points at, or None for external/non-file links."""
+    link = link.strip()
+    if not link or link.lower().startswith(NON_LOCAL):
+        return None
+    path = unquote(link.split("#")[0].split("?")[0])
+    if not path:
+        return None
+    if path.startswith("/"):
+        path = path.lstrip("/")
+    else:
+        path = posixpath.join(posixpath.dirname(page), path)
+    return posixpath.normpath(path)
+
+
+def graph_version() -> str:
+    return checker_version("_site", __name__)
+
+
+class LinkGraph:
+    """Forward index ``page -> (digest, links)`` plus a lazily built reverse index."""
+
+    def __init__(self, version: str = ""):
+        self.version = version
+        self.pages: dict[str, tuple[str, list[str]]] = {}
+        self.reindexed: list[str] = []
+        self._reverse: dict[str, set[str]] | None = None
+
+    @classmethod
+    def load(cls, path: Path = GRAPH_PATH, enabled: bool = True) -> "LinkGraph":
+        graph = cls(graph_version())
+        if not enabled:
+            return graph
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return graph
+        if payload.get("version") != graph.version:
+            return graph
+        table = payload["links"]
+        for name, (digest, indexes) in payload["pages"].items():
+            graph.pages[name] = (digest, [table[i] for i in indexes])
+        return graph
+
+    def save(self, path: Path = GRAPH_PATH) -> None:
+        """Write the index with every distinct link string stored once."""
+        table: dict[str, int] = {}
+        pages = {}
+        for name in sorted(self.pages):
+            digest, links = self.pages[name]
+            pages[name] = [digest, [table.setdefault(link, len(table)) for link in links]]
+        payload = {"version": self.version, "links": list(table), "pages": pages}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def update(self, pages: list[Page], meters: dict | None = None, prune: bool = True) -> list[str]:
+        """Re-index pages whose content changed and, with ``prune``, drop pages
+        not in ``pages`` (pass ``prune=False`` when indexing only a subset).
+
+        ``meters`` (with ``"parse"`` and ``"links"`` keys) profiles the re-parse.
+        """
+        stale = [page for page in pages if self.pages.get(page.name, ("",))[0] != page.digest]
+        for visitor in visit(stale, {"links": LinkParser}, meters)["links"]:
+            self.pages[visitor.page.name] = (visitor.page.digest, visitor.result())
+        present = {page.name for page in pages}
+        for name in [name for name in self.pages if prune and name not in present]:
+            del self.pages[name]
+        self.reindexed = [page.name for page in stale]
+        self._reverse = None
+        return self.reindexed
+
+    @property
+    def reverse(self) -> dict[str, set[str]]:
+        if self._reverse is None:
+            reverse: dict[str, set[str]] = {}
+            for name, (_, links) in self.pages.items():
+                for link in links:
+                    target = local_target(link, name)
+                    if target is not None:
+                        reverse.setdefault(target, set()).add(name)
+            self._reverse = reverse
+        return self._reverse
+
+    def links(self, name: str) -> list[str]:
+        return self.pages[name][1] if name in self.pages else []
+
+    def referrers(self, target: str) -> list[str]:
+        """Pages linking to ``target`` (a repo-relative path)."""
+        return sorted(self.reverse.get(local_target(target) or target, ()))
+
+    def assets(self) -> dict[str, list[str]]:
+        """Local non-page targets (PDFs, images, scripts, styles) and their referrers."""
+        return {
+            target: sorted(names)
+            for target, names in sorted(self.reverse.items())
+            if not target.endswith(".html")
+        }
+
+    def orphans(self, entry: str = ENTRY_PAGE, unlinked_ok: Iterable[str] = UNLINKED_OK) -> list[str]:
+        """Pages that cannot be reached by following links from ``entry``."""
+        seen = {entry}
+        queue = deque([entry])
+        while queue:
+            name = queue.popleft()
+            for link in self.links(name):
+                target = local_target(link, name)
+                if target in self.pages and target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+        skip = set(unlinked_ok)
+        return sorted(name for name in self.pages if name not in seen and name not in skip)
+
+    def results(self, pages: Iterable[str] | None = None, targets: Iterable[str] = ()) -> Results:
+        """``(page, links)`` pairs in the shape the checkers report on.
+
+        With no arguments every edge is returned. Otherwise all edges of
+        ``pages`` are returned plus, from any other page, only the edges that
+        point at one of ``targets``.
+        """
+        if pages is None and not targets:
+            return [(name, links) for name, (_, links) in sorted(self.pages.items())]
+        whole = set(pages or ())
+        wanted = set(targets)
+        out: Results = []
+        for name, (_, links) in sorted(self.pages.items()):
+            if name in whole:
+                out.append((name, links))
+            elif wanted:
+                edges = [link for link in links if local_target(link, name) in wanted]
+                if edges:
+                    out.append((name, edges))
+        return out
+
+    def affected(self, changes, targets: Iterable[str] = ()) -> Results:
+        """Edges to re-validate after ``changes``: every edge of a changed page
+        and any edge into an added, deleted or otherwise listed target."""
+        return self.results(changes.touched & set(self.pages), changes.added | changes.deleted | set(targets))
+
+
+# Graphs already loaded in this process (long-running watch mode reuses them).
+_LOADED: dict[Path, LinkGraph] = {}
+
+
+def load_graph(pages: list[Page] | None = None, use_cache: bool = True, meters: dict | None = None,
+               prune: bool = True) -> LinkGraph:
+    """The up-to-date graph for ``pages`` (default: the whole site), saved back to disk."""
+    graph = _LOADED.get(GRAPH_PATH) if use_cache else None
+    if graph is None:
+        graph = LinkGraph.load(enabled=use_cache)
+    graph.update(load_pages(ROOT) if pages is None else pages, meters, prune)
+    if graph.reindexed or not use_cache:
+        graph.save()
+    _LOADED[GRAPH_PATH] = graph
+    return graph
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--referrers", nargs="+", metavar="PATH",
+                        help="List pages linking to PATH, i.e. what breaks if it is deleted.")
+    parser.add_argument("--orphans", action="store_true",
+                        help=f"List pages unreachable from {ENTRY_PAGE}; exits 1 if any.")
+    parser.add_argument("--assets", action="store_true", help="List local assets and how many pages use them.")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the stored index and re-parse every page.")
+    args = parser.parse_args(argv)
+    graph = load_graph(use_cache=not args.rebuild)
+
+    if args.referrers:
+        for path in args.referrers:
+            names = graph.referrers(path)
+            print(f"{path}: {len(names)} referring page(s)")
+            for name in names:
+                print(f" - {name}")
+        return 0
+    if args.assets:
+        for target, names in graph.assets().items():
+            print(f"{len(names):4d}  {target}")
+        return 0
+    orphans = graph.orphans()
+    if args.orphans:
+        for name in orphans:
+            print(f" - {name}")
+        return 1 if orphans else 0
+    edges = sum(len(links) for _, links in graph.pages.values())
+    print(
+        f"Link graph: {len(graph.pages)} pages, {edges} links, {len(graph.reverse)} local targets, "
+        f"{len(orphans)} orphan page(s); re-indexed {len(graph.reindexed)} page(s)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""Load-test the local site server and report latency percentiles per route.
+
+Routes default to the ones the uptime workflow probes; ``--sitemap`` uses
+every page in ``sitemap.xml`` instead. ``--concurrency`` keep-alive
+connections share the route list round-robin. Without ``--rate`` each
+connection sends its next request as soon as the last one finishes (closed
+loop, measures capacity). With ``--rate`` requests are sent on a fixed
+schedule, and latency is measured from when each request was due, not when it
+went out, so a stalled server is not hidden by the client waiting on it.
+
+Latencies go into log-linear (HDR-style) histograms with under 1% error.
+Results can be written as JSON and compared with a saved baseline, like
+``benchmark.py``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+from pathlib import Path
+import re
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+import build_sitemap
+
+ROOT = Path(__file__).resolve().parents[1]
+UPTIME_WORKFLOW = ROOT / ".github" / "workflows" / "uptime-check.yml"
+SITEMAP = ROOT / "sitemap.xml"
+DEFAULT_URL = "http://127.0.0.1:4173"
+DEFAULT_ROUTES = ["/", "/esqr.html", "/dashboard.html", "/verify.html", "/health.html"]
+BASELINE_PATH = ROOT / ".cache" / "load-baseline.json"
+DEFAULT_THRESHOLD = 0.25
+# Flag error rates this much above the baseline's.
+ERROR_RATE_SLACK = 0.01
+USER_AGENT = "EFI-LoadTest/1.0"
+
+
+class Histogram:
+    """Log-linear latency histogram in microseconds (HdrHistogram layout).
+
+    Values share a bucket with others within 1/128 of them, so percentiles
+    carry under 1% error at any magnitude while memory stays tiny.
+    """
+
+    SUB_BITS = 8
+
+    def __init__(self):
+        self.counts: dict[tuple[int, int], int] = {}
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def record(self, micros: int) -> None:
+        micros = max(int(micros), 0)
+        shift = max(micros.bit_length() - self.SUB_BITS, 0)
+        key = (shift, micros >> shift)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total += 1
+        self.sum += micros
+        self.max = max(self.max, micros)
+
+    def merge(self, other: Histogram) -> None:
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> int:
+        """Highest value equivalent to the ``pct``-th percentile sample."""
+        if not self.total:
+            return 0
+        rank = max(math.ceil(pct / 100.0 * self.total), 1)
+        seen = 0
+        for shift, sub in sorted(self.counts, key=lambda key: key[1] << key[0]):
+            seen += self.counts[(shift, sub)]
+            if seen >= rank:
+                return min(((sub + 1) << shift) - 1, self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+
+class RouteStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+
+    def merge(self, other: RouteStats) -> None:
+        self.latency.merge(other.latency)
+        self.requests += other.requests
+        self.errors += other.errors
+        self.bytes += other.bytes
+
+    def summary(self, elapsed: float) -> dict:
+        ms = lambda micros: round(micros / 1000.0, 3)  # noqa: E731
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "throughput": round(self.requests / elapsed, 1) if elapsed else 0.0,
+            "mean_ms": ms(self.latency.mean()),
+            "p50_ms": ms(self.latency.percentile(50)),
+            "p95_ms": ms(self.latency.percentile(95)),
+            "p99_ms": ms(self.latency.percentile(99)),
+            "max_ms": ms(self.latency.max),
+            "bytes_per_request": self.bytes // self.requests if self.requests else 0,
+        }
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection, reopened when the server closes it."""
+
+    def __init__(self, host: str, port: int, headers: dict[str, str]):
+        self.host, self.port = host, port
+        self.head = "".join(f"{key}: {value}\r\n" for key, value in headers.items())
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def get(self, path: str) -> tuple[int, int]:
+        """``(status, body bytes)``; retries once if a reused connection was closed."""
+        reused = self.writer is not None
+        try:
+            return await self._get(path)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            if not reused:
+                raise
+            return await self._get(path)
+
+    async def _get(self, path: str) -> tuple[int, int]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n{self.head}\r\n".encode("latin-1"))
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        status = int(status_line.split()[1])
+        length, chunked, close = None, False, False
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "transfer-encoding" and "chunked" in value:
+                chunked = True
+            elif name == "connection" and value == "close":
+                close = True
+        if status in (204, 304) or 100 <= status < 200:
+            size = 0
+        elif chunked:
+            size = 0
+            while True:
+                chunk = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(chunk + 2)
+                size += chunk
+                if chunk == 0:
+                    break
+        elif length is not None:
+            size = len(await self.reader.readexactly(length))
+        else:
+            size, close = len(await self.reader.read()), True
+        if close:
+            await self.close()
+        return status, size
+
+
+async def run(base_url: str, routes: list[str], concurrency: int, duration: float, rate: float | None,
+              max_requests: int | None, headers: dict[str, str], warmup: bool = True) -> tuple[dict[str, RouteStats], float]:
+    """Drive the load and return per-route stats and the measured wall time."""
+    parts = urlsplit(base_url)
+    if parts.scheme != "http":
+        raise ValueError("only http:// targets are supported (this tool is for the local server)")
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    prefix = parts.path.rstrip("/")
+    headers = {"User-Agent": USER_AGENT, "Accept": "*/*", **headers}
+    stats = [{route: RouteStats() for route in routes} for _ in range(concurrency)]
+    connections = [Connection(host, port, headers) for _ in range(concurrency)]
+
+    if warmup:
+        # One pass over the routes so on-the-fly compression and the OS file
+        # cache are warm, as they would be behind a CDN.
+        for route in routes:
+            await connections[0].get(prefix + route)
+
+    counter = 0
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def worker(slot: int) -> None:
+        nonlocal counter
+        conn = connections[slot]
+        while True:
+            index = counter
+            counter += 1
+            if max_requests is not None and index >= max_requests:
+                return
+            due = start + index / rate if rate else time.perf_counter()
+            if max_requests is None and due >= deadline:
+                return
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            route = routes[index % len(routes)]
+            bucket = stats[slot][route]
+            try:
+                status, size = await conn.get(prefix + route)
+                ok = 200 <= status < 400
+            except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                await conn.close()
+                ok, size = False, 0
+            bucket.latency.record((time.perf_counter() - due) * 1_000_000)
+            bucket.requests += 1
+            bucket.errors += not ok
+            bucket.bytes += size
+
+    try:
+        await asyncio.gather(*(worker(slot) for slot in range(concurrency)))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in connections))
+    elapsed = time.perf_counter() - start
+
+    merged = {route: RouteStats() for route in routes}
+    for per_slot in stats:
+        for route, route_stats in per_slot.items():
+            merged[route].merge(route_stats)
+    return merged, elapsed
+
+
+def summarize(stats: dict[str, RouteStats], elapsed: float) -> dict:
+    total = RouteStats()
+    for route_stats in stats.values():
+        total.merge(route_stats)
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "routes": {route: route_stats.summary(elapsed) for route, route_stats in stats.items()},
+        "total": total.summary(elapsed),
+    }
+
+
+def uptime_routes(path: Path = UPTIME_WORKFLOW) -> list[str]:
+    """The ``paths=(...)`` probed by the uptime workflow."""
+    try:
+        match = re.search(r"paths=\(([^)]*)\)", path.read_text(encoding="utf-8"))
+    except OSError:
+        match = None
+    return re.findall(r'"([^"]+)"', match.group(1)) if match else list(DEFAULT_ROUTES)
+
+
+def sitemap_routes(path: Path = SITEMAP) -> list[str]:
+    routes = []
+    for loc in build_sitemap.sitemap_locs(path):
+        route = urlsplit(loc).path or "/"
+        if route not in routes:
+            routes.append(route)
+    return routes
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Regressions: p95/p99 slower than the baseline by more than ``threshold``,
+    or a higher error rate."""
+    flagged = []
+    rows = {**current["routes"], "total": current["total"]}
+    base_rows = {**baseline.get("routes", {}), "total": baseline.get("total", {})}
+    for route, result in rows.items():
+        base = base_rows.get(route)
+        if not base:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if base.get(key) and result[key] > base[key] * (1 + threshold):
+                flagged.append(f"{route}: {key[:3]} {result[key]:.2f} ms vs baseline {base[key]:.2f} ms")
+        if result["error_rate"] > base.get("error_rate", 0.0) + ERROR_RATE_SLACK:
+            flagged.append(f"{route}: error rate {result['error_rate']:.1%} vs baseline {base['error_rate']:.1%}")
+    return flagged
+
+
+def start_server(root: Path | None) -> tuple[subprocess.Popen, str]:
+    """``dev_server.py`` on a free port, in its own process so it does not share
+    the load generator's interpreter."""
+    cmd = [sys.executable, str(Path(__file__).resolve().parent / "dev_server.py"), "0", "--quiet", "--no-functions"]
+    if root is not None:
+        cmd += ["--root", str(root)]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    match = re.search(r"on (http://\S+?)/?(\s|$)", line)
+    if match is None:
+        process.terminate()
+        raise RuntimeError(f"dev_server.py did not start: {line.strip()!r}")
+    return process, match.group(1)
+
+
+def print_table(result: dict) -> None:
+    print(f"{'route':<34} {'reqs':>7} {'err':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'KiB':>7}")
+    rows = list(result["routes"].items()) + [("total", result["total"])]
+    for route, row in rows:
+        print(f"{route[:34]:<34} {row['requests']:>7} {row['errors']:>5} {row['throughput']:>8.1f} "
+              f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_ms']:>8.2f} "
+              f"{row['bytes_per_request'] / 1024:>7.1f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"Server to test (default {DEFAULT_URL}).")
+    parser.add_argument("--serve", action="store_true", help="Start dev_server.py on a free port and test it.")
+    parser.add_argument("--root", type=Path, help="With --serve: directory to serve, e.g. dist.")
+    parser.add_argument("--sitemap", nargs="?", type=Path, const=SITEMAP,
+                        help="Use every page in the sitemap (default sitemap.xml) as the route list.")
+    parser.add_argument("--route", action="append", default=[], help="Route to request (repeatable).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Keep-alive connections (default 8).")
+    parser.add_argument("--rate", type=float, help="Target requests per second across all connections.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run (default 10).")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests instead of --duration.")
+    parser.add_argument("--accept-encoding", default="gzip, deflate, br",
+                        help="Accept-Encoding to send; '' requests identity bodies.")
+    parser.add_argument("--json", type=Path, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Flag p95/p99 above baseline by more than this fraction.")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    routes = args.route or (sitemap_routes(args.sitemap) if args.sitemap else uptime_routes())
+    headers = {"Accept-Encoding": args.accept_encoding} if args.accept_encoding else {}
+    server = None
+    url = args.url
+    if args.serve:
+        server, url = start_server(args.root)
+    try:
+        stats, elapsed = asyncio.run(
+            run(url, routes, args.concurrency, args.duration, args.rate, args.requests, headers)
+        )
+    except OSError as exc:
+        print(f"Cannot reach {url}: {exc} (start scripts/serve.sh or pass --serve)")
+        return 2
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    result = summarize(stats, elapsed)
+    result["config"] = {"url": url, "concurrency": args.concurrency, "rate": args.rate,
+                        "duration": args.duration, "requests": args.requests,
+                        "accept_encoding": args.accept_encoding}
+    mode = f"{args.rate:g} req/s target" if args.rate else "closed loop"
+    print(f"{result['total']['requests']} requests to {url} over {elapsed:.1f}s "
+          f"({args.concurrency} connections, {mode})")
+    print_table(result)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+
+    try:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        baseline = {}
+    regressions = compare(result, baseline, args.threshold) if baseline else []
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%} of baseline:")
+        for line in regressions:
+            print(f" - {line}")
+        return 1
+    return 1 if result["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
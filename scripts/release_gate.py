@@ -2,14 +2,43 @@
 """Run deployment release gates in one command."""
 from __future__ import annotations
 
-from html.parser import HTMLParser
+import argparse
+import cProfile
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import contextlib
+from fnmatch import fnmatch
+import functools
+import importlib
+import io
+import json
+import multiprocessing
+import os
 from pathlib import Path
+import pstats
 import subprocess
 import sys
+import time
+import traceback
+import tracemalloc
+from urllib.parse import quote
 import xml.etree.ElementTree as ET
 
+import _changes
+from _cache import CACHE_DIR, ResultCache, checker_version, inputs_digest, text_digest
+from _profile import Meter
+import _shard
+from _site import Page, load_pages, scan
+from _watch import Watcher
+import build_sitemap
+from build_sitemap import CANONICAL_DOMAIN, IGNORED_HTML, CanonicalParser
+import check_accessibility
+import check_copy_style
+import check_links
+import check_pdfs
+import check_perf_lint
+import link_graph
+
 ROOT = Path(__file__).resolve().parents[1]
-CANONICAL_DOMAIN = "https://executivefunctioninginstitute.com/"
 REQUIRED_HEADERS = [
     "X-Frame-Options",
     "X-Content-Type-Options",
@@ -18,55 +47,320 @@ REQUIRED_HEADERS = [
     "Strict-Transport-Security",
     "Content-Security-Policy",
 ]
-IGNORED_HTML = {"404.html"}
+# Inputs watched by --watch: root-level files by pattern, plus whole directories.
+WATCH_TOP_LEVEL = ["*.html", "*.pdf", "netlify.toml", "sitemap*.xml"]
+WATCH_TREES = ["css", "js", "data"]
 
+# Subprocess steps (run on threads) and in-process checker modules (run on a
+# process pool). Page-level checks share one parse and run as a single task.
+COMMAND_CHECKS = {
+    "js syntax": ["node", "--check", "js/main.js", "js/auth.js", "js/esqr.js"],
+    "unit tests": ["node", "--test", "tests/ai-rubric.test.mjs"],
+    "python unit tests": [sys.executable, "-m", "unittest", "discover", "-s", "tests", "-q"],
+}
+# Paths (globs relative to the repo root) whose changes re-trigger each command
+# in --changed-since mode.
+COMMAND_INPUTS = {
+    "js syntax": ["js/main.js", "js/auth.js", "js/esqr.js"],
+    "unit tests": ["tests/*.mjs", "netlify/functions/*.js"],
+    "python unit tests": ["tests/*.py", "scripts/*.py", "scripts/rules/*", "*.pdf"],
+}
+MODULE_CHECKS = {
+    "further sources integration check": "check_source_hub",
+    "video pipeline check": "check_video_pipeline",
+    "data schema check": "check_data",
+    "launch blocker check": "check_launch_blockers",
+    "console/debugger check": "check_console_logs",
+    "page weight budget": "check_page_weight",
+    "cache policy check": "check_cache_policy",
+}
+# Fixed reporting order, independent of completion order.
+CHECK_ORDER = [
+    "js syntax",
+    "local link check",
+    "accessibility check",
+    "pdf integrity check",
+    "further sources integration check",
+    "video pipeline check",
+    "data schema check",
+    "copy style check",
+    "launch blocker check",
+    "console/debugger check",
+    "page weight budget",
+    "unit tests",
+    "python unit tests",
+    "canonical tag consistency",
+    "web performance lint",
+    "sitemap coverage + absolute URLs",
+    "netlify security headers",
+    "cache policy check",
+]
 
-class CanonicalParser(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.canonical: str | None = None
 
-    def handle_starttag(self, tag: str, attrs):
-        if tag != "link":
-            return
-        attr = dict(attrs)
-        if attr.get("rel") == "canonical" and "href" in attr:
-            self.canonical = attr["href"].strip()
+# (exit code, captured output, note shown next to the label, cost)
+CheckResult = tuple[int, str, str, Meter]
 
+# Page-level checks: label -> result key. Links and PDFs read the link graph;
+# the other keys are visitors run over the shared page scan.
+PAGE_CHECKS = {
+    "local link check": "links",
+    "accessibility check": "a11y",
+    "pdf integrity check": "pdfs",
+    "copy style check": "copy",
+    "canonical tag consistency": "canonical",
+    "web performance lint": "perf",
+}
+SITEMAP_LABEL = "sitemap coverage + absolute URLs"
+HEADERS_LABEL = "netlify security headers"
 
-def run_command(cmd: list[str], label: str) -> None:
-    print(f"[gate] {label}")
-    result = subprocess.run(cmd, cwd=ROOT)
-    if result.returncode != 0:
-        raise RuntimeError(f"Failed: {label}")
 
+def skipped(changes: _changes.ChangeSet) -> CheckResult:
+    return 0, "", f"skipped: nothing relevant changed since {changes.ref}", Meter()
 
-def check_canonical_tags() -> None:
-    print("[gate] canonical tag consistency")
-    failures: list[str] = []
-    for html in sorted(ROOT.glob("*.html")):
-        if html.name in IGNORED_HTML:
-            continue
-        parser = CanonicalParser()
-        parser.feed(html.read_text(encoding="utf-8", errors="ignore"))
-        expected = CANONICAL_DOMAIN + html.name
-        if parser.canonical != expected:
-            failures.append(
-                f"{html.name}: expected canonical '{expected}', found '{parser.canonical}'"
-            )
+
+def is_skipped(result: CheckResult) -> bool:
+    return result[2].startswith("skipped:")
+
+
+@contextlib.contextmanager
+def tracing(enabled: bool):
+    """Trace allocations (for per-check peak memory) for the duration of a task."""
+    started = enabled and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def run_command(cmd: list[str]) -> CheckResult:
+    meter = Meter()
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    output = proc.stdout.read()
+    proc.stdout.close()
+    # wait4 gives this child's own CPU time and max RSS even with siblings running.
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    meter.wall = time.perf_counter() - started
+    meter.cpu = usage.ru_utime + usage.ru_stime
+    meter.peak_kb = usage.ru_maxrss
+    meter.memory = "rss"
+    return proc.returncode, output, "", meter
+
+
+def capture(fn, *args) -> tuple[int, str]:
+    """Run a check in-process, returning its exit code and everything it printed."""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+        try:
+            rc = fn(*args) or 0
+        except RuntimeError as err:
+            print(err)
+            rc = 1
+        except Exception:
+            traceback.print_exc()
+            rc = 1
+    return rc, buf.getvalue()
+
+
+def run_cached(name: str, digest: str, use_cache: bool, version: str, fn, *args) -> CheckResult:
+    """Run a whole check, reusing its recorded outcome while its inputs are unchanged."""
+    meter = Meter()
+    with meter.measure():
+        cache = ResultCache(name, version, enabled=use_cache)
+        hit, value = cache.get("*", digest)
+        if not hit:
+            rc, output = capture(fn, *args)
+            cache.put("*", digest, [rc, output])
+            cache.save()
+    if hit:
+        rc, output = value
+        return rc, output, "cached", meter
+    return rc, output, "", meter
+
+
+def run_module(name: str, use_cache: bool = True, changes: _changes.ChangeSet | None = None,
+               trace: bool = False) -> dict[str, CheckResult]:
+    module = importlib.import_module(name)
+    label = next(label for label, mod in MODULE_CHECKS.items() if mod == name)
+    if changes is not None and not changes.touches([Path(module.__file__), *module.cache_inputs()]):
+        return {label: skipped(changes)}
+    saved_argv = sys.argv
+    sys.argv = [module.__file__]
+    try:
+        with tracing(trace):
+            inputs = module.cache_inputs()
+            result = run_cached(name, inputs_digest(inputs), use_cache, checker_version(name), module.main)
+        result[3].files = len(inputs)
+        return {label: result}
+    finally:
+        sys.argv = saved_argv
+
+
+def page_check_version(factory) -> str:
+    """Checker source plus any data files (e.g. rule packs) its module declares."""
+    module = sys.modules[factory.__module__]
+    version = checker_version("_site", factory.__module__)
+    if hasattr(module, "cache_inputs"):
+        version = text_digest(version, inputs_digest(module.cache_inputs()))[:16]
+    return version
+
+
+def run_page_checks(use_cache: bool = True, changes: _changes.ChangeSet | None = None,
+                    trace: bool = False, only: str | None = None,
+                    shard: tuple[int, int] | None = None) -> dict[str, CheckResult]:
+    """Run every page-level check (or just ``only``) over one shared page scan.
+
+    With ``trace`` each visitor's cost per page and the tokenizing cost are
+    metered separately; the latter is returned under ``"page parsing"``.
+    With ``shard`` only that shard's pages (and PDFs, for deep inspection)
+    are checked.
+    """
+    with tracing(trace):
+        return _run_page_checks(use_cache, changes, trace, only, shard)
+
+
+def local_pdfs() -> list[str]:
+    return sorted(
+        path.relative_to(ROOT).as_posix()
+        for path in ROOT.rglob("*.pdf")
+        if not any(part.startswith(".") or part == "node_modules" for part in path.relative_to(ROOT).parts)
+    )
+
+
+def _run_page_checks(use_cache, changes, trace, only, shard) -> dict[str, CheckResult]:
+    all_pages = pages = load_pages(ROOT)
+    labels = [label for label in PAGE_CHECKS if only in (None, label)]
+    keys = {PAGE_CHECKS[label] for label in labels}
+    visitors = {
+        key: factory
+        for key, factory in [
+            ("a11y", check_accessibility.A11yParser),
+            ("copy", check_copy_style.CopyScanner),
+            ("canonical", CanonicalParser),
+            ("perf", check_perf_lint.PerfParser),
+        ]
+        if key in keys
+    }
+    meters = {key: Meter() for key in ["parse", "links", *visitors]} if trace else None
+    caches = {
+        key: ResultCache(f"pages-{key}", page_check_version(factory), enabled=use_cache)
+        for key, factory in visitors.items()
+    }
+    if changes is not None:
+        sources = [Path(sys.modules[f.__module__].__file__) for f in visitors.values()]
+        sources += check_copy_style.cache_inputs() + [check_perf_lint.BASELINE_PATH]
+        pages = changes.select_pages(all_pages, sources)
+    if shard is not None:
+        pages = [page for page in pages if _shard.owns(shard, page.name)]
+    results = scan(pages, visitors, caches, meters)
+    for cache in caches.values():
+        cache.save(prune=changes is None)
+
+    # Link and PDF checks read their edges from the persistent link graph;
+    # only pages whose content changed are re-parsed into it.
+    graph = None
+    owned_pdfs: set[str] = set()
+    if keys & {"links", "pdfs"} and shard is not None:
+        # Link targets are checked against the full checkout, so each shard
+        # validates the edges of its own pages. Each PDF is deep-checked by the
+        # shard owning it, which also indexes the (text-prefiltered) other
+        # pages that may link to it.
+        owned_pdfs = {path for path in local_pdfs() if _shard.owns(shard, path)}
+        needles = {Path(path).name for path in owned_pdfs}
+        needles |= {quote(needle) for needle in needles}
+        names = {page.name for page in pages}
+        extra = [
+            page for page in all_pages
+            if page.name not in names and any(needle in page.text for needle in needles)
+        ]
+        graph = link_graph.load_graph(pages + extra, use_cache, meters, prune=False)
+        results["links"] = graph.results(names)
+        results["pdfs"] = graph.results(names, owned_pdfs)
+    elif keys & {"links", "pdfs"}:
+        graph = link_graph.load_graph(all_pages, use_cache, meters)
+        graph_sources = [Path(link_graph.__file__), Path(check_links.__file__), Path(check_pdfs.__file__)]
+        if changes is None or changes.touches(graph_sources):
+            results["links"] = results["pdfs"] = graph.results()
+        else:
+            pdfs = {path for path in changes.touched if path.lower().endswith(".pdf")}
+            results["links"] = graph.affected(changes)
+            results["pdfs"] = graph.affected(changes, pdfs)
+
+    def note(key: str) -> str:
+        parts = []
+        if key in caches:
+            if changes is not None:
+                parts.append(f"{len(pages)}/{len(all_pages)} pages affected since {changes.ref}")
+            if caches[key].hits:
+                parts.append(f"cached {caches[key].hits}/{len(pages)} pages")
+        else:
+            if changes is not None:
+                parts.append(f"{len(results[key])}/{len(all_pages)} pages with affected links since {changes.ref}")
+            parts.append(f"link graph re-indexed {len(graph.reindexed)}/{len(all_pages)} pages")
+        return ", ".join(parts)
+
+    # Deep PDF structure summaries are cached per file content digest.
+    pdf_cache = ResultCache("pdf-structure", checker_version("check_pdfs"), enabled=use_cache)
+    reports = {
+        "links": check_links.report,
+        "a11y": check_accessibility.report,
+        "pdfs": functools.partial(
+            check_pdfs.report, deep=True, cache=pdf_cache,
+            owns=None if shard is None else owned_pdfs.__contains__,
+        ),
+        "copy": check_copy_style.report,
+        "canonical": check_canonical_tags,
+        "perf": check_perf_lint.report,
+    }
+    out: dict[str, CheckResult] = {}
+    for label in labels:
+        key = PAGE_CHECKS[label]
+        meter = Meter()
+        if meters is not None:
+            meter.merge(meters[key if key in visitors else "links"])
+        meter.files = len(results[key]) if key in ("links", "pdfs") else len(pages)
+        with meter.measure():
+            rc, output = capture(reports[key], results[key])
+        out[label] = (rc, output, note(key), meter)
+    pdf_cache.save(prune=changes is None)
+    if meters is not None:
+        meters["parse"].files = len(meters["parse"].pages)
+        out["page parsing"] = (0, "", "", meters["parse"])
+
+    if only not in (None, SITEMAP_LABEL) or not _shard.owns(shard, SITEMAP_LABEL):
+        return out
+    page_set_changed = changes is not None and any(
+        path.endswith(".html") for path in changes.added | changes.deleted
+    )
+    sitemap_inputs = [*sorted(ROOT.glob("sitemap*.xml")), ROOT / build_sitemap.STATE_PATH]
+    if changes is not None and not page_set_changed and not changes.touches(
+        [*sitemap_inputs, Path(__file__), Path(build_sitemap.__file__), *(page.path for page in all_pages)]
+    ):
+        out[SITEMAP_LABEL] = skipped(changes)
+        return out
+    sitemap_digest = text_digest(inputs_digest(sitemap_inputs), *(page.name + page.digest for page in all_pages))
+    out[SITEMAP_LABEL] = run_cached(
+        "sitemap", sitemap_digest, use_cache, checker_version("_site", "build_sitemap", __name__), check_sitemap,
+        all_pages,
+    )
+    out[SITEMAP_LABEL][3].files = len(all_pages) + 1
+    return out
+
+
+def check_canonical_tags(results: list[tuple[str, str | None]]) -> None:
+    failures = build_sitemap.canonical_failures(results)
     if failures:
         for failure in failures:
             print(f" - {failure}")
         raise RuntimeError("Canonical checks failed")
 
 
-def check_sitemap() -> None:
-    print("[gate] sitemap coverage + absolute URLs")
-    sitemap_path = ROOT / "sitemap.xml"
-    tree = ET.parse(sitemap_path)
-    ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-    loc_nodes = tree.findall(".//sm:url/sm:loc", ns)
-    locs = [node.text.strip() for node in loc_nodes if node.text and node.text.strip()]
+def check_sitemap(pages: list[Page]) -> None:
+    locs = build_sitemap.sitemap_locs()
     bad = [loc for loc in locs if not loc.startswith(CANONICAL_DOMAIN)]
     if bad:
         for loc in bad:
@@ -74,9 +368,9 @@ def check_sitemap() -> None:
         raise RuntimeError("Sitemap URL format check failed")
 
     expected = {
-        CANONICAL_DOMAIN + html.name
-        for html in ROOT.glob("*.html")
-        if html.name not in IGNORED_HTML
+        CANONICAL_DOMAIN + page.name
+        for page in pages
+        if page.name not in IGNORED_HTML
     }
     actual = set(locs)
     missing = sorted(expected - actual)
@@ -85,9 +379,19 @@ def check_sitemap() -> None:
             print(f" - Missing sitemap URL: {loc}")
         raise RuntimeError("Sitemap coverage check failed")
 
+    problems = build_sitemap.stale(pages, lastmod=False)
+    if problems:
+        for problem in problems:
+            print(f" - {problem}")
+        raise RuntimeError("Sitemap is stale; run python3 scripts/build_sitemap.py")
+    outdated = build_sitemap.stale(pages)
+    if outdated:
+        print("Sitemap lastmod warnings (run python3 scripts/build_sitemap.py):")
+        for problem in outdated:
+            print(f" - {problem}")
+
 
 def check_netlify_headers() -> None:
-    print("[gate] netlify security headers")
     body = (ROOT / "netlify.toml").read_text(encoding="utf-8", errors="ignore")
     missing = [header for header in REQUIRED_HEADERS if f'{header} = "' not in body]
     if missing:
@@ -96,23 +400,321 @@ def check_netlify_headers() -> None:
         raise RuntimeError("Netlify header check failed")
 
 
-def main() -> int:
+def _pool_context():
+    # Fork lets workers inherit already-imported checkers without re-importing.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def run_headers_check(use_cache: bool, changes: _changes.ChangeSet | None = None) -> CheckResult:
+    if changes is not None and not changes.touches([ROOT / "netlify.toml", Path(__file__)]):
+        return skipped(changes)
+    result = run_cached(
+        "netlify-headers",
+        inputs_digest([ROOT / "netlify.toml"]),
+        use_cache,
+        checker_version(__name__),
+        check_netlify_headers,
+    )
+    result[3].files = 1
+    return result
+
+
+def command_needed(label: str, changes: _changes.ChangeSet | None) -> bool:
+    if changes is None:
+        return True
+    return any(fnmatch(path, pattern) for path in changes.touched for pattern in COMMAND_INPUTS[label])
+
+
+def run_checks(jobs: int, use_cache: bool = True, changes: _changes.ChangeSet | None = None,
+               trace: bool = False, shard: tuple[int, int] | None = None) -> dict[str, CheckResult]:
+    """Run the gate's checks and return results by label.
+
+    With ``shard`` page checks see only that shard's pages and every other
+    check runs on exactly one shard; labels owned by other shards are absent.
+    """
+    results: dict[str, CheckResult] = {}
+    commands = {}
+    modules = [name for label, name in MODULE_CHECKS.items() if _shard.owns(shard, label)]
+    headers = _shard.owns(shard, HEADERS_LABEL)
+    for label, cmd in COMMAND_CHECKS.items():
+        if not _shard.owns(shard, label):
+            continue
+        if command_needed(label, changes):
+            commands[label] = cmd
+        else:
+            results[label] = skipped(changes)
+    if jobs <= 1:
+        for label, cmd in commands.items():
+            results[label] = run_command(cmd)
+        results.update(run_page_checks(use_cache, changes, trace, shard=shard))
+        for name in modules:
+            results.update(run_module(name, use_cache, changes, trace))
+        if headers:
+            with tracing(trace):
+                results[HEADERS_LABEL] = run_headers_check(use_cache, changes)
+        return results
+
+    for name in modules:
+        importlib.import_module(name)
+    futures: list[tuple[str | None, Future]] = []
+    with ThreadPoolExecutor(max_workers=len(COMMAND_CHECKS)) as threads, \
+            ProcessPoolExecutor(max_workers=jobs, mp_context=_pool_context()) as procs:
+        for label, cmd in commands.items():
+            futures.append((label, threads.submit(run_command, cmd)))
+        futures.append((None, procs.submit(run_page_checks, use_cache, changes, trace, None, shard)))
+        for name in modules:
+            futures.append((None, procs.submit(run_module, name, use_cache, changes, trace)))
+        if headers:
+            with tracing(trace):
+                results[HEADERS_LABEL] = run_headers_check(use_cache, changes)
+        for label, future in futures:
+            if label is None:
+                results.update(future.result())
+            else:
+                results[label] = future.result()
+    return results
+
+
+def profile_check(label: str) -> tuple[CheckResult, cProfile.Profile]:
+    """Run one in-process check uncached under cProfile."""
+    profiler = cProfile.Profile()
+    profiler.enable()
     try:
-        run_command(["node", "--check", "js/main.js", "js/auth.js", "js/esqr.js"], "js syntax")
-        run_command(["python3", "scripts/check_links.py"], "local link check")
-        run_command(["python3", "scripts/check_accessibility.py"], "accessibility check")
-        run_command(["python3", "scripts/check_pdfs.py"], "pdf integrity check")
-        run_command(["python3", "scripts/check_source_hub.py"], "further sources integration check")
-        run_command(["python3", "scripts/check_video_pipeline.py"], "video pipeline check")
-        run_command(["python3", "scripts/check_copy_style.py"], "copy style check")
-        run_command(["python3", "scripts/check_launch_blockers.py"], "launch blocker check")
-        run_command(["python3", "scripts/check_console_logs.py"], "console/debugger check")
-        run_command(["node", "--test", "tests/ai-rubric.test.mjs"], "unit tests")
-        check_canonical_tags()
-        check_sitemap()
-        check_netlify_headers()
-    except RuntimeError as err:
-        print(f"[gate] release gate failed: {err}")
+        if label in MODULE_CHECKS:
+            result = run_module(MODULE_CHECKS[label], use_cache=False)[label]
+        elif label == HEADERS_LABEL:
+            result = run_headers_check(use_cache=False)
+        else:
+            result = run_page_checks(use_cache=False, only=label)[label]
+    finally:
+        profiler.disable()
+    return result, profiler
+
+
+def print_results(results: dict[str, CheckResult], labels: list[str]) -> list[str]:
+    """Print each check's label, note and output in order; return failed labels."""
+    failed: list[str] = []
+    for label in labels:
+        rc, output, note, _ = results[label]
+        print(f"[gate] {label}" + (f" ({note})" if note else ""))
+        if output:
+            print(output, end="" if output.endswith("\n") else "\n")
+        if rc != 0:
+            failed.append(label)
+    return failed
+
+
+def status_of(result: CheckResult) -> str:
+    if result[0] != 0:
+        return "failed"
+    if is_skipped(result):
+        return "skipped"
+    return "cached" if result[2] == "cached" else "passed"
+
+
+def write_json_report(path: Path, results: dict[str, CheckResult], elapsed: float, slowest: int,
+                      changes: _changes.ChangeSet | None = None) -> None:
+    checks = []
+    for label in CHECK_ORDER:
+        rc, output, note, meter = results[label]
+        checks.append({"label": label, "status": status_of(results[label]), "rc": rc, "note": note,
+                       **meter.as_dict(slowest)})
+    payload = {
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "passed": all(results[label][0] == 0 for label in CHECK_ORDER),
+        "wall": round(elapsed, 6),
+        "changed_since": changes.ref if changes is not None else None,
+        "checks": checks,
+    }
+    if "page parsing" in results:
+        payload["page_parsing"] = results["page parsing"][3].as_dict(slowest)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+def write_junit(path: Path, results: dict[str, CheckResult], elapsed: float) -> None:
+    statuses = {label: status_of(results[label]) for label in CHECK_ORDER}
+    suite = ET.Element(
+        "testsuite",
+        name="release-gate",
+        tests=str(len(CHECK_ORDER)),
+        failures=str(sum(status == "failed" for status in statuses.values())),
+        skipped=str(sum(status == "skipped" for status in statuses.values())),
+        time=f"{elapsed:.3f}",
+    )
+    for label in CHECK_ORDER:
+        rc, output, note, meter = results[label]
+        case = ET.SubElement(suite, "testcase", classname="release_gate", name=label, time=f"{meter.wall:.3f}")
+        if statuses[label] == "failed":
+            ET.SubElement(case, "failure", message=f"{label} failed (exit {rc})").text = output
+        elif statuses[label] == "skipped":
+            ET.SubElement(case, "skipped", message=note)
+        elif output:
+            ET.SubElement(case, "system-out").text = output
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(suite).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def watch(use_cache: bool, interval: float) -> int:
+    """Re-run affected checks whenever a watched file changes, until interrupted.
+
+    Everything runs in this process so parsed pages, the link graph and loaded
+    rule packs stay warm between runs.
+    """
+    watcher = Watcher(WATCH_TOP_LEVEL, WATCH_TREES, interval=interval)
+    started = time.perf_counter()
+    failed = print_results(run_checks(1, use_cache), CHECK_ORDER)
+    print(
+        f"[gate] {'failed: ' + ', '.join(failed) if failed else 'passed'} "
+        f"in {time.perf_counter() - started:.2f}s; watching for changes (Ctrl-C to stop)"
+    )
+    try:
+        while True:
+            changes = watcher.wait()
+            started = time.perf_counter()
+            results = run_checks(1, use_cache, changes)
+            ran = [label for label in CHECK_ORDER if not is_skipped(results[label])]
+            print(f"\n[gate] {time.strftime('%H:%M:%S')} {', '.join(sorted(changes.touched))} changed")
+            failed = print_results(results, ran)
+            status = f"failed: {', '.join(failed)}" if failed else "passed"
+            print(f"[gate] {len(ran)} check(s) {status} in {time.perf_counter() - started:.2f}s")
+    except KeyboardInterrupt:
+        return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for in-process checks (1 runs everything serially).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore and do not update the content-hash result cache in .cache/release-gate.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-run only the checks affected by each file change.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.25,
+        help="Polling interval in seconds for --watch.",
+    )
+    parser.add_argument(
+        "--report-json",
+        type=Path,
+        metavar="PATH",
+        help="Write per-check wall/CPU time and files (plus peak memory and slowest pages with --trace) as JSON.",
+    )
+    parser.add_argument(
+        "--junit",
+        type=Path,
+        metavar="PATH",
+        help="Write a JUnit XML report with one test case per check.",
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=5,
+        help="Number of slowest pages listed per check in the JSON report.",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Trace peak memory (tracemalloc) and time each page visitor separately for the reports; slower.",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="CHECK",
+        help="Run only this in-process check, uncached, under cProfile and print the hottest functions.",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Run shard I of N (1-based): a deterministic slice of pages and PDFs plus this shard's share "
+             "of the whole-site checks; writes a partial result file for --merge.",
+    )
+    parser.add_argument(
+        "--shard-out",
+        type=Path,
+        metavar="PATH",
+        help="Partial result file for --shard (default: .cache/release-gate/shard-I-of-N.json).",
+    )
+    parser.add_argument(
+        "--merge",
+        type=Path,
+        nargs="+",
+        metavar="PATH",
+        help="Combine the partial result files of all shards into one verdict.",
+    )
+    _changes.add_argument(parser)
+    args = parser.parse_args(argv)
+    if args.shard and (args.changed_since or args.watch or args.merge):
+        parser.error("--shard cannot be combined with --changed-since, --watch or --merge")
+    if args.merge:
+        try:
+            results = _shard.merge(args.merge, CHECK_ORDER)
+        except (OSError, ValueError, KeyError) as err:
+            print(f"[gate] cannot merge shard results: {err}")
+            return 2
+        print(f"[gate] merged {len(args.merge)} shard result file(s)")
+        return finish(results, args, elapsed=max(result[3].wall for result in results.values()))
+    if args.watch:
+        return watch(use_cache=not args.no_cache, interval=args.interval)
+    if args.profile:
+        if args.profile not in CHECK_ORDER or args.profile in COMMAND_CHECKS:
+            choices = ", ".join(label for label in CHECK_ORDER if label not in COMMAND_CHECKS)
+            parser.error(f"--profile takes one of: {choices}")
+        result, profiler = profile_check(args.profile)
+        failed = print_results({args.profile: result}, [args.profile])
+        out = CACHE_DIR / f"profile-{args.profile.replace(' ', '-').replace('/', '-')}.prof"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(out)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        print(f"[gate] cProfile stats written to {out.relative_to(ROOT)}")
+        return 1 if failed else 0
+    changes = _changes.from_args(args, parser)
+    if changes is not None:
+        print(f"[gate] --changed-since: {changes.describe()}")
+
+    shard = None
+    if args.shard:
+        try:
+            shard = _shard.parse_shard(args.shard)
+        except ValueError as err:
+            parser.error(f"--shard: {err}")
+
+    started = time.perf_counter()
+    results = run_checks(args.jobs, use_cache=not args.no_cache, changes=changes, trace=args.trace, shard=shard)
+    elapsed = time.perf_counter() - started
+    if shard is not None:
+        out = args.shard_out or CACHE_DIR / f"shard-{shard[0]}-of-{shard[1]}.json"
+        _shard.write_partial(out, shard, results, args.slowest)
+        failed = print_results(results, [label for label in CHECK_ORDER if label in results])
+        print(f"[gate] shard {shard[0]}/{shard[1]} {'failed' if failed else 'passed'}; partial results in {out}")
+        return 1 if failed else 0
+    return finish(results, args, elapsed, changes)
+
+
+def finish(results: dict[str, CheckResult], args: argparse.Namespace, elapsed: float,
+           changes: _changes.ChangeSet | None = None) -> int:
+    """Print the full verdict and write any requested reports."""
+    failed = print_results(results, CHECK_ORDER)
+    if args.report_json:
+        write_json_report(args.report_json, results, elapsed, args.slowest, changes)
+    if args.junit:
+        write_junit(args.junit, results, elapsed)
+
+    if failed:
+        print(f"[gate] release gate failed: {', '.join(failed)}")
         return 1
 
     print("[gate] release gate passed")
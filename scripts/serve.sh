@@ -1,5 +1,7 @@
 #!/usr/bin/env bash
 set -euo pipefail
 PORT="${1:-4173}"
+# netlify.toml publishes dist/; bring it up to date before serving it.
+python3 "$(dirname "$0")/build_assets.py" || echo "Asset build reported problems; serving anyway."
 echo "Serving EFI static site on port ${PORT}"
-python3 -m http.server "${PORT}"
+exec python3 "$(dirname "$0")/dev_server.py" "${PORT}" "${@:2}"
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Probe site routes concurrently, keep a latency history and alert on regressions.
+
+Each probe records DNS, connect, TLS, time-to-first-byte and total time.
+Probes to one host share a small keep-alive pool (a reused connection has no
+DNS/connect/TLS time and is marked as reused). Results are appended to a
+SQLite history. A route alerts when a probe fails (error, or status outside
+200-399), or when the p95 of its total time over the recent window exceeds
+the p95 of the preceding baseline window by more than ``--threshold``.
+Routes are given as arguments; the uptime workflow passes its own list.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import http.client
+import math
+from pathlib import Path
+import socket
+import sqlite3
+import ssl
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DB = ROOT / ".cache" / "uptime.sqlite"
+DEFAULT_BASE_URL = "https://executivefunctioninginstitute.com"
+DEFAULT_ROUTES = ["/", "/esqr.html", "/dashboard.html", "/verify.html", "/health.html"]
+USER_AGENT = "EFI-Uptime/1.0"
+# p95 over the last WINDOW_HOURS is compared with the BASELINE_HOURS before it.
+WINDOW_HOURS = 6.0
+BASELINE_HOURS = 7 * 24.0
+DEFAULT_THRESHOLD = 0.5
+# Fewer samples than this in either window: no latency verdict.
+MIN_SAMPLES = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    ts REAL NOT NULL,
+    base_url TEXT NOT NULL,
+    route TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    ok INTEGER NOT NULL,
+    error TEXT,
+    reused INTEGER NOT NULL,
+    dns_ms REAL, connect_ms REAL, tls_ms REAL, ttfb_ms REAL, total_ms REAL,
+    bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS probes_route_ts ON probes (base_url, route, ts);
+"""
+
+
+@dataclass
+class Probe:
+    route: str
+    status: int = 0
+    ok: bool = False
+    error: str = ""
+    reused: bool = False
+    dns_ms: float = 0.0
+    connect_ms: float = 0.0
+    tls_ms: float = 0.0
+    ttfb_ms: float = 0.0
+    total_ms: float = 0.0
+    bytes: int = 0
+
+
+class ProbePool:
+    """Keep-alive connections to one origin, opened step by step so each
+    phase can be timed; at most ``size`` requests are in flight."""
+
+    def __init__(self, base_url: str, size: int = 4, timeout: float = 10.0):
+        parts = urlsplit(base_url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if self.https else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: list[http.client.HTTPConnection] = []
+        self._tls = ssl.create_default_context() if self.https else None
+
+    def _open(self, probe: Probe, start: float) -> http.client.HTTPConnection:
+        family, kind, proto, _, address = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)[0]
+        resolved = time.perf_counter()
+        sock = socket.socket(family, kind, proto)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(address)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connected = time.perf_counter()
+            if self._tls is not None:
+                sock = self._tls.wrap_socket(sock, server_hostname=self.host)
+        except OSError:
+            sock.close()
+            raise
+        done = time.perf_counter()
+        probe.dns_ms = (resolved - start) * 1000
+        probe.connect_ms = (connected - resolved) * 1000
+        probe.tls_ms = (done - connected) * 1000 if self._tls is not None else 0.0
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        conn = cls(self.host, self.port, timeout=self.timeout)
+        conn.sock = sock
+        return conn
+
+    def _send(self, conn: http.client.HTTPConnection, route: str) -> tuple[float, http.client.HTTPResponse]:
+        sent = time.perf_counter()
+        conn.request("GET", self.prefix + route, headers={"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, br"})
+        return sent, conn.getresponse()
+
+    def probe(self, route: str) -> Probe:
+        probe = Probe(route)
+        with self._slots:
+            start = time.perf_counter()
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            try:
+                probe.reused = conn is not None
+                if conn is None:
+                    conn = self._open(probe, start)
+                try:
+                    sent, response = self._send(conn, route)
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    if not probe.reused:
+                        raise
+                    # The server closed an idle connection; retry on a fresh one.
+                    conn.close()
+                    probe.reused = False
+                    conn = self._open(probe, time.perf_counter())
+                    sent, response = self._send(conn, route)
+                first_byte = time.perf_counter()
+                probe.bytes = len(response.read())
+                end = time.perf_counter()
+                probe.status = response.status
+                probe.ok = 200 <= response.status < 400
+                probe.ttfb_ms = (first_byte - sent) * 1000
+                probe.total_ms = (end - start) * 1000
+                if not probe.ok:
+                    probe.error = f"HTTP {response.status}"
+                if response.will_close:
+                    conn.close()
+                else:
+                    with self._lock:
+                        self._idle.append(conn)
+            except (OSError, http.client.HTTPException) as exc:
+                if conn is not None:
+                    conn.close()
+                probe.total_ms = (time.perf_counter() - start) * 1000
+                probe.error = f"{type(exc).__name__}: {exc}"
+        return probe
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+
+
+def probe_routes(base_url: str, routes: list[str], samples: int = 1, per_host: int = 4,
+                 timeout: float = 10.0) -> list[Probe]:
+    pool = ProbePool(base_url, per_host, timeout)
+    try:
+        with ThreadPoolExecutor(max_workers=per_host) as executor:
+            return list(executor.map(pool.probe, [route for _ in range(samples) for route in routes]))
+    finally:
+        pool.close()
+
+
+def open_db(path: Path) -> sqlite3.Connection:
+    if str(path) != ":memory:":
+        path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(path))
+    db.executescript(SCHEMA)
+    return db
+
+
+def record(db: sqlite3.Connection, base_url: str, probes: list[Probe], ts: float) -> None:
+    with db:
+        db.executemany(
+            "INSERT INTO probes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(ts, base_url, p.route, p.status, int(p.ok), p.error or None, int(p.reused), p.dns_ms,
+              p.connect_ms, p.tls_ms, p.ttfb_ms, p.total_ms, p.bytes) for p in probes],
+        )
+
+
+def p95(values: list[float]) -> float:
+    """Nearest-rank 95th percentile."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(0.95 * len(ordered)), 1) - 1]
+
+
+def failure_alerts(probes: list[Probe]) -> list[str]:
+    by_route: dict[str, list[Probe]] = defaultdict(list)
+    for probe in probes:
+        by_route[probe.route].append(probe)
+    alerts = []
+    for route, items in by_route.items():
+        failed = [probe for probe in items if not probe.ok]
+        if failed:
+            errors = sorted({probe.error for probe in failed})
+            alerts.append(f"{route}: {len(failed)}/{len(items)} probes failed ({'; '.join(errors)})")
+    return alerts
+
+
+def latency_alerts(db: sqlite3.Connection, base_url: str, routes: list[str], now: float,
+                   window_hours: float = WINDOW_HOURS, baseline_hours: float = BASELINE_HOURS,
+                   threshold: float = DEFAULT_THRESHOLD, min_samples: int = MIN_SAMPLES) -> list[str]:
+    """Routes whose recent p95 total time regressed against the baseline window.
+    Only successful probes count; failures alert on their own."""
+    window_start = now - window_hours * 3600
+    baseline_start = window_start - baseline_hours * 3600
+    alerts = []
+    for route in routes:
+        rows = db.execute(
+            "SELECT ts, total_ms FROM probes WHERE base_url = ? AND route = ? AND ok = 1 AND ts > ? AND ts <= ?",
+            (base_url, route, baseline_start, now),
+        ).fetchall()
+        recent = [total for ts, total in rows if ts > window_start]
+        before = [total for ts, total in rows if ts <= window_start]
+        if len(recent) < min_samples or len(before) < min_samples:
+            continue
+        current, usual = p95(recent), p95(before)
+        if current > usual * (1 + threshold):
+            alerts.append(
+                f"{route}: p95 {current:.0f} ms over the last {window_hours:g}h vs {usual:.0f} ms before "
+                f"(+{current / usual - 1:.0%}, {len(recent)}/{len(before)} samples)"
+            )
+    return alerts
+
+
+def report(probes: list[Probe]) -> None:
+    by_route: dict[str, list[Probe]] = defaultdict(list)
+    for probe in probes:
+        by_route[probe.route].append(probe)
+    print(f"{'route':<24} {'status':>6} {'dns':>7} {'connect':>8} {'tls':>7} {'ttfb':>7} {'total':>8}  ms")
+    for route, items in by_route.items():
+        worst = max(items, key=lambda p: (not p.ok, p.total_ms))
+        status = str(worst.status) if worst.status else "ERR"
+        reused = " (reused)" if worst.reused else ""
+        print(f"{route[:24]:<24} {status:>6} {worst.dns_ms:>7.1f} {worst.connect_ms:>8.1f} {worst.tls_ms:>7.1f} "
+              f"{worst.ttfb_ms:>7.1f} {worst.total_ms:>8.1f}{reused}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("routes", nargs="*", default=DEFAULT_ROUTES, help="Routes to probe.")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help=f"Site to probe (default {DEFAULT_BASE_URL}).")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="SQLite history file.")
+    parser.add_argument("--samples", type=int, default=1, help="Probes per route in this run.")
+    parser.add_argument("--per-host", type=int, default=4, help="Concurrent keep-alive connections.")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds before a probe fails.")
+    parser.add_argument("--window-hours", type=float, default=WINDOW_HOURS, help="Recent window for p95.")
+    parser.add_argument("--baseline-hours", type=float, default=BASELINE_HOURS,
+                        help="Window before the recent one that p95 is compared with.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Alert when recent p95 exceeds the baseline p95 by more than this fraction.")
+    args = parser.parse_args(argv)
+
+    base_url = args.base_url.rstrip("/")
+    now = time.time()
+    probes = probe_routes(base_url, args.routes, args.samples, args.per_host, args.timeout)
+    db = open_db(args.db)
+    try:
+        record(db, base_url, probes, now)
+        alerts = failure_alerts(probes)
+        alerts += latency_alerts(db, base_url, args.routes, now, args.window_hours, args.baseline_hours,
+                                 args.threshold)
+    finally:
+        db.close()
+
+    print(f"Probed {len(probes)} requests to {base_url}; history in {args.db}")
+    report(probes)
+    if alerts:
+        print("Uptime alerts:")
+        for alert in alerts:
+            print(f" - {alert}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Streaming efi_events rollups (scripts/analytics_rollup.py)."""
+from __future__ import annotations
+
+from collections import Counter
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import tracemalloc
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import analytics_rollup  # noqa: E402
+from analytics_rollup import HyperLogLog, RollupError  # noqa: E402
+
+FUNNELS = {"enrollment": ["index.html", "curriculum.html", "enroll.html", "checkout.html"],
+           "esqr lead": ["esqr.html", "esqr_lead_capture"]}
+# Set to e.g. 2000000 to also run the multi-million-row fixture (slow).
+LARGE_ROWS = int(os.environ.get("EFI_ANALYTICS_ROWS", "0"))
+
+
+def event(at: str, name: str, page: str, who: str) -> str:
+    return json.dumps({"event_id": f"evt_{at}", "at": at, "event_name": name, "page": page, "source": "direct",
+                       "properties": {}, "context": {"user_agent": "test", "ip_hint": who}}) + "\n"
+
+
+def by_cell(rollup) -> Counter:
+    dims, columns = rollup.dims, rollup.columns
+    return Counter({(dims["event"][e], dims["page"][p], dims["day"][d]): c for e, p, d, c in
+                    zip(columns["event"], columns["page"], columns["day"], columns["count"])})
+
+
+class AnalyticsRollupTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.exports = self.dir / "exports"
+        self.exports.mkdir()
+        self.out = self.dir / "rollup"
+
+    def ingest(self, **kwargs):
+        return analytics_rollup.ingest([self.exports], self.out, FUNNELS, **kwargs)
+
+    def test_hyperloglog_estimates(self):
+        left, right = HyperLogLog(), HyperLogLog()
+        for n in range(40_000):
+            value = analytics_rollup.visitor_hash({"ip_hint": f"10.0.{n >> 8}.{n & 255}", "user_agent": "x"})
+            (left if n % 2 else right).add(value)
+        self.assertAlmostEqual(left.count(), 20_000, delta=1000)
+        left.merge(right)
+        self.assertAlmostEqual(left.count(), 40_000, delta=2000)
+        small = HyperLogLog()
+        for n in range(50):
+            small.add(analytics_rollup.visitor_hash({"ip_hint": str(n)}))
+        self.assertEqual(small.count(), 50)
+
+    def test_rollup_matches_generated_jsonl_and_csv(self):
+        truth, seen = analytics_rollup.generate_export(self.exports / "a.jsonl", 12_000, seed=1)
+        more, seen_csv = analytics_rollup.generate_export(self.exports / "b.csv", 4_000, seed=2, start="2026-02-01")
+        stats = self.ingest()
+        self.assertEqual((stats["segments"], stats["rows"]), (2, 16_000))
+
+        rollup = analytics_rollup.load(self.out)
+        self.assertEqual(by_cell(rollup), truth + more)
+        self.assertEqual(rollup.skipped, 0)
+        self.assertAlmostEqual(analytics_rollup.distinct(rollup), len(seen | seen_csv), delta=len(seen) * 0.05)
+        by_day = analytics_rollup.totals(rollup, "day", since="2026-02-01", until="2026-02-03", page="index.html")
+        self.assertEqual(sorted(by_day.items()), sorted(
+            (day, sum(n for (_, page, d), n in (truth + more).items() if d == day and page == "index.html"))
+            for day in ("2026-02-01", "2026-02-02", "2026-02-03")))
+        self.assertTrue(analytics_rollup.report(rollup, None, None, None, None, None, 5)[0].startswith(
+            "efi_events rollup: 16,000 rows from 2 segments"))
+
+    def test_incremental_run_reads_only_appended_rows(self):
+        segment = self.exports / "efi_events-0001.jsonl"
+        truth, _ = analytics_rollup.generate_export(segment, 5_000, seed=3)
+        self.ingest()
+        self.assertEqual(self.ingest()["unchanged"], 1)
+
+        appended, _ = analytics_rollup.generate_export(self.dir / "tail.jsonl", 2_000, seed=4, start="2026-03-01")
+        tail = (self.dir / "tail.jsonl").read_bytes()
+        with open(segment, "ab") as handle:
+            handle.write(tail + b'{"event_id": "evt_partial", "at": "2026-0')
+        stats = self.ingest()
+        self.assertEqual((stats["rows"], stats["bytes"]), (2_000, len(tail)))
+        self.assertEqual(by_cell(analytics_rollup.load(self.out)), truth + appended)
+
+        with open(segment, "ab") as handle:
+            handle.write(b'4-01T00:00:00Z", "event_name": "page_view", "page": "about.html"}\n')
+        self.assertEqual(self.ingest()["rows"], 1)
+
+        segment.write_bytes(b"\n" + segment.read_bytes())
+        with self.assertRaises(RollupError):
+            self.ingest()
+        self.assertEqual(self.ingest(rebuild=True)["rows"], 7_001)
+
+    def test_funnels_follow_sessions_across_runs(self):
+        (self.exports / "1.jsonl").write_text("".join([
+            event("2026-01-01T08:00:00Z", "page_view", "index.html", "b"),
+            event("2026-01-01T09:50:00Z", "page_view", "curriculum.html", "c"),
+            event("2026-01-01T09:55:00Z", "page_view", "esqr.html", "c"),
+            event("2026-01-01T10:00:00Z", "page_view", "index.html", "a"),
+            event("2026-01-01T10:00:00Z", "page_view", "curriculum.html", "b"),
+            event("2026-01-01T10:01:00Z", "page_view", "curriculum.html", "a"),
+        ]), encoding="utf-8")
+        self.ingest()
+        (self.exports / "2.jsonl").write_text("".join([
+            event("2026-01-01T10:05:00Z", "esqr_lead_capture", "esqr.html", "c"),
+            event("2026-01-01T10:10:00Z", "esqr_lead_capture", "esqr.html", "c"),
+            event("2026-01-01T10:20:00Z", "page_view", "enroll.html", "a"),
+        ]), encoding="utf-8")
+        self.ingest()
+        funnels = analytics_rollup.load(self.out).funnels
+        self.assertEqual(funnels["enrollment"]["counts"], [2, 1, 1, 0])
+        self.assertEqual(funnels["esqr lead"]["counts"], [1, 1])
+        with self.assertRaises(RollupError):
+            analytics_rollup.ingest([self.exports], self.out, {"enrollment": ["index.html", "enroll.html"]})
+
+    def test_memory_does_not_grow_with_rows(self):
+        peaks = []
+        for rows in (5_000, 20_000):
+            path = self.exports / f"{rows}.jsonl"
+            analytics_rollup.generate_export(path, rows, seed=5, visitors=500)
+            tracemalloc.start()
+            analytics_rollup.ingest([path], self.dir / f"rollup-{rows}", FUNNELS)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        self.assertLess(peaks[1], peaks[0] * 1.5)
+
+    @unittest.skipUnless(LARGE_ROWS, "set EFI_ANALYTICS_ROWS to run the multi-million-row fixture")
+    def test_large_fixture(self):
+        truth: Counter = Counter()
+        for number in range(4):
+            counts, _ = analytics_rollup.generate_export(self.exports / f"efi_events-{number}.jsonl", LARGE_ROWS // 4,
+                                                         seed=number, start=f"2026-0{number + 1}-01")
+            truth += counts
+        self.assertEqual(self.ingest()["rows"], sum(truth.values()))
+        self.assertEqual(by_cell(analytics_rollup.load(self.out)), truth)
+
+
+if __name__ == "__main__":
+    unittest.main()
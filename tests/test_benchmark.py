@@ -0,0 +1,51 @@
+"""Synthetic site generator and baseline comparison in scripts/benchmark.py."""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import benchmark  # noqa: E402
+import check_pdfs  # noqa: E402
+
+
+class SyntheticSiteTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.site = Path(self.tmp.name) / "site"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_generated_site_passes_checks(self):
+        names = benchmark.generate_site(self.site, 30)
+        self.assertEqual(len(names), 30)
+        self.assertIn(f"<loc>{benchmark.DOMAIN}page-00029.html</loc>", (self.site / "sitemap.xml").read_text())
+        for check in ("links", "canonical", "sitemap"):
+            result = benchmark.run_checker(self.site, benchmark.CHECKERS[check])
+            self.assertEqual(result["rc"], 0, f"{check}: {result['stderr']}")
+            self.assertGreater(result["peak_kb"], 0)
+
+    def test_large_stderr_does_not_block(self):
+        chatty = "import sys; sys.stderr.write('x' * 200_000); sys.exit(3)"
+        result = benchmark.run_checker(Path(self.tmp.name), ["-c", chatty])
+        self.assertEqual((result["rc"], len(result["stderr"])), (3, 200_000))
+
+    def test_synthetic_pdf_is_structurally_valid(self):
+        path = Path(self.tmp.name) / "x.pdf"
+        path.write_bytes(benchmark.synthetic_pdf(3))
+        info = check_pdfs.inspect_pdf(path)
+        self.assertEqual((info["errors"], info["pages"], info["xref"]), ([], 3, "table"))
+
+    def test_compare_flags_regressions_beyond_threshold(self):
+        base = {"100/links": {"wall": 1.0, "peak_kb": 1000}}
+        self.assertEqual(benchmark.compare({"100/links": {"wall": 1.2, "peak_kb": 1000}}, base, 0.25), [])
+        flagged = benchmark.compare({"100/links": {"wall": 1.5, "peak_kb": 2000}}, base, 0.25)
+        self.assertEqual(len(flagged), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Minifiers (scripts/_minify.py) and the dist/ build in scripts/build_assets.py."""
+from __future__ import annotations
+
+from contextlib import redirect_stdout
+import io
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import _minify  # noqa: E402
+import build_assets  # noqa: E402
+
+
+class MinifyTest(unittest.TestCase):
+    def test_css_keeps_significant_whitespace(self):
+        css = """/* header */
+        .a  >  .b ,  .c :hover {
+          width: calc(100% - 2px);
+          content: "a  ;  }";
+        }
+        """
+        self.assertEqual(
+            _minify.minify_css(css),
+            '.a>.b,.c :hover{width:calc(100% - 2px);content:"a  ;  }"}\n',
+        )
+
+    def test_js_keeps_line_breaks_strings_and_regexes(self):
+        src = """// comment
+        var a = b - -c
+        var re = /[/*]+ x/g;   /* block */
+        return `t ${ "}" + x } //`
+        """
+        self.assertEqual(
+            _minify.minify_js(src),
+            'var a=b- -c\nvar re=/[/*]+ x/g;\nreturn`t ${ "}" + x } //`\n',
+        )
+
+    def test_js_string_rewriting(self):
+        mapping = {"images/a.svg": "images/a.0123456789.svg"}
+        out = _minify.minify_js("x('images/a.svg', 'images/b.svg')",
+                                lambda lit: build_assets.rewrite_js_string(lit, mapping))
+        self.assertEqual(out, "x('images/a.0123456789.svg','images/b.svg')\n")
+
+
+class BuildTest(unittest.TestCase):
+    def test_rewrite_link_keeps_form_and_fragment(self):
+        mapping = {"images/a.svg": "images/a.0123456789.svg"}
+        self.assertEqual(build_assets.rewrite_link("../images/a.svg#x", "css/s.css", mapping),
+                         "../images/a.0123456789.svg#x")
+        self.assertEqual(build_assets.rewrite_link("/images/a.svg?v=2", "index.html", mapping),
+                         "/images/a.0123456789.svg?v=2")
+        self.assertEqual(build_assets.rewrite_link("about.html", "index.html", mapping), "about.html")
+
+    def test_build_rewrites_pages_to_hashed_assets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dist = Path(tmp)
+            (dist / "stale.txt").write_text("old")
+            with redirect_stdout(io.StringIO()) as out:
+                mapping = build_assets.build(dist, jobs=1, use_cache=False)
+            self.assertIn(f"1 stale files removed -> {dist}", out.getvalue())
+            css = mapping["css/styles.css"]
+            self.assertRegex(css, r"^css/styles\.[0-9a-f]{10}\.css$")
+            self.assertTrue((dist / (css + ".gz")).is_file())
+            self.assertIn(f'href="{css}"', (dist / "index.html").read_text(encoding="utf-8"))
+            self.assertEqual(json.loads((dist / build_assets.MANIFEST).read_text()), mapping)
+            self.assertFalse((dist / "stale.txt").exists())
+            self.assertTrue((dist / "robots.txt").is_file())
+            downloads = build_assets.function_assets()
+            self.assertIn("docs/assets/90-day-coaching-business-launch-plan.pdf", downloads)
+            self.assertEqual([rel for rel in downloads if not (dist / rel).is_file()], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Cache-Control resolution and browser-cache simulation (scripts/check_cache_policy.py)."""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import check_cache_policy  # noqa: E402
+from check_cache_policy import Policy  # noqa: E402
+from dev_server import SiteConfig  # noqa: E402
+
+CONFIG = """
+[build]
+  publish = "."
+
+[[headers]]
+  for = "/*"
+  [headers.values]
+    X-Frame-Options = "DENY"
+
+[[headers]]
+  for = "/data/bundles/*"
+  [headers.values]
+    cache-control = "public, max-age=31536000, immutable"
+
+[[headers]]
+  for = "/css/*"
+  [headers.values]
+    Cache-Control = "public, max-age=86400"
+
+[[headers]]
+  for = "/js/*"
+  [headers.values]
+    Cache-Control = "public, max-age=31536000, immutable"
+
+[[redirects]]
+  from = "/old.html"
+  to = "/index.html"
+  status = 301
+  force = true
+"""
+
+
+class CachePolicyTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        for rel in ("index.html", "old.html", "css/site.css", "js/app.3f986eed5f.js", "js/plain.js",
+                    "data/bundles/quiz.4308e360e5.json", "data/search/docs.0123456789.json"):
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x", encoding="utf-8")
+        (self.root / "netlify.toml").write_text(CONFIG, encoding="utf-8")
+        self.config = SiteConfig(self.root / "netlify.toml")
+
+    def test_policy_parsing(self):
+        self.assertEqual(Policy.parse("public, max-age=31536000, immutable"),
+                         Policy("public, max-age=31536000, immutable", 31536000, True, False))
+        self.assertEqual(Policy.parse("no-cache, max-age=600").max_age, 0)
+        self.assertTrue(Policy.parse("no-store").no_store)
+
+    def test_findings(self):
+        files = check_cache_policy.served_files(self.root)
+        policies, failures, notes = check_cache_policy.policy_findings(self.config, files)
+        self.assertEqual(notes, ["old.html: served by a forced redirect to /index.html"])
+        self.assertNotIn("old.html", policies)
+        self.assertEqual(policies["index.html"].value, check_cache_policy.DEFAULT_CACHE_CONTROL)
+        self.assertEqual([failure.split(":")[0] for failure in failures],
+                         ["css/site.css", "data/search/docs.0123456789.json", "js/plain.js"])
+        self.assertEqual(check_cache_policy.policy_findings(self.config, files, max_mutable_age=86400)[1][0],
+                         failures[1])
+
+    def test_simulation(self):
+        policies = {"a.html": Policy.parse("public, max-age=0, must-revalidate"),
+                    "app.js": Policy.parse("public, max-age=31536000, immutable"),
+                    "live.json": Policy.parse("no-store")}
+        sizes = dict.fromkeys(policies, 100)
+        requests_for = {"a.html": ["a.html", "app.js", "live.json", "missing.png"]}
+        log = check_cache_policy.simulate([(0, "a.html"), (30, "a.html")], requests_for, policies, sizes)
+        self.assertEqual([(when, rel, outcome) for when, _, rel, outcome in log], [
+            (0, "a.html", "download"), (0, "app.js", "download"), (0, "live.json", "download"),
+            (30, "a.html", "revalidate"), (30, "app.js", "hit"), (30, "live.json", "download"),
+        ])
+        lines = check_cache_policy.report(log, sizes, 100, return_at=30)
+        self.assertIn("    3      1      1         1", lines[2])
+
+    def test_committed_site_passes(self):
+        failures, _, lines = check_cache_policy.analyze(use_cache=False)
+        self.assertEqual(failures, [])
+        self.assertTrue(lines[0].startswith("Navigation: index.html -> "))
+        served = check_cache_policy.served_files(check_cache_policy.build_assets.DIST)
+        self.assertIn("docs/assets/executive-function-skills-gap-analyzer.pdf", served)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Page selection for --changed-since runs in scripts/_changes.py."""
+from __future__ import annotations
+
+import argparse
+from contextlib import redirect_stderr
+import io
+from pathlib import Path
+import sys
+import unittest
+
+SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+import _changes  # noqa: E402
+from _changes import ChangeSet  # noqa: E402
+
+
+class FakePage:
+    def __init__(self, name: str, text: str = ""):
+        self.name = name
+        self.text = text
+
+
+class SelectPagesTest(unittest.TestCase):
+    def setUp(self):
+        self.pages = [
+            FakePage("index.html", '<a href="about.html">'),
+            FakePage("about.html"),
+            FakePage("resources.html", '<a href="My%20Guide.pdf">'),
+        ]
+
+    def names(self, selected):
+        return [page.name for page in selected]
+
+    def test_changed_pages_only(self):
+        changes = ChangeSet("HEAD", set(), {"about.html"}, set())
+        self.assertEqual(self.names(changes.select_pages(self.pages)), ["about.html"])
+
+    def test_changed_checker_selects_everything(self):
+        changes = ChangeSet("HEAD", set(), {"scripts/check_links.py"}, set())
+        selected = changes.select_pages(self.pages, [SCRIPTS / "check_links.py"])
+        self.assertEqual(len(selected), 3)
+
+    def test_touches_uses_repo_relative_paths(self):
+        changes = ChangeSet("HEAD", {"netlify.toml"}, set(), set())
+        self.assertTrue(changes.touches([SCRIPTS.parent / "netlify.toml"]))
+        self.assertFalse(changes.touches([SCRIPTS.parent / "sitemap.xml"]))
+
+
+class FromArgsTest(unittest.TestCase):
+    def test_unknown_ref_is_a_usage_error(self):
+        parser = argparse.ArgumentParser(prog="check")
+        _changes.add_argument(parser)
+        with redirect_stderr(io.StringIO()) as err, self.assertRaises(SystemExit) as exit_:
+            _changes.from_args(parser.parse_args(["--changed-since", "no-such-ref"]), parser)
+        self.assertEqual(exit_.exception.code, 2)
+        self.assertEqual(err.getvalue().splitlines()[-1],
+                         "check: error: --changed-since: unknown git ref 'no-such-ref'")
+        self.assertIsNone(_changes.from_args(parser.parse_args([]), parser))
+
+
+if __name__ == "__main__":
+    unittest.main()
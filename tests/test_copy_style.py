@@ -0,0 +1,62 @@
+"""Combined rule matcher in scripts/check_copy_style.py."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import check_copy_style  # noqa: E402
+
+
+class RuleSetTest(unittest.TestCase):
+    def test_maps_hits_back_to_rules_including_overlaps(self):
+        rules = check_copy_style.RuleSet([
+            {"phrase": "ready to transform", "message": "cta"},
+            {"pattern": r"\btransform lives?\b", "message": "lives"},
+            {"phrase": "world class", "joiners": "- ", "message": "superlative"},
+            {"phrase": "next level", "message": "hype"},
+        ])
+        text = "Ready to transform lives.\nWorld-Class, next-level, worldclass."
+        hits = [(offset, found, message) for offset, found, message in rules.matches(text)]
+        self.assertEqual(hits, [
+            (0, "Ready to transform", "cta"),
+            (9, "transform lives", "lives"),
+            (26, "World-Class", "superlative"),
+        ])
+
+    def test_rules_sharing_an_offset_all_report(self):
+        rules = check_copy_style.RuleSet([
+            {"phrase": "world class", "message": "superlative"},
+            {"pattern": r"\bworld\b", "message": "world"},
+            {"phrase": "next", "message": "next"},
+            {"phrase": "next level", "message": "hype"},
+        ])
+        hits = list(rules.matches("World class, next level."))
+        self.assertEqual(hits, [
+            (0, "World class", "superlative"),
+            (0, "World", "world"),
+            (13, "next", "next"),
+            (13, "next level", "hype"),
+        ])
+
+    def test_hyphenated_phrase_in_an_extra_pack(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            extra = Path(tmp) / "extra.json"
+            extra.write_text(json.dumps({"rules": [{"phrase": "best-in-class", "message": "superlative"}]}),
+                             encoding="utf-8")
+            rules = check_copy_style.RuleSet.load([check_copy_style.RULES_PATH, extra])
+        text = "A best-in-class, world-class, best in class kit."
+        hits = [(found, message) for _, found, message in rules.matches(text)]
+        self.assertEqual(hits, [("best-in-class", "superlative"), ("world-class", "Avoid unsupported superlatives.")])
+
+    def test_default_pack_matches_legacy_rules(self):
+        found = [m for _, _, m in check_copy_style.RULES.matches("A game-changer that will unlock graded assignments.")]
+        self.assertEqual(found, ["Use specific impact language.", "Prefer 'includes graded assignments'."])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Selector matching, unused rules and critical CSS in scripts/css_coverage.py."""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from _site import Page  # noqa: E402
+import css_coverage as cov  # noqa: E402
+
+CSS = """/* theme */
+:root { --x: 1; }
+.nav > a.active, .nav a:hover { color: red; }
+.hero h1 + p { margin: 0; }
+[data-theme="dark"] .card { background: #000; }
+.card[data-state^="op"] { outline: 0; }
+.is-open { display: block; }
+.never-used { color: blue; }
+@media (max-width: 600px) {
+  .card { padding: 0; }
+  .gone { padding: 0; }
+}
+@media print { .nav { display: none; } }
+@keyframes spin { from { opacity: 0; } to { opacity: 1; } }
+"""
+
+HTML = """<html><body><nav class="nav"><a href="/" class="active">Home</a></nav>
+<main><section class="hero"><h1>Hi</h1><p>Intro</p></section>
+<section><div class="card" data-state="open">Card</div></section></main></body></html>"""
+
+
+class CssCoverageTest(unittest.TestCase):
+    def setUp(self):
+        self.rules = cov.parse_stylesheet(CSS)
+        self.coverage = cov.Coverage(self.rules, [Page(Path("a.html"), HTML)], {"is-open", "data-theme"})
+        self.status = {rule.prelude: self.coverage.status(r) for r, rule in enumerate(self.rules)}
+
+    def test_parse_keeps_media_and_lines(self):
+        card = next(rule for rule in self.rules if rule.prelude == ".card" and rule.media)
+        self.assertEqual(card.media, ("@media (max-width: 600px)",))
+        self.assertEqual(card.line, 10)
+        self.assertEqual(self.rules[0].text, ":root{--x:1}")
+
+    def test_statuses(self):
+        self.assertEqual(self.status[".nav > a.active, .nav a:hover"], "used")
+        self.assertEqual(self.status[".hero h1 + p"], "used")
+        self.assertEqual(self.status['.card[data-state^="op"]'], "used")
+        self.assertEqual(self.status['[data-theme="dark"] .card'], "dynamic")
+        self.assertEqual(self.status[".is-open"], "dynamic")
+        self.assertEqual(self.status[".never-used"], "unused")
+        self.assertEqual(self.status[".gone"], "unused")
+        self.assertEqual(self.status["@keyframes spin"], "kept")
+
+    def test_critical_covers_the_fold_only(self):
+        critical = cov.render(self.coverage.critical(0))
+        self.assertIn(".nav>a.active", critical)
+        self.assertIn(".hero h1 + p{margin:0}", critical)
+        self.assertNotIn(".card", critical)
+        self.assertNotIn("print", critical)
+
+    def test_unmatched_brace_is_reported(self):
+        with self.assertRaisesRegex(ValueError, "line 2"):
+            cov.parse_stylesheet(".a { color: red; }\n}\n.b { color: blue; }")
+
+
+if __name__ == "__main__":
+    unittest.main()
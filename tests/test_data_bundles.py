@@ -0,0 +1,65 @@
+"""Sharded, content-hashed data bundles (scripts/build_data_bundles.py)."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import build_data_bundles  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class DataBundlesTest(unittest.TestCase):
+    def test_committed_bundles_are_fresh(self):
+        self.assertEqual(build_data_bundles.stale(use_cache=False), [])
+
+    def test_only_changed_shards_are_rewritten(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data = Path(tmp)
+            for name in ("module-quizzes.json", "esqr-config.json"):
+                shutil.copy(ROOT / "data" / name, data / name)
+            self.assertEqual(build_data_bundles.build(data, use_cache=False), (8, 0))
+            before = json.loads((data / "bundle-manifest.json").read_text(encoding="utf-8"))
+            quiz = json.loads((data / before["quizzes"]["module-2"]).read_text(encoding="utf-8"))
+            self.assertEqual(quiz, json.loads((ROOT / "data" / "module-quizzes.json").read_text(
+                encoding="utf-8"))["quizzes"]["module-2"])
+
+            quizzes = json.loads((data / "module-quizzes.json").read_text(encoding="utf-8"))
+            quizzes["quizzes"]["module-2"]["title"] += " (revised)"
+            (data / "module-quizzes.json").write_text(json.dumps(quizzes), encoding="utf-8")
+            self.assertEqual(build_data_bundles.stale(data, use_cache=False),
+                             [f"missing data/{build_data_bundles.plan(data, False)[0]['quizzes']['module-2']}",
+                              f"stale data/{before['quizzes']['module-2']}",
+                              "data/bundle-manifest.json is out of date"])
+            # The new module-2 shard and the manifest; the old shard is pruned.
+            self.assertEqual(build_data_bundles.build(data, use_cache=False), (2, 1))
+            after = json.loads((data / "bundle-manifest.json").read_text(encoding="utf-8"))
+            changed = {key for key in before["quizzes"] if before["quizzes"][key] != after["quizzes"][key]}
+            self.assertEqual(changed, {"module-2"})
+            self.assertEqual(after["esqr"], before["esqr"])
+            self.assertEqual(build_data_bundles.stale(data, use_cache=False), [])
+
+    def test_cached_check_rehashes_bundles(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data = Path(tmp)
+            for name in ("module-quizzes.json", "esqr-config.json"):
+                shutil.copy(ROOT / "data" / name, data / name)
+            build_data_bundles.build(data)
+            manifest, outputs = build_data_bundles.plan(data)
+            self.assertEqual(set(outputs.values()), {None})  # every source is a cache hit
+            esqr = data / manifest["esqr"]
+            esqr.write_bytes(esqr.read_bytes().replace(b"{", b"{ ", 1))
+            self.assertEqual(build_data_bundles.stale(data),
+                             [f"data/{manifest['esqr']} does not match its content hash"])
+            self.assertEqual(build_data_bundles.build(data), (1, 0))
+            self.assertEqual(build_data_bundles.stale(data), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Compiled schemas, streaming and cross-file checks (scripts/_schema.py, scripts/check_data.py)."""
+from __future__ import annotations
+
+from collections import defaultdict
+import io
+import json
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import _schema  # noqa: E402
+import check_data  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def errors_for(schema: dict, value) -> list[str]:
+    errors: list[str] = []
+    _schema.compile_schema(schema)(value, (), errors)
+    return errors
+
+
+class SchemaTest(unittest.TestCase):
+    def test_keywords(self):
+        schema = {
+            "type": "object",
+            "required": ["id", "options"],
+            "additionalProperties": False,
+            "properties": {
+                "id": {"type": "string", "pattern": "^q[0-9]+$"},
+                "options": {"type": "array", "minItems": 2, "uniqueItems": True, "items": {"type": "string"}},
+                "correct": {"type": "integer", "indexOf": "options"},
+                "when": {"type": "string", "format": "date"},
+            },
+        }
+        self.assertEqual(errors_for(schema, {"id": "q1", "options": ["a", "b"], "correct": 1}), [])
+        self.assertEqual(
+            errors_for(schema, {"id": "x", "options": ["a", "a"], "correct": 2, "when": "2026-13-01", "more": 1}),
+            [
+                'id: "x" does not match ^q[0-9]+$',
+                'options[1]: duplicate item "a" (first at options[0])',
+                'when: "2026-13-01" is not a valid date',
+                "more: is not an allowed property",
+                "correct: 2 is not an index into options (2 items)",
+            ],
+        )
+        self.assertEqual(errors_for(schema, {"options": [1], "correct": True}),
+                         ["(root): missing required id", "options[0]: expected string, got 1",
+                          "options: needs at least 2 items, has 1", "correct: expected integer, got true"])
+
+    def test_stream_matches_full_parse(self):
+        doc = {"version": "1", "items": [{"id": i, "tags": ["a", 1.5, None, True]} for i in range(500)],
+               "tail": {"x": "}]\\\"{"}}
+        text = json.dumps(doc, indent=1)
+        loaded = list(_schema.iter_document(text, "items"))
+        streamed = list(_schema.iter_document(io.StringIO(text), "items", chunk_size=7))
+        self.assertEqual(streamed, loaded)
+        self.assertEqual(loaded[1], ("stream", "items", "array"))
+        self.assertEqual(len([event for event in streamed if event[0] == "item"]), 500)
+        with self.assertRaisesRegex(ValueError, "line 3"):
+            list(_schema.iter_document(io.StringIO('{"items": [\n1,\n2 3]}'), "items", chunk_size=4))
+
+    def test_numbers_split_at_a_chunk_boundary(self):
+        for pad in range(20):
+            text = json.dumps({"a": "x" * pad, "items": [{"n": 1.5e-3}, -12.25, 100]})
+            with self.subTest(pad=pad):
+                self.assertEqual(list(_schema.iter_document(io.StringIO(text), "items", chunk_size=16)),
+                                 list(_schema.iter_document(text, "items")))
+        text = '{"a": "' + "x" * (65536 - len('{"a": "') - len('", "n": 1.')) + '", "n": 1.5}'
+        self.assertEqual(text.index("1.") + 2, 65536)
+        self.assertEqual(list(_schema.iter_document(io.StringIO(text))), list(_schema.iter_document(text)))
+
+
+class CheckDataTest(unittest.TestCase):
+    def test_repository_data_is_valid(self):
+        self.assertEqual(check_data.validate_all(), (6, []))
+
+    def test_cross_file_failures(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data = Path(tmp)
+            for name in ("bundle-manifest.json", "coach-directory.json", "module-quizzes.json", "search-manifest.json",
+                         "video-library.json"):
+                shutil.copy(ROOT / "data" / name, data / name)
+            config = json.loads((ROOT / "data" / "esqr-config.json").read_text(encoding="utf-8"))
+            config["skills"][1]["questions"][0] = "q1"
+            del config["strategies"]["planning"]
+            (data / "esqr-config.json").write_text(json.dumps(config), encoding="utf-8")
+            # Force the streaming path for every file that declares one.
+            count, failures = check_data.validate_all(data, stream_bytes=0)
+        self.assertEqual(count, 6)
+        self.assertEqual(failures, [
+            "esqr-config.json: skills[1].questions[0]: question q1 is already used at esqr-config.json: skills[0].questions[0]",
+            "esqr.html: input q4 is not scored by any skill in data/esqr-config.json",
+            "esqr-config.json: skills[5].id: skill planning has no strategies entry",
+        ])
+
+    def test_streamed_and_loaded_errors_agree(self):
+        quizzes = json.loads((ROOT / "data" / "module-quizzes.json").read_text(encoding="utf-8"))
+        quizzes["quizzes"]["module-2"]["questions"][0]["correct"] = 7
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "module-quizzes.json"
+            path.write_text(json.dumps(quizzes), encoding="utf-8")
+            spec = check_data.load_schemas()["module-quizzes.json"]
+            results = [check_data.validate_file(path, spec, defaultdict(list), stream_bytes=size) for size in (0, 1 << 30)]
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], ["module-quizzes.json: quizzes.module-2.questions[0].correct: "
+                                      "7 is not an index into options (4 items)"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Netlify rules, compression, conditional and range requests in scripts/dev_server.py."""
+from __future__ import annotations
+
+import gzip
+import http.client
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import dev_server  # noqa: E402
+
+CONFIG = """
+[[redirects]]
+  from = "/old/:slug"
+  to = "/new/:slug.html"
+  status = 301
+
+[[redirects]]
+  from = "/docs/*"
+  to = "/guide.html"
+  status = 200
+
+[[headers]]
+  for = "/*"
+  [headers.values]
+    X-Frame-Options = "DENY"
+
+[[headers]]
+  for = "/files/*"
+  [headers.values]
+    Cache-Control = "public, max-age=3600"
+"""
+
+
+class DevServerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        root = Path(cls.tmp.name)
+        (root / "netlify.toml").write_text(CONFIG, encoding="utf-8")
+        (root / "guide.html").write_text("<p>guide</p>" * 100, encoding="utf-8")
+        (root / "404.html").write_text("missing", encoding="utf-8")
+        (root / "files").mkdir()
+        (root / "files" / "doc.pdf").write_bytes(bytes(range(256)) * 4)
+        (root / ".env").write_text("SECRET=1", encoding="utf-8")
+        (root / ".git").mkdir()
+        (root / ".git" / "config").write_text("[core]", encoding="utf-8")
+        config = dev_server.SiteConfig(root / "netlify.toml")
+        cls.server = dev_server.DevServer(("127.0.0.1", 0), root, config, None, quiet=True)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.tmp.cleanup()
+
+    def get(self, path: str, method: str = "GET", **headers: str) -> http.client.HTTPResponse:
+        conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        self.addCleanup(conn.close)
+        conn.request(method, path, headers={k.replace("_", "-"): v for k, v in headers.items()})
+        response = conn.getresponse()
+        response.body = response.read()
+        return response
+
+    def test_redirects_rewrites_headers_and_404(self):
+        moved = self.get("/old/guide?x=1")
+        self.assertEqual((moved.status, moved.getheader("Location")), (301, "/new/guide.html?x=1"))
+        rewritten = self.get("/docs/anything")
+        self.assertEqual(rewritten.status, 200)
+        self.assertIn(b"guide", rewritten.body)
+        self.assertEqual(rewritten.getheader("X-Frame-Options"), "DENY")
+        self.assertEqual(self.get("/guide").status, 200)  # pretty URL
+        pdf = self.get("/files/doc.pdf")
+        self.assertEqual(pdf.getheader("Cache-Control"), "public, max-age=3600")
+        missing = self.get("/nope")
+        self.assertEqual((missing.status, missing.body), (404, b"missing"))
+        self.assertEqual(self.get("/guide.html", method="POST").status, 405)
+
+    def test_dotfiles_are_not_served(self):
+        for path in ("/.env", "/.git/config", "/.git/", "/files/../.env", "/%2Eenv"):
+            missing = self.get(path)
+            self.assertEqual((missing.status, missing.body), (404, b"missing"), path)
+
+    def test_compression_and_conditional_requests(self):
+        plain = self.get("/guide.html")
+        zipped = self.get("/guide.html", Accept_Encoding="br;q=0, gzip")
+        self.assertEqual(zipped.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(zipped.body), plain.body)
+        self.assertNotEqual(zipped.getheader("ETag"), plain.getheader("ETag"))
+        self.assertEqual(self.get("/guide.html", If_None_Match=plain.getheader("ETag")).status, 304)
+        self.assertEqual(self.get("/guide.html", If_None_Match='"other"').status, 200)
+
+    def test_range_requests(self):
+        part = self.get("/files/doc.pdf", Range="bytes=10-19")
+        self.assertEqual(part.status, 206)
+        self.assertEqual(part.getheader("Content-Range"), "bytes 10-19/1024")
+        self.assertEqual(part.body, bytes(range(10, 20)))
+        self.assertEqual(self.get("/files/doc.pdf", Range="bytes=-4").body, bytes(range(252, 256)))
+        self.assertEqual(self.get("/files/doc.pdf", Range="bytes=5000-").status, 416)
+        self.assertEqual(self.get("/files/doc.pdf", Range="bytes=0-1", If_Range='"stale"').status, 200)
+
+    def test_functions_unavailable_answer_502(self):
+        self.assertEqual(self.get("/.netlify/functions/verify").status, 502)
+
+
+@unittest.skipUnless(shutil.which("node"), "node is not installed")
+class FunctionsHostTest(unittest.TestCase):
+    def test_runs_a_netlify_function(self):
+        host = dev_server.FunctionsHost(env_file=Path("/nonexistent"))
+        self.assertTrue(host.start())
+        self.addCleanup(host.stop)
+        conn = http.client.HTTPConnection("127.0.0.1", host.port, timeout=10)
+        self.addCleanup(conn.close)
+        conn.request("GET", "/.netlify/functions/ops-config")
+        response = conn.getresponse()
+        self.assertEqual(response.status, 403)
+        self.assertIn(b"Admin or reviewer role required", response.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""External link engine in scripts/check_links.py against a local stand-in server."""
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import check_links  # noqa: E402
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, headers: dict[str, str] | None = None) -> None:
+        body = b"" if self.command == "HEAD" else b"ok"
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            server.ports.add(self.client_address[1])
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+            hits = server.hits[self.path]
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+                self._send(200)
+            elif self.path == "/redirect":
+                self._send(301, {"Location": "/ok"})
+            elif self.path == "/loop":
+                self._send(302, {"Location": "/loop"})
+            elif self.path == "/missing":
+                self._send(404)
+            elif self.path == "/flaky":
+                # HEAD and its GET fallback both fail on the first attempt.
+                self._send(503 if hits <= 2 else 200)
+            elif self.path == "/down":
+                self._send(500)
+            elif self.path == "/no-head":
+                self._send(405 if self.command == "HEAD" else 200)
+            else:
+                self._send(200)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    do_GET = _route
+    do_HEAD = _route
+
+
+class ExternalLinkEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.server.lock = threading.Lock()
+        self.server.hits = {}
+        self.server.ports = set()
+        self.server.in_flight = 0
+        self.server.peak = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self.tmp.name) / "external-links.json"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def check(self, paths, **options):
+        options.setdefault("backoff", 0.01)
+        options.setdefault("cache_path", self.cache_path)
+        return check_links.check_external({self.base + p for p in paths}, **options)
+
+    def test_reports_failures_and_follows_redirects(self):
+        failed, stats = self.check(["/ok", "/redirect", "/missing", "/down", "/no-head", "/loop"])
+        self.assertEqual(stats["total"], 6)
+        self.assertEqual(
+            failed,
+            [
+                (self.base + "/down", 500),
+                (self.base + "/loop", "too many redirects"),
+                (self.base + "/missing", 404),
+            ],
+        )
+
+    def test_retries_transient_errors_with_backoff(self):
+        failed, _ = self.check(["/flaky"], retries=1)
+        self.assertEqual(failed, [])
+        self.assertEqual(self.server.hits["/flaky"], 3)
+
+    def test_dedupes_fragments(self):
+        self.check(["/ok#a", "/ok#b", "/ok"])
+        self.assertEqual(self.server.hits["/ok"], 1)
+
+    def test_per_host_cap_and_connection_reuse(self):
+        paths = [f"/slow/{i}" for i in range(8)]
+        self.check(paths, jobs=8, per_host=2)
+        self.assertLessEqual(self.server.peak, 2)
+        self.assertLessEqual(len(self.server.ports), 2)
+
+    def test_ttl_cache_skips_recent_passes(self):
+        self.check(["/ok", "/missing"])
+        failed, stats = self.check(["/ok", "/missing"])
+        self.assertEqual(stats["cached"], 1)
+        self.assertEqual(self.server.hits["/ok"], 1)
+        self.assertEqual(failed, [(self.base + "/missing", 404)])
+
+        self.check(["/ok"], ttl=0)
+        self.assertEqual(self.server.hits["/ok"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Per-check metering and the JSON/JUnit reports of scripts/release_gate.py."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+import tempfile
+import tracemalloc
+import unittest
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from _profile import Meter  # noqa: E402
+import release_gate  # noqa: E402
+
+
+def fake_results() -> dict:
+    results = {}
+    for i, label in enumerate(release_gate.CHECK_ORDER):
+        meter = Meter()
+        meter.wall = 0.01 * (i + 1)
+        meter.pages = {"a.html": 0.002, "b.html": 0.005}
+        results[label] = (0, "", "", meter)
+    results["accessibility check"] = (1, "Accessibility check failed:\n - a.html\n", "", Meter())
+    results["unit tests"] = (0, "", "skipped: nothing relevant changed since HEAD", Meter())
+    return results
+
+
+class MeterTest(unittest.TestCase):
+    def test_accumulates_time_pages_and_traced_peak(self):
+        meter = Meter()
+        tracemalloc.start()
+        try:
+            with meter.measure("a.html"):
+                blob = bytearray(512 * 1024)
+            with meter.measure("a.html"):
+                pass
+        finally:
+            tracemalloc.stop()
+        del blob
+        self.assertGreaterEqual(meter.peak_kb, 512)
+        self.assertEqual(list(meter.pages), ["a.html"])
+        self.assertGreater(meter.wall, 0)
+        self.assertIsNone(Meter().as_dict()["memory"])
+
+
+class ReportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_json_report(self):
+        path = self.dir / "gate.json"
+        release_gate.write_json_report(path, fake_results(), 1.5, slowest=1)
+        payload = json.loads(path.read_text())
+        self.assertFalse(payload["passed"])
+        checks = {check["label"]: check for check in payload["checks"]}
+        self.assertEqual(len(checks), len(release_gate.CHECK_ORDER))
+        self.assertEqual(checks["accessibility check"]["status"], "failed")
+        self.assertEqual(checks["unit tests"]["status"], "skipped")
+        self.assertEqual(checks["js syntax"]["slowest"], [["b.html", 0.005]])
+
+    def test_junit_report(self):
+        path = self.dir / "gate.xml"
+        release_gate.write_junit(path, fake_results(), 1.5)
+        suite = ET.parse(path).getroot()
+        self.assertEqual((suite.get("tests"), suite.get("failures"), suite.get("skipped")), ("18", "1", "1"))
+        failure = suite.find("testcase[@name='accessibility check']/failure")
+        self.assertIn("a.html", failure.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Link graph index in scripts/link_graph.py."""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from _changes import ChangeSet  # noqa: E402
+from _site import load_pages  # noqa: E402
+from link_graph import LinkGraph, graph_version, local_target  # noqa: E402
+
+SITE = {
+    "index.html": '<a href="about.html#team">About</a><img src="images/logo.svg" alt="">',
+    "about.html": '<a href="index.html">Home</a><a href="My%20Guide.pdf">Guide</a>',
+    "guide.html": '<a href="My Guide.pdf">Guide</a><a href="https://example.org/x">x</a>',
+}
+
+
+class LinkGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.write(SITE)
+        self.graph = LinkGraph(graph_version())
+        self.graph.update(load_pages(self.root))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, files):
+        for name, html in files.items():
+            (self.root / name).write_text(f"<html><body>{html}</body></html>", encoding="utf-8")
+
+    def test_local_target_normalizes(self):
+        self.assertEqual(local_target("My%20Guide.pdf?dl=1#p2"), "My Guide.pdf")
+        self.assertEqual(local_target("/css/../css/site.css"), "css/site.css")
+        self.assertIsNone(local_target("mailto:a@b.c"))
+        self.assertIsNone(local_target("https://example.org/"))
+
+    def test_reverse_lookups_and_orphans(self):
+        self.assertEqual(self.graph.referrers("My Guide.pdf"), ["about.html", "guide.html"])
+        self.assertEqual(self.graph.assets(), {
+            "My Guide.pdf": ["about.html", "guide.html"],
+            "images/logo.svg": ["index.html"],
+        })
+        self.assertEqual(self.graph.orphans(), ["guide.html"])
+
+    def test_update_reparses_only_changed_pages(self):
+        self.write({"guide.html": '<a href="index.html">Home</a>'})
+        (self.root / "about.html").unlink()
+        self.assertEqual(self.graph.update(load_pages(self.root)), ["guide.html"])
+        self.assertEqual(sorted(self.graph.pages), ["guide.html", "index.html"])
+        self.assertEqual(self.graph.referrers("My Guide.pdf"), [])
+
+    def test_affected_edges(self):
+        changes = ChangeSet("HEAD", set(), {"index.html"}, {"My Guide.pdf"})
+        self.assertEqual(self.graph.affected(changes), [
+            ("about.html", ["My%20Guide.pdf"]),
+            ("guide.html", ["My Guide.pdf"]),
+            ("index.html", ["about.html#team", "images/logo.svg"]),
+        ])
+
+    def test_round_trip(self):
+        path = self.root / "graph.json"
+        self.graph.save(path)
+        self.assertEqual(LinkGraph.load(path).pages, self.graph.pages)
+        self.graph.version = "stale"
+        self.graph.save(path)
+        self.assertEqual(LinkGraph.load(path).pages, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Histogram accuracy, regression comparison and a short run of scripts/load_test.py."""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import dev_server  # noqa: E402
+import load_test  # noqa: E402
+
+
+class HistogramTest(unittest.TestCase):
+    def test_percentiles_within_one_percent(self):
+        hist = load_test.Histogram()
+        for micros in range(1, 100_001):
+            hist.record(micros)
+        for pct, exact in ((50, 50_000), (95, 95_000), (99, 99_000)):
+            self.assertAlmostEqual(hist.percentile(pct), exact, delta=exact * 0.01)
+        self.assertEqual(hist.percentile(100), 100_000)
+        self.assertLess(len(hist.counts), 2000)
+
+    def test_compare_flags_slower_percentiles_and_errors(self):
+        row = {"p95_ms": 10.0, "p99_ms": 20.0, "error_rate": 0.0}
+        baseline = {"routes": {"/": row}, "total": row}
+        current = {"routes": {"/": {**row, "p95_ms": 13.0}}, "total": {**row, "error_rate": 0.05}}
+        self.assertEqual(load_test.compare(current, baseline, 0.25),
+                         ["/: p95 13.00 ms vs baseline 10.00 ms", "total: error rate 5.0% vs baseline 0.0%"])
+
+
+class RunTest(unittest.TestCase):
+    def test_run_against_dev_server(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "index.html").write_text("<p>home</p>" * 50, encoding="utf-8")
+            config = dev_server.SiteConfig(root / "netlify.toml")
+            server = dev_server.DevServer(("127.0.0.1", 0), root, config, None, quiet=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                url = f"http://127.0.0.1:{server.server_address[1]}"
+                stats, elapsed = asyncio.run(load_test.run(url, ["/", "/missing"], 2, 5.0, None, 40, {}))
+            finally:
+                server.shutdown()
+                server.server_close()
+        result = load_test.summarize(stats, elapsed)
+        self.assertEqual(result["total"]["requests"], 40)
+        self.assertEqual(result["routes"]["/"]["errors"], 0)
+        self.assertEqual(result["routes"]["/missing"]["errors"], 20)
+        self.assertEqual(result["routes"]["/"]["bytes_per_request"], len("<p>home</p>") * 50)
+
+    def test_routes_from_uptime_workflow(self):
+        self.assertEqual(load_test.uptime_routes(), load_test.DEFAULT_ROUTES)
+        self.assertIn("/about.html", load_test.sitemap_routes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Asset resolution and budgets in scripts/check_page_weight.py."""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from _site import Page, visit  # noqa: E402
+import check_page_weight as weight  # noqa: E402
+
+HTML = """<!doctype html><html><head>
+<link rel="stylesheet" href="css/styles.css"><link rel="icon" href="favicon.svg">
+<link rel="canonical" href="https://example.com/x.html"><link rel="preload" as="font" href="/fonts/a.woff2">
+</head><body><a href="about.html">About</a>
+<img src="images/a.svg" srcset="images/a.svg 1x, images/a@2x.svg 2x">
+<script src="js/main.js"></script><script>inline()</script></body></html>"""
+
+
+class PageWeightTest(unittest.TestCase):
+    def test_only_fetched_resources_are_assets(self):
+        (parser,) = visit([Page(Path("x.html"), HTML)], {"a": weight.AssetParser})["a"]
+        self.assertEqual(parser.result(), [
+            "css/styles.css", "favicon.svg", "/fonts/a.woff2",
+            "images/a.svg", "images/a.svg", "images/a@2x.svg", "js/main.js",
+        ])
+
+    def test_css_references_resolve_relative_to_the_stylesheet(self):
+        css = """@import "base.css"; @font-face { src: url('../fonts/a.woff2') format('woff2'); }
+        .x { background: url(data:image/png;base64,AAA) } .y { content: url("../images/b.svg#frag") }"""
+        self.assertEqual(
+            weight.css_references("css/site.css", css),
+            ["css/base.css", "fonts/a.woff2", "images/b.svg"],
+        )
+
+    def test_precompressed_formats_are_not_recompressed(self):
+        text = b"body { color: red; }\n" * 200
+        raw, gz, _ = weight.compressed_sizes(text, ".css")
+        self.assertLess(gz, raw)
+        self.assertEqual(weight.compressed_sizes(text, ".woff2")[:2], [len(text), len(text)])
+
+    def test_budgets_merge_page_overrides(self):
+        budgets = {"default": {"gzip_kb": 10, "requests": 3}, "pages": {"big.html": {"gzip_kb": 100}}}
+        page = {"raw": 50_000, "gzip": 20 * 1024, "brotli": None, "requests": 4}
+        self.assertEqual(weight.over_budget("big.html", page, weight.budget_for(budgets, "big.html")),
+                         ["big.html: 4 requests > budget 3"])
+        self.assertEqual(len(weight.over_budget("x.html", page, weight.budget_for(budgets, "x.html"))), 2)
+        # brotli budgets are ignored when brotli sizes are unavailable.
+        self.assertEqual(weight.over_budget("x.html", page, {"brotli_kb": 1}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Deep structural PDF validation in scripts/check_pdfs.py."""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import check_pdfs  # noqa: E402
+
+FORMS = ROOT / "Executive Functioning Reproducable Forms.pdf"
+RUBRIC = ROOT / "EFI-Capstone-Transparency-Rubric.pdf"
+
+
+def build_pdf(objects: dict[int, bytes], trailer: str) -> bytes:
+    """A PDF with an xref table over ``objects``; ``trailer`` may use {offset_N}."""
+    out = b"%PDF-1.5\n"
+    offsets = {}
+    for num, body in sorted(objects.items()):
+        offsets[num] = len(out)
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n"
+    for num, offset in sorted(offsets.items()):
+        out += b"%d 1\n%010d 00000 n \n" % (num, offset)
+    fields = {f"offset_{num}": offset for num, offset in offsets.items()}
+    out += b"trailer\n<< " + trailer.format(**fields).encode() + b" >>\nstartxref\n%d\n%%%%EOF\n" % xref
+    return out
+
+
+def stream(dictionary: bytes, data: bytes) -> bytes:
+    return b"<< " + dictionary + b" >>\nstream\n" + data + b"\nendstream"
+
+
+class PdfStructureTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: bytes) -> Path:
+        path = Path(self.tmp.name) / name
+        path.write_bytes(data)
+        return path
+
+    def test_reads_xref_streams_tables_and_linearization(self):
+        forms = check_pdfs.inspect_pdf(FORMS)
+        self.assertEqual(forms["errors"], [])
+        self.assertEqual((forms["pages"], forms["xref"], forms["linearized"]), (49, "stream", True))
+        rubric = check_pdfs.inspect_pdf(RUBRIC)
+        self.assertEqual((rubric["pages"], rubric["xref"], rubric["linearized"]), (1, "table", False))
+
+    def test_truncated_copy_fails(self):
+        info = check_pdfs.inspect_pdf(self.write("cut.pdf", FORMS.read_bytes()[:600_000]))
+        self.assertIn("missing %%EOF marker (truncated upload?)", info["errors"])
+
+    def test_shifted_xref_fails(self):
+        data = RUBRIC.read_bytes()
+        info = check_pdfs.inspect_pdf(self.write("shifted.pdf", data[:3000] + b"  " + data[3000:]))
+        self.assertTrue(info["errors"])
+        self.assertIsNone(info["pages"])
+
+    def test_malformed_numbers_are_reported_not_raised(self):
+        # Object 1 (the catalog) lives in object stream 3, whose header is garbage.
+        xref_rows = bytes([2, 3, 0])
+        bad_header = build_pdf({
+            3: stream(b"/Type /ObjStm /N 1 /First 4 /Length 4", b"0<43"),
+            6: stream(b"/Type /XRef /W [1 1 1] /Index [1 1] /Size 7 /Length 3", xref_rows),
+        }, "/Size 7 /Root 1 0 R /XRefStm {offset_6}")
+        info = check_pdfs.inspect_pdf(self.write("objstm.pdf", bad_header))
+        self.assertEqual(info["errors"], ["object stream 3 has a malformed header"])
+
+        bad_length = build_pdf({
+            5: b"oops",
+            6: stream(b"/Type /XRef /W [1 1 1] /Index [1 1] /Size 7 /Length 5 0 R", xref_rows),
+        }, "/Size 7 /Root 1 0 R /XRefStm {offset_6}")
+        info = check_pdfs.inspect_pdf(self.write("length.pdf", bad_length))
+        self.assertIn("non-numeric indirect /Length", info["errors"][0])
+
+        results = check_pdfs.inspect_all([self.write("a.pdf", bad_header), RUBRIC], jobs=2)
+        self.assertEqual(len(results), 2)
+
+    def test_multi_digit_indirect_length(self):
+        self.assertIsNone(check_pdfs._int_key(b"<< /Length 12 0 R >>", b"Length"))
+        self.assertEqual(check_pdfs._int_key(b"<< /Length 12 >>", b"Length"), 12)
+        catalog = b"1 0 << /Type /Catalog /Pages 2 0 R >>"
+        pdf = build_pdf({
+            2: b"<< /Type /Pages /Kids [] /Count 0 >>",
+            3: stream(b"/Type /ObjStm /N 1 /First 4 /Length %d" % len(catalog), catalog),
+            6: stream(b"/Type /XRef /W [1 1 1] /Index [1 1] /Size 13 /Length 12 0 R", bytes([2, 3, 0])),
+            12: b"3",
+        }, "/Size 13 /Root 1 0 R /XRefStm {offset_6}")
+        info = check_pdfs.inspect_pdf(self.write("indirect.pdf", pdf))
+        self.assertEqual((info["errors"], info["pages"]), ([], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
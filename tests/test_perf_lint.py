@@ -0,0 +1,69 @@
+"""Findings and scoring of scripts/check_perf_lint.py."""
+from __future__ import annotations
+
+from contextlib import redirect_stdout
+import io
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from _site import Page, scan  # noqa: E402
+import check_perf_lint as perf  # noqa: E402
+
+HTML = """<!DOCTYPE html><html><head>
+<link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter">
+<link rel="preconnect" href="https://fonts.googleapis.com">
+<script src="js/a.js"></script><script src="js/b.js" defer></script>
+<script type="application/ld+json">{PAD}</script>
+<nav><img src="logo.svg" width="10" height="10"></nav>
+<main><section class="hero"><img src="hero.svg" width="10" height="10"></section>
+<section><img src="chart.svg" loading="lazy"><img src="late.svg" width="1" height="1"></section></main>
+<script src="js/a.js"></script><script>{PAD}</script>
+</body></html>""".replace("{PAD}", "x" * (perf.MAX_INLINE_BYTES + 1))
+
+
+def lint(html: str) -> dict:
+    return scan([Page(Path("p.html"), html)], {"perf": perf.PerfParser})["perf"][0][1]
+
+
+class PerfLintTest(unittest.TestCase):
+    def test_findings(self):
+        found = lint(HTML)
+        issues = "\n".join(found["issues"])
+        self.assertIn('render-blocking <script src="js/a.js">', issues)
+        self.assertNotIn("js/b.js", issues)
+        self.assertIn('href="https://fonts.gstatic.com"', issues)
+        self.assertNotIn('href="https://fonts.googleapis.com"', issues)
+        self.assertIn('<img src="chart.svg"> without width/height', issues)
+        self.assertIn('<img src="late.svg"> below the first screen', issues)
+        self.assertNotIn("hero.svg", issues)
+        self.assertIn("script js/a.js included 2 times", issues)
+        # JSON-LD is not script; only the large inline JS counts.
+        self.assertEqual(issues.count("inline <script>"), 1)
+        self.assertEqual(len(found["issues"]), 6)
+        self.assertEqual(found["passes"], found["checks"] - 6)
+
+    def test_baseline_gates_new_findings_per_rule(self):
+        results = [("p.html", lint(HTML)), ("clean.html", lint("<html><main><p>x</p></main></html>"))]
+        accepted = dict(results[0][1]["rules"])
+        self.assertEqual(accepted, {"blocking-script": 1, "duplicate-script": 1, "image-size": 1, "inline-script": 1,
+                                    "lazy-image": 1, "preconnect": 1})
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(perf.report(results, baseline={"p.html": accepted}), 0)
+        self.assertIn("p.html: ", out.getvalue())
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(perf.report(results, baseline={}), 1)
+        self.assertIn("failed: p.html", out.getvalue())
+
+        # More passing images raise the score, but the extra finding still fails.
+        more = HTML.replace("</main>", '<img src="x.svg" width="1" height="1" loading="lazy">' * 6
+                            + '<img src="y.svg" loading="lazy"></main>')
+        self.assertGreater(perf.score(lint(more)), perf.score(results[0][1]))
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(perf.report([("p.html", lint(more))], baseline={"p.html": accepted}), 1)
+        self.assertIn("new findings: image-size (+1)", out.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Prebuilt, prefix-sharded search index (scripts/build_search_index.py)."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import build_search_index  # noqa: E402
+
+PAGE = """<!DOCTYPE html><html><head><title>{title} | EFI</title>
+<meta name="description" content="{title} overview."><script>var hidden = "scriptword";</script></head>
+<body><nav><a href="index.html">Navword</a></nav><main><h1>{title}</h1><p>{body}</p></main>
+<footer>Footerword</footer></body></html>"""
+
+
+def write_site(root: Path, pages: dict[str, tuple[str, str]]) -> None:
+    for name, (title, body) in pages.items():
+        (root / name).write_text(PAGE.format(title=title, body=body), encoding="utf-8")
+    (root / "Further Sources").write_text(
+        "Heading\n- Barkley fact sheet: https://www.russellbarkley.org/factsheet.pdf\n- Not a source line\n",
+        encoding="utf-8")
+
+
+def lookup(data: Path, manifest: dict, term: str) -> dict[int, int]:
+    """Doc id -> weighted tf, found the way js/site-search.js does."""
+    path = [rel for start, rel in manifest["shards"] if start <= term[:2]][-1]
+    flat = json.loads((data / path).read_text(encoding="utf-8")).get(term, [])
+    postings, doc = {}, 0
+    for delta, tf in zip(flat[::2], flat[1::2]):
+        doc += delta
+        postings[doc] = tf
+    return postings
+
+
+class SearchIndexTest(unittest.TestCase):
+    def test_stemming_and_visible_text(self):
+        stem = build_search_index.stem
+        self.assertEqual({stem(w) for w in ("include", "included", "including")}, {"includ"})
+        self.assertEqual({stem(w) for w in ("plan", "planning", "planned", "plans")}, {"plan"})
+        self.assertEqual([stem(w) for w in ("strategies", "focus", "classes", "analysis")],
+                         ["strategy", "focus", "class", "analysis"])
+        self.assertEqual(build_search_index.terms("The Café's timers"), ["cafe", "timer"])
+
+    def test_build_check_and_incremental_rebuild(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root, data = Path(tmp) / "site", Path(tmp) / "data"
+            root.mkdir()
+            data.mkdir()
+            write_site(root, {"a.html": ("Time Blindness", "Clocks and timers externalize time."),
+                              "b.html": ("Working Memory", "Checklists support working memory."),
+                              "404.html": ("Not Found", "Missing page.")})
+            manifest, written, _ = build_search_index.build(data, root, use_cache=False)
+            self.assertEqual(build_search_index.stale(data, root, use_cache=False), [])
+            docs = json.loads((data / manifest["docs"]).read_text(encoding="utf-8"))
+            self.assertEqual([doc[:3] for doc in docs], [
+                ["a.html", "Time Blindness", "Time Blindness overview."],
+                ["b.html", "Working Memory", "Working Memory overview."],
+                ["https://www.russellbarkley.org/factsheet.pdf", "Barkley fact sheet",
+                 "Further Sources · russellbarkley.org"],
+            ])
+            # Title x3, heading x2, body x1.
+            self.assertEqual(lookup(data, manifest, "time"), {0: 6})
+            self.assertEqual(lookup(data, manifest, "memory"), {1: 6})
+            self.assertEqual(lookup(data, manifest, "barkley"), {2: 3})
+            for hidden in ("scriptword", "navword", "footerword", "missing"):
+                self.assertEqual(lookup(data, manifest, hidden), {})
+
+            files_before = {p.name for p in (data / "search").iterdir()}
+            (root / "b.html").write_text(PAGE.format(title="Working Memory", body="Sticky notes."), encoding="utf-8")
+            self.assertIn("data/search-manifest.json is out of date",
+                          build_search_index.stale(data, root, use_cache=False))
+            manifest, written, removed = build_search_index.build(data, root, use_cache=False)
+            self.assertEqual(build_search_index.stale(data, root, use_cache=False), [])
+            self.assertEqual(lookup(data, manifest, "sticky"), {1: 1})
+            self.assertEqual(lookup(data, manifest, "checklist"), {})
+            files_after = {p.name for p in (data / "search").iterdir()}
+            self.assertEqual(len(files_before - files_after), removed)
+            self.assertEqual(written, removed + 1)
+
+    def test_committed_index_is_fresh(self):
+        self.assertEqual(build_search_index.stale(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
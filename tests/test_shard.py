@@ -0,0 +1,77 @@
+"""Sharded gate runs: partitioning and merging in scripts/_shard.py."""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from _profile import Meter  # noqa: E402
+import _shard  # noqa: E402
+
+LABELS = ["local link check", "sitemap coverage + absolute URLs"]
+
+
+def meter(wall: float, files: int, pages: dict[str, float]) -> Meter:
+    m = Meter()
+    m.wall, m.files, m.pages = wall, files, pages
+    return m
+
+
+class ShardTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_partition_is_stable_and_complete(self):
+        names = [f"page-{i}.html" for i in range(200)]
+        owners = [_shard.owner(name, 4) for name in names]
+        self.assertEqual(owners, [_shard.owner(name, 4) for name in names])
+        self.assertEqual(set(owners), {1, 2, 3, 4})
+        # Every key belongs to exactly one shard.
+        self.assertEqual(sum(_shard.owns((index, 4), names[0]) for index in range(1, 5)), 1)
+        self.assertTrue(_shard.owns(None, "anything"))
+
+    def test_parse_shard(self):
+        self.assertEqual(_shard.parse_shard("2/4"), (2, 4))
+        for bad in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                _shard.parse_shard(bad)
+
+    def write(self, index: int, results: dict) -> Path:
+        path = self.dir / f"shard-{index}.json"
+        _shard.write_partial(path, (index, 2), results, slowest=5)
+        return path
+
+    def test_merge_combines_partials(self):
+        one = self.write(1, {
+            LABELS[0]: (0, "Local links OK\n", "", meter(0.5, 3, {"a.html": 0.2})),
+            LABELS[1]: (0, "", "", meter(0.1, 4, {})),
+        })
+        two = self.write(2, {
+            LABELS[0]: (1, "Broken local links found:\n- b.html: x.pdf\n", "", meter(0.25, 2, {"b.html": 0.3})),
+        })
+        merged = _shard.merge([two, one], LABELS)
+        rc, output, note, cost = merged[LABELS[0]]
+        self.assertEqual(rc, 1)
+        self.assertTrue(output.startswith("[shard 1/2]\nLocal links OK\n[shard 2/2]\nBroken"))
+        self.assertEqual((cost.wall, cost.files), (0.75, 5))
+        self.assertEqual(cost.as_dict()["slowest"][0], ["b.html", 0.3])
+        self.assertEqual(merged[LABELS[1]][1], "")
+
+    def test_merge_rejects_incomplete_sets(self):
+        one = self.write(1, {label: (0, "", "", Meter()) for label in LABELS})
+        with self.assertRaisesRegex(ValueError, "expected shards 1..2"):
+            _shard.merge([one], LABELS)
+        two = self.write(2, {})
+        with self.assertRaisesRegex(ValueError, "no shard ran"):
+            _shard.merge([one, two], LABELS + ["unit tests"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Sitemap generation with content-hash lastmod (scripts/build_sitemap.py)."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import build_sitemap  # noqa: E402
+from _site import Page, load_pages  # noqa: E402
+
+DOMAIN = build_sitemap.CANONICAL_DOMAIN
+
+
+def page(name: str, body: str = "") -> Page:
+    return Page(Path(name), f'<link rel="canonical" href="{DOMAIN}{name}"><p>{body}</p>')
+
+
+class SitemapTest(unittest.TestCase):
+    def test_lastmod_moves_only_when_content_changes(self):
+        state = build_sitemap.update_state([page("a.html"), page("b.html"), page("404.html")], {}, "2026-01-01")
+        self.assertEqual(sorted(state), ["a.html", "b.html"])
+        self.assertEqual(state["a.html"]["priority"], build_sitemap.DEFAULT_PRIORITY)
+        state["a.html"]["priority"] = 0.9
+
+        later = build_sitemap.update_state([page("a.html"), page("b.html", "edited")], state, "2026-02-01")
+        self.assertEqual(later["a.html"], state["a.html"])
+        self.assertEqual(later["b.html"]["lastmod"], "2026-02-01")
+        self.assertNotEqual(later["b.html"]["digest"], state["b.html"]["digest"])
+        self.assertNotIn("c.html", build_sitemap.update_state([page("a.html")], later, "2026-03-01"))
+
+    @unittest.skipUnless(shutil.which("git"), "git is not installed")
+    def test_lastmod_comes_from_the_last_commit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            env = {**os.environ, "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@example.com",
+                   "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@example.com",
+                   "GIT_AUTHOR_DATE": "2025-05-01T12:00:00Z", "GIT_COMMITTER_DATE": "2025-05-01T12:00:00Z"}
+            for name in ("a.html", "b.html"):
+                root.joinpath(name).write_text(page(name).text, encoding="utf-8")
+            for command in (["init", "-q"], ["add", "a.html", "b.html"], ["commit", "-q", "-m", "pages"]):
+                subprocess.run(["git", *command], cwd=root, env=env, check=True)
+            root.joinpath("b.html").write_text(page("b.html", "edited").text, encoding="utf-8")
+            root.joinpath("c.html").write_text(page("c.html").text, encoding="utf-8")
+
+            state = build_sitemap.update_state(load_pages(root), {}, "2026-01-01", root)
+            self.assertEqual({name: entry["lastmod"] for name, entry in state.items()},
+                             {"a.html": "2025-05-01", "b.html": "2026-01-01", "c.html": "2026-01-01"})
+            wrong = {name: {**entry, "lastmod": "2026-01-01", "priority": 0.9} for name, entry in state.items()}
+            self.assertEqual(build_sitemap.update_state(load_pages(root), wrong, "2026-02-01", root)["a.html"],
+                             wrong["a.html"])
+            reseeded = build_sitemap.update_state(load_pages(root), wrong, "2026-02-01", root, reseed=True)
+            self.assertEqual(reseeded["a.html"], {**wrong["a.html"], "lastmod": "2025-05-01"})
+            self.assertEqual(reseeded["b.html"]["lastmod"], "2026-02-01")
+
+    def test_splits_into_an_index_past_the_limits(self):
+        state = {f"p{i}.html": {"priority": 0.5, "lastmod": f"2026-01-0{i}", "digest": ""} for i in range(1, 6)}
+        self.assertEqual(list(build_sitemap.render(state)), ["sitemap.xml"])
+        files = build_sitemap.render(state, max_urls=2)
+        self.assertEqual(sorted(files), ["sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml", "sitemap.xml"])
+        index = files["sitemap.xml"].decode()
+        self.assertIn("<sitemapindex", index)
+        self.assertIn(f"<loc>{DOMAIN}sitemap-2.xml</loc><lastmod>2026-01-04</lastmod>", index)
+        one_per_file = build_sitemap.render(state, max_bytes=300)
+        self.assertEqual(len(one_per_file), 6)
+
+    def test_build_check_and_index_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for name in ("a.html", "b.html", "c.html", "404.html"):
+                root.joinpath(name).write_text(page(name).text, encoding="utf-8")
+            with mock.patch.object(build_sitemap, "MAX_URLS", 2):
+                written = build_sitemap.build(load_pages(root), "2026-01-01", root)
+                self.assertEqual(sorted(written), ["scripts/rules/sitemap.json", "sitemap-1.xml", "sitemap-2.xml",
+                                                   "sitemap.xml"])
+                self.assertEqual(build_sitemap.sitemap_locs(root / "sitemap.xml"),
+                                 [DOMAIN + name for name in ("a.html", "b.html", "c.html")])
+                self.assertEqual(build_sitemap.stale(load_pages(root), root), [])
+
+                root.joinpath("c.html").unlink()
+                root.joinpath("b.html").write_text(page("b.html", "edited").text, encoding="utf-8")
+                self.assertEqual(build_sitemap.stale(load_pages(root), root), [
+                    "b.html changed since its recorded lastmod",
+                    "c.html is in scripts/rules/sitemap.json but no longer exists",
+                ])
+                self.assertEqual(build_sitemap.stale(load_pages(root), root, lastmod=False),
+                                 ["c.html is in scripts/rules/sitemap.json but no longer exists"])
+                build_sitemap.build(load_pages(root), "2026-02-01", root)
+            self.assertFalse(root.joinpath("sitemap-1.xml").exists())
+            self.assertIn(f"<loc>{DOMAIN}b.html</loc><lastmod>2026-02-01</lastmod>",
+                          root.joinpath("sitemap.xml").read_text(encoding="utf-8"))
+            self.assertEqual(build_sitemap.stale(load_pages(root), root), [])
+
+    def test_canonical_failures(self):
+        self.assertEqual(build_sitemap.canonical_failures([("a.html", DOMAIN + "a.html"), ("404.html", None),
+                                                           ("b.html", DOMAIN + "a.html")]),
+                         [f"b.html: expected canonical '{DOMAIN}b.html', found '{DOMAIN}a.html'"])
+
+    def test_committed_sitemap_is_fresh(self):
+        self.assertEqual(build_sitemap.stale(load_pages(), lastmod=False), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
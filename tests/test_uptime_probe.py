@@ -0,0 +1,77 @@
+"""scripts/uptime_probe.py against a stand-in server that injects latency and errors."""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import dev_server  # noqa: E402
+import uptime_probe  # noqa: E402
+
+
+class FaultyHandler(dev_server.DevHandler):
+    """The dev server, with a configurable delay and a route that always fails."""
+
+    delay = 0.0
+
+    def dispatch(self):
+        time.sleep(self.delay)
+        if self.path == "/down":
+            self.send_simple(503, "unavailable\n")
+        else:
+            super().dispatch()
+
+
+class UptimeProbeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        root = Path(cls.tmp.name)
+        (root / "index.html").write_text("<p>ok</p>", encoding="utf-8")
+        cls.server = dev_server.DevServer(("127.0.0.1", 0), root, dev_server.SiteConfig(root / "netlify.toml"),
+                                          None, quiet=True)
+        cls.server.RequestHandlerClass = FaultyHandler
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        FaultyHandler.delay = 0.0
+
+    def test_timings_reuse_and_failures(self):
+        probes = uptime_probe.probe_routes(self.url, ["/", "/down"], samples=2, per_host=1)
+        self.assertEqual([p.status for p in probes], [200, 503, 200, 503])
+        self.assertFalse(probes[0].reused)
+        self.assertTrue(all(p.reused for p in probes[1:]))
+        self.assertGreater(probes[0].total_ms, 0)
+        self.assertEqual(uptime_probe.failure_alerts(probes), ["/down: 2/2 probes failed (HTTP 503)"])
+
+    def test_latency_regression_over_window(self):
+        db = uptime_probe.open_db(Path(":memory:"))
+        now = time.time()
+        for hours_ago in range(24, 18, -1):
+            uptime_probe.record(db, self.url, uptime_probe.probe_routes(self.url, ["/"]), now - hours_ago * 3600)
+        self.assertEqual(uptime_probe.latency_alerts(db, self.url, ["/"], now), [])
+
+        FaultyHandler.delay = 0.05
+        for minutes_ago in range(5):
+            probes = uptime_probe.probe_routes(self.url, ["/"])
+            self.assertEqual(uptime_probe.failure_alerts(probes), [])
+            uptime_probe.record(db, self.url, probes, now - minutes_ago * 60)
+        alerts = uptime_probe.latency_alerts(db, self.url, ["/"], now)
+        self.assertEqual(len(alerts), 1)
+        self.assertIn("/: p95", alerts[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
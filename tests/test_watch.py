@@ -0,0 +1,54 @@
+"""Polling watcher behind release_gate.py --watch."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from _watch import Watcher  # noqa: E402
+
+
+class WatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "css").mkdir()
+        self.write("index.html", "<p>home</p>")
+        self.write("css/site.css", "body{}")
+        self.write("notes.md", "ignored")
+        self.watcher = Watcher(["*.html"], ["css"], root=self.root, settle=0.01)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel: str, text: str) -> None:
+        path = self.root / rel
+        path.write_text(text, encoding="utf-8")
+        # Bump mtime explicitly so same-size rewrites are seen on coarse clocks.
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    def test_detects_added_modified_deleted(self):
+        self.assertIsNone(self.watcher.poll())
+        self.write("index.html", "<p>changed</p>")
+        self.write("about.html", "<p>new</p>")
+        self.write("notes.md", "still ignored")
+        (self.root / "css" / "site.css").unlink()
+        changes = self.watcher.poll()
+        self.assertEqual(changes.added, {"about.html"})
+        self.assertEqual(changes.modified, {"index.html"})
+        self.assertEqual(changes.deleted, {"css/site.css"})
+        self.assertIsNone(self.watcher.poll())
+
+    def test_ignores_editor_swap_files(self):
+        self.write(".index.html.swp", "x")
+        self.write("css/site.css~", "x")
+        self.assertIsNone(self.watcher.poll())
+
+
+if __name__ == "__main__":
+    unittest.main()